@@ -83,10 +83,16 @@ if not exit_flag:
     error_buffer = []
     
     # files to run static analysis on (relative to the root directory)
-    file_list = ['pySCPI.pyw', 'setup.py', 'install_builder.py', 
-                 'src/pySCPI_config.py', 'src/pySCPI_gui.py',
+    file_list = ['pySCPI.pyw', 'pySCPI_cli.py', 'setup.py', 
+                 'install_builder.py', 'src/pySCPI_config.py', 'src/pySCPI_gui.py',
                  'src/pySCPI_aardvark.py', 'src/pySCPI_threading.py',
-                 'src/pySCPI_XML.py']   
+                 'src/pySCPI_XML.py', 'src/pySCPI_plan.py',
+                 'src/pySCPI_latency.py', 'src/pySCPI_scheduler.py',
+                 'src/pySCPI_health.py', 'src/pySCPI_session.py',
+                 'src/pySCPI_cache.py', 'src/pySCPI_headless.py',
+                 'src/pySCPI_sweep.py', 'src/pySCPI_transport.py',
+                 'src/pySCPI_simulator.py', 'src/pySCPI_scaling.py',
+                 'src/pySCPI_replay.py']   
     
     # xml files to verify the validity of
     xml_list = ['src/SCPI_Commands.xml', 'src/pySCPI_config.xml']
@@ -30,6 +30,8 @@ import pySCPI_config
 import pySCPI_gui
 import pySCPI_XML
 import pySCPI_threading
+import pySCPI_transport
+import pySCPI_simulator
 sys.stderr = sys.stdout
 
 
@@ -44,11 +46,19 @@ SCPI_library = pySCPI_config.command_library()
 pySCPI_XML.update_commands(SCPI_library)
 
 # Initialise the defalut values for the GUI
-GUI_defaults = pySCPI_gui.gui_defaults()
+GUI_defaults = pySCPI_config.gui_defaults()
 
 # update them from XML
 pySCPI_XML.update_gui_defaults(GUI_defaults)
 
+# send I2C transactions through the chosen transport
+pySCPI_transport.select(GUI_defaults.transport)
+
+if GUI_defaults.transport == pySCPI_simulator.simulated_transport.name:
+    # simulated modules answer at the configured addresses
+    pySCPI_simulator.build_rack(SCPI_library, GUI_defaults)
+# end if
+
 # define termination event manager
 terminator = pySCPI_threading.terminator_event()
 
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+################################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+################################################################################
+"""
+@package pySCPI_cli.py
+Command line interface for pySCPI to send command lists and log telemetry
+without the GUI, for example on machines without a display. Run from the
+pySCPI directory, 'python pySCPI_cli.py -h' lists the options.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import sys
+sys.path.insert(1, 'src/')
+import argparse
+import pySCPI_config
+import pySCPI_headless
+import pySCPI_replay
+import pySCPI_simulator
+import pySCPI_sweep
+
+
+#
+# -------
+# Main Code
+
+# define the command line options
+parser = argparse.ArgumentParser(description = 'Send SCPI commands to '
+                                 'Pumpkin modules through an Aardvark, or '
+                                 'log their telemetry, without the GUI.')
+parser.add_argument('script', nargs = '?',
+                    help = 'xml script saved by pySCPI or text file with one '
+                    'command per line')
+parser.add_argument('-c', '--command', action = 'append', default = [],
+                    help = 'command to send after those in the script, can '
+                    'be repeated')
+parser.add_argument('-l', '--log', metavar = 'FILE',
+                    help = 'log telemetry to this csv file until stopped '
+                    'instead of sending the commands once')
+parser.add_argument('-p', '--period', default = '60',
+                    help = "logging period in seconds or 'auto' "
+                    "(default 60)")
+parser.add_argument('-d', '--duration', type = float,
+                    help = 'seconds to log for (default until Ctrl-C)')
+parser.add_argument('-a', '--adapter', metavar = 'XXXX-XXXXXX',
+                    action = 'append', default = [],
+                    help = 'serial number of the Aardvark to use, can be '
+                    'repeated to share the runs of a sweep between them')
+parser.add_argument('-s', '--sweep', metavar = 'NAME=VALUES',
+                    action = 'append', default = [],
+                    help = 'run the commands for every value of NAME, '
+                    'given as a,b,c or first:last:step, in place of {NAME} '
+                    'in the commands, can be repeated to sweep every '
+                    'combination')
+parser.add_argument('-o', '--output', metavar = 'FILE',
+                    help = 'csv file to write the telemetry of each run of '
+                    'a sweep to')
+parser.add_argument('--simulate', action = 'store_true',
+                    help = 'send to simulated modules at the addresses in '
+                    'pySCPI_config.xml instead of an Aardvark')
+parser.add_argument('--sim-latency', type = float, metavar = 'MS',
+                    help = 'time simulated modules take to prepare a reply '
+                    'in ms (default 20)')
+parser.add_argument('--sim-nack', type = float, default = 0.0, 
+                    metavar = 'RATE',
+                    help = 'fraction of transactions simulated modules do '
+                    'not acknowledge (default 0)')
+parser.add_argument('--sim-faults', default = 'none', metavar = 'PROFILE',
+                    choices = sorted(pySCPI_simulator.fault_profiles),
+                    help = 'faults simulated modules inject, one of ' +
+                    ', '.join(sorted(pySCPI_simulator.fault_profiles)) +
+                    ' (default none)')
+parser.add_argument('--sim-seed', type = int, default = 0, metavar = 'N',
+                    help = 'seed of the simulated latencies and faults '
+                    '(default 0)')
+parser.add_argument('--record', metavar = 'FILE',
+                    help = 'record every I2C transaction and its timing to '
+                    'this trace file')
+parser.add_argument('--replay', metavar = 'FILE',
+                    help = 'answer I2C transactions from a trace file '
+                    'recorded with --record instead of an Aardvark')
+parser.add_argument('--replay-real-time', action = 'store_true',
+                    help = 'take as long as each transaction did when '
+                    'recorded instead of answering at once')
+parser.add_argument('--address', metavar = '0xYY',
+                    help = 'I2C address of the module (default from the '
+                    'script or the module of its commands)')
+parser.add_argument('--delay', type = int,
+                    help = 'intermessage delay in ms')
+parser.add_argument('--ascii-delay', type = int,
+                    help = 'delay before reading ascii replies in ms')
+parser.add_argument('--dp', type = int,
+                    help = 'decimal places to show for floats')
+args = parser.parse_args()
+
+if (args.replay != None) and (args.simulate or (args.record != None)):
+    parser.error('a replay cannot be simulated or recorded')
+# end if
+
+# load the configuration without the GUI
+host = pySCPI_headless.load_host(args.dp)
+
+if args.simulate:
+    pySCPI_headless.simulate(host, args.sim_latency, args.sim_nack, 
+                             args.sim_faults, args.sim_seed)
+# end if
+
+if (args.replay != None) and \
+   not pySCPI_headless.replay(host, args.replay, args.replay_real_time):
+    sys.exit(1)
+# end if
+
+if (args.record != None) and \
+   not pySCPI_replay.start_recording(args.record):
+    sys.exit(1)
+# end if
+
+# gather the commands and the settings saved with them
+if args.script != None:
+    script, device = pySCPI_headless.read_commands(args.script)
+else:
+    script = pySCPI_config.write_directives([], None, None, None)
+    device = pySCPI_headless.detect_device(args.command)
+# end if
+
+commands = script.command_list + args.command
+
+if len(commands) == 0:
+    parser.error('no commands given, use a script or --command')
+# end if
+
+if (len(args.sweep) > 0) and ((args.output == None) or 
+                              (args.log != None)):
+    parser.error('a sweep needs --output and cannot be logged')
+# end if
+
+if (len(args.adapter) > 1) and (len(args.sweep) == 0):
+    parser.error('several adapters can only be used by a sweep')
+    
+elif (len(args.adapter) == 1) and (len(args.sweep) == 0):
+    # every command goes through the chosen Aardvark
+    commands = ['<ADAPTER ' + args.adapter[0] + '>'] + commands
+# end if
+
+# the parameters of a sweep
+parameters = [pySCPI_sweep.parse_parameter(text) for text in args.sweep]
+
+if None in parameters:
+    sys.exit(1)
+# end if
+
+# the address from the options, then the script, then the module
+address = args.address
+
+if (address == None) and (script.addr not in [None, '0']):
+    address = script.addr
+# end if
+
+if address == None:
+    address = host.defaults.address_of.get(device,
+                                            host.defaults.address_of['PIM'])
+# end if
+
+if not (address.startswith('0x') and (len(address) == 4) and
+        pySCPI_config.is_hex(address[2:])):
+    parser.error('the address must be of the form 0xYY')
+# end if
+
+# the delays from the options, then the script, then the defaults
+delay = args.delay
+ascii_delay = args.ascii_delay
+
+if (delay == None) and (script.delay_time not in [None, '0']):
+    delay = int(script.delay_time)
+elif delay == None:
+    delay = host.defaults.default_delay
+# end if
+
+if (ascii_delay == None) and (script.ascii_time not in [None, '0']):
+    ascii_delay = int(script.ascii_time)
+elif ascii_delay == None:
+    ascii_delay = host.defaults.default_delay*4
+# end if
+
+# the logging period, 0 calibrates it
+if args.period == 'auto':
+    period = 0
+else:
+    try:
+        period = float(args.period)
+    except ValueError:
+        parser.error("the period must be a number of seconds or 'auto'")
+    # end try
+
+    if period <= 0:
+        parser.error("the period must be positive, use 'auto' to "
+                     "calibrate it")
+    # end if
+# end if
+
+directives = pySCPI_config.write_directives(commands, int(address, 16),
+                                            delay, ascii_delay, period,
+                                            host.defaults.transaction_mode,
+                                            host.defaults.read_mode,
+                                            host.defaults.overrun_policy,
+                                            host.defaults.interleave == 'on',
+                                            host.defaults.response_cache)
+
+if len(parameters) > 0:
+    if not pySCPI_config.file_is_free(args.output):
+        print '*** Requested output file is in use by another program ***'
+        sys.exit(1)
+    # end if
+
+    success = pySCPI_headless.sweep(host, directives, parameters, 
+                                    args.output, args.adapter)
+    
+elif args.log != None:
+    if not pySCPI_config.file_is_free(args.log):
+        print '*** Requested log file is in use by another program ***'
+        sys.exit(1)
+    # end if
+
+    success = pySCPI_headless.run(host, directives, args.log, args.duration)
+else:
+    success = pySCPI_headless.run(host, directives)
+# end if
+
+if args.simulate:
+    pySCPI_simulator.report()
+# end if
+
+if args.replay != None:
+    pySCPI_replay.report()
+# end if
+
+pySCPI_replay.stop_recording()
+
+# a non zero exit status tells scripts that no Aardvark was available
+sys.exit(int(not success))
@@ -70,6 +70,8 @@ for filename in log_list:
 setup(windows=[{'script':'pySCPI.pyw', # Top level file to read in
                 'icon_resources': [(1, 'src/cubesatkit.ico')], # desired .exe icon
                 'dest_base': 'pySCPI'}], # base directory
+      console=[{'script':'pySCPI_cli.py', # command line interface
+                'dest_base': 'pySCPI_cli'}],
       data_files= dll_files + xml_files + log_files + # data file lists declared above
                   [('src', [root + '/src/Header.jpg']), # Header image for the GUI
                   ('src', [root + '/src/cubesatkit.ico']), # icon image for the program
@@ -79,6 +81,12 @@ setup(windows=[{'script':'pySCPI.pyw', # Top level file to read in
                   ('src', [root + '/src/SCPI_Commands.xml'])], # SCPI Command Library
       options = {'py2exe':{'includes': ['pySCPI_aardvark', 'pySCPI_config', 
                                         'pySCPI_formatting', 'aardvark_py', 
-                                        'pySCPI_XML', 'pySCPI_gui'], # include files required by program
+                                        'pySCPI_XML', 'pySCPI_gui',
+                                        'pySCPI_plan', 'pySCPI_latency',
+                                        'pySCPI_scheduler', 'pySCPI_health',
+                                        'pySCPI_session', 'pySCPI_cache',
+                                        'pySCPI_headless', 'pySCPI_sweep',
+                                        'pySCPI_transport', 'pySCPI_simulator',
+                                        'pySCPI_scaling', 'pySCPI_replay'], # include files required by program
                            'dll_excludes': ['MSVCP90.dll']}} # TODO!!!!!! should not need this exclude
       )
\ No newline at end of file
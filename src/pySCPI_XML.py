@@ -22,7 +22,12 @@ __version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
 # -------
 # Imports
 
-import tkFileDialog as TKFD 
+try:
+    import tkFileDialog as TKFD 
+except ImportError:
+    # only the GUI asks for files so the command line runs without Tk
+    TKFD = None
+# end try
 import pySCPI_config
 import xml.etree.ElementTree as ET
 import pySCPI_formatting
@@ -112,6 +117,39 @@ def Load_XML(gui):
     # open window to fet filename to open
     filename = TKFD.askopenfilename(**file_opt)
 
+    # determine if a file was actually selected
+    if (filename != ''): 
+        
+        # read the commands and settings from the file
+        new_fields, device_detected = read_XML(filename)
+        
+        # update the filename display window to show the filename loaded   
+        gui.update_filename(filename = filename)
+        
+        # update the gui
+        gui.update_fields(new_fields, device_detected)
+        
+    else:
+        # no file was loaded
+        gui.output_clear()       
+        print '*** No file given to Load ***'
+    # end if
+    
+    # unlock buttons
+    gui.action_lock('Unlock')
+# end def
+
+  
+def read_XML(filename):
+    """
+    Function to read a command set, delays and address from a saved xml 
+    file.
+    
+    @param[in]  filename:    The xml file to read (string).
+    @return     (tuple)      The commands, address and delays read 
+                             (pySCPI_config.write_directives) and the 
+                             device detected in the commands (string).
+    """
     # define the values to read in
     commands = []
     ascii_delay = '0'
@@ -128,152 +166,137 @@ def Load_XML(gui):
     first_bitrate = True
     ascii_last = False
     
-    # determine if a file was actually selected
-    if (filename != ''): 
-        
-        # a file was so extract open the file
-        xml = open(filename, 'r')
-        
-        # split ithe XML into a list of lines
-        xml_strip = [line.strip() for line in xml]
-        
-        # iterate through the lines
-        for line in xml_strip:
-            
-            # determine what each file in the xml is
-            if line.startswith('<!--'):
-                # this is a comment that could conatin command information
-                if config_found:
-                    # all of the configuration comments have been found, 
-                    # leaving only the command comments, 
-                    # thus this is a command
-                    
-                    # strip out the command
-                    command = line[4:-3]
-                    
-                    # append to the command list
-                    commands = commands + [command]
-                    
-                    # see if device information can be extracted from it
-                    if not (command.startswith('SUP') or \
-                            command.startswith('<')):
-                        # detect the device name
-                        device_detected = command.split(':')[0]
-                    # end if
-                    
-                else:
-                    # line is the configuration command
-                    config_found = True
+    # open the file
+    xml = open(filename, 'r')
+    
+    # split ithe XML into a list of lines
+    xml_strip = [line.strip() for line in xml]
+    
+    # iterate through the lines
+    for line in xml_strip:
+    
+        # determine what each file in the xml is
+        if line.startswith('<!--'):
+            # this is a comment that could conatin command information
+            if config_found:
+                # all of the configuration comments have been found, 
+                # leaving only the command comments, 
+                # thus this is a command
+    
+                # strip out the command
+                command = line[4:-3]
+    
+                # append to the command list
+                commands = commands + [command]
+    
+                # see if device information can be extracted from it
+                if not (command.startswith('SUP') or \
+                        command.startswith('<')):
+                    # detect the device name
+                    device_detected = command.split(':')[0]
                 # end if
-                
-                # is it an ascii command
-                ascii_last = ('ascii' in line)
-                
-            elif line.startswith('<sleep'):
-                # delay found so strip out the delay
-                temp_delay = [s for s in line.split('"') if s.isdigit()][0]
-                
-                if not ascii_last:
-                    # not an ascii delay
-                    
-                    if ('sleep' not in previous_line) and (delay == '0'):
-                        # the first standard delay so update the delay
-                        delay = temp_delay  
-                        
-                    elif ('sleep' in previous_line):
-                        # it is an additional delay
-                        
-                        # strip out the delay time
-                        time = line.split('"')[1]
-                        
-                        # add the command
-                        commands = commands + ['<DELAY ' + time + '>']                        
-                    # end if
-                    
-                elif (ascii_delay == '0'):
-                    # is the first ascii delay so strip out that delay
-                    ascii_delay = line.split('"')[1]
-                # end
-                
-            elif line.startswith('<i2c_write'):
-                # command is a write command so find the address
-                index = line.index('"')
-                address = '0x' + line[index+3:index+5]
-                
-                if first_address == '0':
-                    # this is the first address
-                    first_address = address
-                                        
-                elif (address != last_address) and \
-                     ('<READ' not in previous_line) and \
-                     ('<WRITE' not in previous_line):
-                    # an address change has happened
-                
-                    if commands[-1].startswith('<'):
-                        # add the address change
-                        commands = commands + ['<ADDRESS '+address+'>']
-                        
-                    else:
-                        # needs to be added before the last command
-                        commands.insert(-1,'<ADDRESS ' + address + '>')
-                    # end if
-                # end if   
-                
-                # store the last address
-                last_address = address                    
-            
-            elif 'bitrate' in line:
-                # the line is a bitrate setting line
-                if first_bitrate:
-                    # it is the default line so should be ignored
-                    first_bitrate = False
-                
+    
+            else:
+                # line is the configuration command
+                config_found = True
+            # end if
+    
+            # is it an ascii command
+            ascii_last = ('ascii' in line)
+    
+        elif line.startswith('<sleep'):
+            # delay found so strip out the delay
+            temp_delay = [s for s in line.split('"') if s.isdigit()][0]
+    
+            if not ascii_last:
+                # not an ascii delay
+    
+                if ('sleep' not in previous_line) and (delay == '0'):
+                    # the first standard delay so update the delay
+                    delay = temp_delay  
+    
+                elif ('sleep' in previous_line) or \
+                     previous_line.startswith('<!--<'):
+                    # it is an additional delay
+    
+                    # strip out the delay time
+                    time = line.split('"')[1]
+    
+                    # add the command
+                    commands = commands + ['<DELAY ' + time + '>']                        
+                # end if
+    
+            elif (ascii_delay == '0'):
+                # is the first ascii delay so strip out that delay
+                ascii_delay = line.split('"')[1]
+            # end
+    
+        elif line.startswith('<i2c_write'):
+            # command is a write command so find the address
+            index = line.index('"')
+            address = '0x' + line[index+3:index+5]
+    
+            if first_address == '0':
+                # this is the first address
+                first_address = address
+    
+            elif (address != last_address) and \
+                 ('<READ' not in previous_line) and \
+                 ('<WRITE' not in previous_line):
+                # an address change has happened
+    
+                if commands[-1].startswith('<'):
+                    # add the address change
+                    commands = commands + ['<ADDRESS '+address+'>']
+    
                 else:
-                    # it is a change in bitrate so it should be processed
-                    rate = line.split('"')[1]
-                    commands = commands + ['<BITRATE ' + rate + '>']
+                    # needs to be added before the last command
+                    commands.insert(-1,'<ADDRESS ' + address + '>')
                 # end if
-                
-            elif ('configure' in line) and not first_bitrate:
-                # it is not the first config command so it must be a change
-                # in pullups
-                
-                # set of valid states
-                states = ['<PULLUPS OFF>', '<PULLUPS ON>']
-                
-                # build the commands
-                state = int(line.split('pullups="')[1][0])
-                commands = commands + [states[state]]
+            # end if   
+    
+            # store the last address
+            last_address = address                    
+    
+        elif 'bitrate' in line:
+            # the line is a bitrate setting line
+            if first_bitrate:
+                # it is the default line so should be ignored
+                first_bitrate = False
+    
+            else:
+                # it is a change in bitrate so it should be processed
+                rate = line.split('"')[1]
+                commands = commands + ['<BITRATE ' + rate + '>']
             # end if
-            
-            # store the line
-            previous_line = line
+    
+        elif ('configure' in line) and not first_bitrate:
+            # it is not the first config command so it must be a change
+            # in pullups
+    
+            # set of valid states
+            states = ['<PULLUPS OFF>', '<PULLUPS ON>']
+    
+            # build the commands
+            state = int(line.split('pullups="')[1][0])
+            commands = commands + [states[state]]
         # end if
-        
-        # update the filename display window to show the filename loaded   
-        gui.update_filename(filename = filename)
-        
-        # wrap all the other elements to update in the gui
-        new_fields = pySCPI_config.write_directives(commands, first_address,
-                                                    delay, ascii_delay)
-        
-        # update the gui
-        gui.update_fields(new_fields, device_detected)
-        
-        # close the xml file
-        xml.close()
-        
-    else:
-        # no file was loaded
-        gui.output_clear()       
-        print '*** No file given to Load ***'
+    
+        # store the line
+        previous_line = line
     # end if
     
-    # unlock buttons
-    gui.action_lock('Unlock')
+    # close the xml file
+    xml.close()
+    
+    # wrap all the other elements
+    new_fields = pySCPI_config.write_directives(commands, first_address,
+                                                delay, ascii_delay)
+    
+    return new_fields, device_detected
 # end def
 
-  
+
 def update_gui_defaults(GUI_defaults):
     """ 
     Function to read in the default values for GUI parameters from XML
@@ -281,17 +304,17 @@ def update_gui_defaults(GUI_defaults):
     @param[in/out] GUI_defaults:  Default values for a set of parameters 
                                   used to construct the gui. These values
                                   get modified by this fuction.
-                                  (pySCPI_gui.gui_defaults)
+                                  (pySCPI_config.gui_defaults)
     """
     # failure flag
     config_import_error = False
     
     # xml source directory
-    src_dir = os.getcwd() + '\\src'
+    src_dir = os.path.join(os.getcwd(), 'src')
     
     # attempt to parse the xml file and get it's root
     try:
-        tree = ET.parse(src_dir + '\\pySCPI_config.xml')
+        tree = ET.parse(os.path.join(src_dir, 'pySCPI_config.xml'))
         root = tree.getroot()
         
     except (IOError, ET.ParseError):
@@ -338,6 +361,47 @@ def update_gui_defaults(GUI_defaults):
                                        'pySCPI_config.xml ***')   
             # end if
         # end for
+        
+        # list of optional tags that keep their default if missing
+        option_tags = ['transaction_mode', 'read_mode', 'overrun_policy',
+                       'interleave', 'response_cache', 'transport']
+        
+        # iterate through the optional tags
+        for tag in option_tags:
+            # find each tag
+            option_element = root.findall(tag)
+            
+            # only update the option if it is declared once
+            if len(option_element) == 1:
+                # convert it to text
+                option_text = option_element[0].text
+                
+                # update the appropriate field
+                if tag == 'transaction_mode':
+                    GUI_defaults.update_transaction_mode(option_text)
+                    
+                elif tag == 'read_mode':
+                    GUI_defaults.update_read_mode(option_text)
+                    
+                elif tag == 'overrun_policy':
+                    GUI_defaults.update_overrun_policy(option_text)
+                    
+                elif tag == 'interleave':
+                    GUI_defaults.update_interleave(option_text)
+                    
+                elif tag == 'response_cache':
+                    GUI_defaults.update_response_cache(option_text)
+                    
+                elif tag == 'transport':
+                    GUI_defaults.update_transport(option_text)
+                # end if
+                
+            elif len(option_element) > 1:
+                GUI_defaults.log_error('*** There is the wrong number '
+                                       'of ' + tag + ' declarations in '
+                                       'pySCPI_config.xml ***')   
+            # end if
+        # end for
               
         # find the default addresses
         address_elements = root.findall('addresses')
@@ -386,11 +450,11 @@ def update_commands(SCPI_library):
     config_import_error = False
     
     # xml source directory
-    src_dir = os.getcwd() + '\\src'
+    src_dir = os.path.join(os.getcwd(), 'src')
     
     # try to parse the xml file and get it's root
     try:
-        tree = ET.parse(src_dir + '\\SCPI_Commands.xml')
+        tree = ET.parse(os.path.join(src_dir, 'SCPI_Commands.xml'))
         root = tree.getroot()
         
     except (IOError, ET.ParseError):
@@ -430,7 +494,8 @@ def update_commands(SCPI_library):
                     # all the required attributes exist so add the command
                     SCPI_library.add_command(command.get('name'),
                                             command.get('data_length'),
-                                            command.get('data_format'))
+                                            command.get('data_format'),
+                                            command.get('cache'))
                         
                 else:
                     # the command is incorrectly defined in the xml
@@ -500,6 +565,12 @@ def create_XML(directives, gui):
     # delay
     ET.SubElement(aardvark, 'sleep', delay_attributes)    
     
+    if any(command.startswith('<LOOP ') for command in commands):
+        # Control Center has no loops to repeat the commands with
+        print '*** Warning, Control Center will only run the commands '\
+              'inside each <LOOP x> once ***'
+    # end if
+    
     # iterate through commands
     for command in commands: 
         
@@ -693,6 +764,13 @@ def update_XML(command, address, XML):
             new_address = command_arg     
         # end if
     
+    elif command_list[0] in ['<PERIOD', '<ADAPTER', '<LOOP', '<END',
+                             '<WAIT_UNTIL', '<BULK']:
+        # sampling periods, adapters, loops, waits and bulk writes only 
+        # apply when pySCPI runs the commands so they are kept as comments,
+        # the body of a loop is written once rather than once per iteration
+        XML.append(ET.Comment(command))
+    
     elif (command_list[0] == '<BITRATE') and command_arg.isdigit():
         # is a good bitrate so change the bitrate
         rate_attributes = {'khz': str(command_arg)}
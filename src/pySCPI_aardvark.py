@@ -22,16 +22,27 @@ __version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
 # -------
 # Imports
 
-import aardvark_py
 import pySCPI_formatting
-import tkFileDialog as TKFD
-import time
+try:
+    import tkFileDialog as TKFD 
+except ImportError:
+    # only the GUI asks for files so the command line runs without Tk
+    TKFD = None
+# end try
 import pySCPI_config
+import pySCPI_latency
+import pySCPI_health
+import pySCPI_cache
+import pySCPI_plan
+import pySCPI_scheduler
+import pySCPI_session
+import pySCPI_transport
 import pySCPI_threading
 import os
 import threading
-from array import array
 import csv
+import math
+from array import array
 
 
 # ---------
@@ -44,6 +55,193 @@ GPIO = False
 Pullups = True
 radix = 16
 Bitrate = 100
+Bus_timeout = 50 # ms a slave may stretch the clock before giving up
+
+# logging period calibration
+calibration_cycles = 5 # passes of the command list to time
+calibration_margin = 1.1 # factor of the slowest pass used as the period
+
+# descriptions of the I2C status codes that fail a transaction
+i2c_failures = {pySCPI_transport.STATUS_BUS_ERROR:  'bus error',
+                pySCPI_transport.STATUS_SLA_NACK:   'address not '\
+                                                    'acknowledged',
+                pySCPI_transport.STATUS_DATA_NACK:  'data not '\
+                                                    'acknowledged',
+                pySCPI_transport.STATUS_ARB_LOST:   'arbitration lost',
+                pySCPI_transport.STATUS_BUS_LOCKED: 'bus locked'}
+
+# write flag polling
+poll_first_ms = 5 # first read after a request
+poll_backoff = 2 # factor to grow the wait between re-reads by
+probe_poll_ms = 1 # wait between re-reads that measure the latency
+
+# <WAIT_UNTIL> polling
+wait_first_ms = 100 # wait between the first polls of a condition
+wait_max_ms = 5000 # longest wait between polls of a condition
+
+# <BULK> writes
+bulk_ready_ms = 100 # longest a module may take to accept the next chunk
+bulk_retries = 3 # attempts at writing each chunk
+bulk_reports = 4 # progress lines printed during a write
+
+
+# ---------
+# Classes
+
+class run_context:
+    """
+    Class containing the state of a single run of an execution plan.
+    
+    @attribute session     (aardvark_session)     The session of the 
+                                                  Aardvark in use.
+    @attribute aardvark    (bus_transport)        The Aardvark in use.
+    @attribute directives  (write_directives)     The directives of the run.
+    @attribute gui         (main_gui)             The gui of the run.
+    @attribute split_addrs (set)                  Addresses that do not 
+                                                  tolerate combined reads,
+                                                  shared by every run on
+                                                  the Aardvark.
+    @attribute latency     (latency_profile)      Learned response times, 
+                                                  None if not polling.
+    @attribute health      (health_monitor)       Modules that are not 
+                                                  responding, None if 
+                                                  failing modules are not
+                                                  skipped.
+    @attribute parent      (run_context)          The context whose latency
+                                                  profile is shared, None if
+                                                  this context owns it.
+    @attribute interleave  (bool)                 True if the delays of 
+                                                  telemetry requests to 
+                                                  different addresses are
+                                                  overlapped.
+    @attribute cache       (response_cache)       Telemetry replies that 
+                                                  are reused.
+    @attribute cache_hits  (set)                  Requests served from the
+                                                  cache since it was last
+                                                  cleared (plan_op).
+    """
+    def __init__(self, session, directives, gui, skip_failing = False, 
+                 parent = None):
+        """
+        Initialise the state of a run.
+        
+        @param[in]  session:         The session of the Aardvark to use 
+                                     (pySCPI_session.aardvark_session).
+        @param[in]  directives:      Instructions to direct the sending of 
+                                     data (pySCPI_config.write_directives)
+        @param[in]  gui:             Instance of the gui that started the 
+                                     run (pySCPI_gui.main_gui).
+        @param[in]  skip_failing:    OPTIONAL, True to skip the commands of
+                                     modules that stop responding (bool).
+        @param[in]  parent:          OPTIONAL, the context of another 
+                                     Aardvark in the same run to share the 
+                                     latency profile of (run_context).
+        """
+        self.session = session
+        self.aardvark = session.bus
+        self.directives = directives
+        self.gui = gui
+        self.split_addrs = session.split_addrs
+        self.latency = None
+        self.health = None
+        self.parent = parent
+        self.interleave = False
+        self.cache = pySCPI_cache.response_cache(directives.cache, 
+                                                 gui.scpi_commands)
+        self.cache_hits = set()
+        
+        if skip_failing:
+            # long runs stop sending to modules that have failed
+            self.health = pySCPI_health.health_monitor()
+        # end if
+        
+        if parent != None:
+            # every Aardvark in the run learns into the same profile
+            self.latency = parent.latency
+            
+        elif directives.read_mode in ['poll', 'learned']:
+            # polled reads measure and use the response times
+            self.latency = pySCPI_latency.load_profile()
+        # end if
+    # end def
+    
+    
+    def close(self):
+        """
+        Finish the run, saving anything that was learned during it.
+        """
+        # a shared profile is saved by the context that owns it
+        if (self.latency != None) and (self.parent == None):
+            pySCPI_latency.save_profile(self.latency)
+        # end if
+    # end def
+    
+    
+    def use_combined(self, op):
+        """
+        Determine if a telemetry request should be read with a combined 
+        write+read transaction.
+        
+        @param[in]  op:      The telemetry request (pySCPI_plan.plan_op).
+        @return     (bool)   True if a combined transaction should be tried.
+        """
+        # ascii replies have no write flag to validate the read with
+        return (self.directives.transaction == 'combined') and \
+               op.preamble and (op.addr not in self.split_addrs)
+    # end def
+    
+    
+    def use_polling(self, op):
+        """
+        Determine if a telemetry reply should be polled for rather than 
+        read after the full delay.
+        
+        @param[in]  op:      The telemetry request (pySCPI_plan.plan_op).
+        @return     (bool)   True if the write flag should be polled.
+        """
+        # only replies with a write flag can be polled
+        return (self.latency != None) and op.preamble and \
+               (self.gui.scpi_commands.wflag_size > 0)
+    # end def
+# end class
+
+
+class pending_read:
+    """
+    Class containing a telemetry request that has been sent and whose reply
+    has not yet been read.
+    
+    @attribute op        (plan_op) The telemetry request.
+    @attribute sent_time (float)   Monotonic time the request was sent.
+    @attribute deadline  (float)   Monotonic time the reply must be read by.
+    @attribute read_time (float)   Monotonic time of the next read.
+    @attribute wait_ms   (float)   The wait before the next read in ms.
+    @attribute polling   (bool)    True if the write flag is polled.
+    @attribute probing   (bool)    True if the read measures the latency.
+    """
+    def __init__(self, op, context):
+        """
+        Initialise a request that has just been sent.
+        
+        @param[in]  op:       The telemetry request (pySCPI_plan.plan_op).
+        @param[in]  context:  The state of the run (run_context).
+        """
+        self.op = op
+        self.sent_time = pySCPI_scheduler.monotonic()
+        self.deadline = self.sent_time + op.read_delay/1000.0
+        self.polling = context.use_polling(op)
+        self.probing = self.polling and \
+                       context.latency.probe(op.addr, op.command)
+        
+        if self.polling:
+            self.wait_ms = first_poll_ms(op, context, self.probing)
+        else:
+            self.wait_ms = op.read_delay
+        # end if
+        
+        self.read_time = self.sent_time + self.wait_ms/1000.0
+    # end def
+# end class
 
 
 #
@@ -85,7 +283,13 @@ def Write_I2C(gui):
     
     # construct the writing directives
     directives = pySCPI_config.write_directives(command_list, addr_num,
-                                                delay_time, ascii_time)
+                                                delay_time, ascii_time,
+                                                transaction = 
+                                                gui.defaults.transaction_mode,
+                                                read_mode = 
+                                                gui.defaults.read_mode,
+                                                cache = 
+                                                gui.defaults.response_cache)
     
     # define the thread to perform the writing
     write_thread = threading.Thread(target = pySCPI_threading.I2C_thread, 
@@ -161,7 +365,12 @@ def start_logging(gui):
         # construct the writing directives
         directives = pySCPI_config.write_directives(command_list, addr_num,
                                                     delay_time, ascii_time,
-                                                    logging_time)        
+                                                    logging_time,
+                                                    gui.defaults.transaction_mode,
+                                                    gui.defaults.read_mode,
+                                                    gui.defaults.overrun_policy,
+                                                    gui.defaults.interleave == 'on',
+                                                    gui.defaults.response_cache)
         
         # define the logging thread
         log_thread = threading.Thread(target = pySCPI_threading.I2C_log_thread, 
@@ -182,87 +391,6 @@ def start_logging(gui):
 # end def
 
 
-def update_aardvark(command, address, Aardvark_in_use):
-    """
-    Perform the configureation requested by a config command
-    
-    @param[in]  command:         The configuration command requested 
-                                 (string).
-    @param[in]  address:         The current I2C slave address in use 
-                                 (int).
-    @param[in]  AArdvark_in_use: The aardvark port in use 
-                                 (aardvark_py.Aardvark).
-    @return     (int)            The new I2C address to use 
-                                 (potentially unchanged).
-    """    
-    new_address = address
-    # determine the appropriate action to take
-    if 'DELAY ' in command:
-        delay_time = query_delay_command(command)
-        aardvark_py.aa_sleep_ms(delay_time) 
-    elif 'ADDRESS ' in command:
-        # strip out the number
-        address_list = command.split(' ')
-        address_hex = address_list[1][0:-1]
-        # verify that it is a number and that the beginning of the 
-        # command was correct
-        if address_hex.startswith('0x') and (len(address_hex) == 4) and \
-           pySCPI_config.is_hex(address_hex[2:]) and \
-           (address_list[0] == '<ADDRESS'):
-            # is a good address
-            new_address = int(address_hex,16)
-            print 'Changed slave I2C address to ' + address_hex + '.'
-        else:
-            # the adderss is invlaid
-            print '*** The requested ADDRESS command is not valid. '\
-                  'Use <ADDRESS 0xYY>***'
-        # end if        
-    
-    elif 'BITRATE ' in command:
-        # strip out the number
-        speed_list = command.split(' ')
-        speed_num = speed_list[1][0:-1] 
-        if speed_num.isdigit() and (speed_list[0] == '<BITRATE'):
-            # is a good bitrate
-            bitrate = aardvark_py.aa_i2c_bitrate(Aardvark_in_use, int(speed_num))
-            aardvark_py.aa_sleep_ms(200)             
-            print 'Changed I2C bitrate to ' + str(bitrate) + 'kHz.'
-        else:
-            # the bitrate is invlaid
-            print '*** The requested BITRATE command is not valid. '\
-                  'Use <BITRATE x>***'
-        # end if         
-        
-    elif 'PULLUPS ' in command:
-        # check command
-        if command == '<PULLUPS ON>':
-            # turn pullups on
-            aardvark_py.aa_i2c_pullup(Aardvark_in_use, 
-                                      aardvark_py.AA_I2C_PULLUP_BOTH)
-            aardvark_py.aa_sleep_ms(200)   
-            print 'Turned I2C pullups on.'
-        
-        elif command == '<PULLUPS OFF>':
-            # turn pullups off
-            aardvark_py.aa_i2c_pullup(Aardvark_in_use, 
-                                      aardvark_py.AA_I2C_PULLUP_NONE)
-            aardvark_py.aa_sleep_ms(200)  
-            print 'Turned I2C pullups off.'
-        
-        else:
-            print '*** Invalid Pullup Command, use either '\
-                  '<PULLUPS ON> or <PULLUPS OFF>***'
-        #end if  
-        
-    else:
-        print '*** The configuration command requested in not valid, '\
-              'refer to Read Me***'
-    # end if  
-    
-    return new_address
-# end def
-
-
 def write_aardvark(directives, gui):
     """
     Write to the slave device using the Aardvark and print its results 
@@ -276,103 +404,30 @@ def write_aardvark(directives, gui):
                 None         Otherwise.
     """    
     # local copy of the write directives
-    dec_addr = directives.addr
-    commands = directives.command_list
     Delay = directives.delay_time
-    Ascii_delay = directives.ascii_time
+    
+    # compile the commands into an execution plan
+    plan = pySCPI_plan.compile_plan(directives, gui)
     
     # configure the progress bar
-    gui.progress.config(maximum = len([c for c in commands if not c.startswith('#')]))
+    gui.progress.config(maximum = plan.steps())
     
-    # configure Aardvark if available
-    Aardvark_in_use = configure_aardvark()
+    # configure every Aardvark used if available
+    workers = start_workers(plan, directives, gui)
     
-    # Check to see if an Aardvark was actually found
-    if Aardvark_in_use != None:
-        # iterate through commands and add them to the aardvark file
-        command_count = 0
-        for command in commands:
-            
-            # ignore comment lines that start with a #
-            if command.startswith('#'):
-                command_count +=1
-                continue
-            # end if
-            
-            # find the line of execution and highlight it
-            gui.highlight_line(command_count)
-            
-            # determine if the command is a configuration command
-            if pySCPI_config.is_config(command):
-                # configure the system based on the config command
-                dec_addr = update_aardvark(command, dec_addr, Aardvark_in_use)
-                
-            else:
-                # Prepare the data for transmission
-                if pySCPI_config.is_raw_write(command):
-                    # it is a raw write command to send that
-                    send_raw_command(command, Aardvark_in_use)
-                    
-                elif pySCPI_config.is_raw_read(command):
-                    # it is a rew read command so read the data
-                    read_raw_command(command, Aardvark_in_use)
-                    
-                else:
-                    # it is a normal command
-                    send_scpi_command(command, Aardvark_in_use, dec_addr)
-                # end if
-            # end if
-            
-            if 'TEL?' in command:
-                # an I2C read has been requested
-                
-                # delay before reading the data
-                if command.endswith('ascii'):
-                    # sleep a different amount if ascii was requested
-                    aardvark_py.aa_sleep_ms(Ascii_delay)
-                    
-                else:
-                    aardvark_py.aa_sleep_ms(Delay)
-                # end if
-                
-                # define array to read data into
-                data = array('B', [1]*pySCPI_formatting.read_length(command, gui)) 
-                
-                # read from the slave device
-                read_data = aardvark_py.aa_i2c_read(Aardvark_in_use, 
-                                                    dec_addr, 
-                                                    aardvark_py.AA_I2C_NO_FLAGS, 
-                                                    data)
-                
-                # print the recieved data
-                pySCPI_formatting.print_read(command, list(read_data[1]), 
-                                             gui)
-                # end if
-            # end if
-            
-            # print an empty line
-            print ''
-            
-            # intermessage delay
-            aardvark_py.aa_sleep_ms(Delay)
-            
-            if gui.terminator.kill_event.isSet():
-                # this thread has been asked to terminate
-                break
-            # end
-            
-            # increment the progress bar
-            gui.progress.step()
-            
-            # increment the command counter
-            command_count += 1
-        # end for
+    # Check to see if the Aardvarks were actually found
+    if len(workers) > 0:
+        # run the plan on every Aardvark at once
+        pySCPI_threading.run_workers(workers, run_pass, Delay, None, None, 
+                                     0, True)
         
         # unhighlight the last row
         gui.highlight_line()
         
-        # close the AArdvark device
-        aardvark_py.aa_close(Aardvark_in_use)
+        # finish the run
+        close_workers(workers)
+        
+        # the Aardvark is left open and configured for the next run
         print 'Aardvark communications finished'
     
     else:
@@ -395,12 +450,15 @@ def log_aardvark(directives, filename, gui):
     @return     int(0):      Failed to use Aardvark.
     """     
     # unpack the write directives
-    addr = directives.addr
-    commands = directives.command_list
     Delay = directives.delay_time
-    Ascii_delay = directives.ascii_time
     logging_p = directives.logging_p
     
+    # compile the commands into an execution plan once for every cycle
+    plan = pySCPI_plan.compile_plan(directives, gui)
+    
+    # each row only has room for one reply of every read
+    warn_looped_reads(plan)
+    
     # configure the progress bar to be the correct length
     gui.progress.config(maximum = logging_p*10)
     # increment the progress bar every 100 ms
@@ -410,155 +468,90 @@ def log_aardvark(directives, filename, gui):
     csv_output = open(filename, 'wb')
     output_writer = csv.writer(csv_output, delimiter = '\t')
     
-    # create the header for the csv file
-    csv_line = create_csv_header(commands, gui)
-    
-    # write the header
-    output_writer.writerow(csv_line)     
+    # write the header with the scheduling columns after the telemetry so
+    # the telemetry columns stay where they have always been
+    output_writer.writerow(plan.header + ['Start Jitter (ms)', 
+                                          'Overrun (ms)'])     
     
-    # configure Aardvark if available
-    Aardvark_in_use = configure_aardvark()
+    # configure every Aardvark used if available
+    workers = start_workers(plan, directives, gui, True)
     
-    # Check to see if an Aardvark was actually found
-    if Aardvark_in_use != None:    
+    # Check to see if the Aardvarks were actually found
+    if len(workers) > 0:    
+        
+        for (worker_plan, context) in workers:
+            # read only lists send to other modules during each delay
+            context.interleave = directives.interleave and \
+                                 worker_plan.interleavable()
+        # end for
+        
+        if logging_p == 0:
+            # measure the command list to find the logging period
+            logging_p = calibrate_period(workers, gui, Delay)
+            gui.progress.config(maximum = logging_p*10)
+        # end if
         
-        # start the loop timer
-        start_time = time.time()
+        # decide which cycles each command is sampled in
+        table = pySCPI_scheduler.timetable(plan, logging_p, Delay)
+        
+        if table.multi_rate and (table.peak_ms > logging_p*1000):
+            # even with the slow commands staggered a cycle will overrun
+            print '*** Warning, the busiest logging cycle needs about ' + \
+                  str(int(table.peak_ms)) + 'ms which is longer than the '\
+                  'logging period ***'
+        # end if
+        
+        # start the first cycle now and the rest on a fixed grid
+        scheduler = pySCPI_scheduler.cycle_scheduler(logging_p,
+                                                     directives.overrun)
         
         # loop until the thread is asked to exit
         while not gui.terminator.kill_event.isSet():
             
-            # define variables for the row
-            csv_row = []
-            dec_addr = addr
-            first_timestamp = ''
+            # the cells logged by each operation performed this cycle
+            cells = {}
             
-            # iterate through commands and add them to the aardvark file
-            command_count = 0
-            # commands that start with # are deemed comments
-            for command in commands:
-                
-                # skip comments that start with #
-                if command.startswith('#'):
-                    command_count += 1
-                    continue
-                # end if
-                
-                gui.highlight_line(command_count)
-                
-                # determine if the command is a configuration command
-                if pySCPI_config.is_config(command):
-                    # configure the system based on the config command
-                    dec_addr = update_aardvark(command, dec_addr, 
-                                               Aardvark_in_use)
-                    
-                else:
-                    # Prepare the data for transmission
-                    if pySCPI_config.is_raw_write(command):
-                        # it is a raw write command to send that
-                        send_raw_command(command, Aardvark_in_use)
-                        
-                    elif pySCPI_config.is_raw_read(command):
-                        # it is a rew read command so read the data and 
-                        # add it to the csv row
-                        csv_row.append(read_raw_command(command, 
-                                                        Aardvark_in_use,
-                                                        logging = True))
-                        
-                    else:
-                        # it is a normal command
-                        send_scpi_command(command, Aardvark_in_use, 
-                                          dec_addr)
-                    # end if
-                # end if
-                
-                if 'TEL?' in command:
-                    # the command is telemetry so log that
-                    
-                    # is it an ascii command
-                    if command.endswith('ascii'):
-                        # perform as ascii dealy
-                        aardvark_py.aa_sleep_ms(Ascii_delay)
-                        
-                    else:
-                        # perform a regular intermessage delay
-                        aardvark_py.aa_sleep_ms(Delay)
-                    # end if
-                    
-                    # define array to read data into
-                    data = array('B', [1]*pySCPI_formatting.read_length(command, gui)) 
-                    
-                    # read from the slave device
-                    read_data = aardvark_py.aa_i2c_read(Aardvark_in_use, 
-                                                        dec_addr, 
-                                                        aardvark_py.AA_I2C_NO_FLAGS, 
-                                                        data)
-                    
-                    # print data
-                    pySCPI_formatting.print_read(command, 
-                                                 list(read_data[1]), 
-                                                 gui)
-                    
-                    # log data
-                    pySCPI_formatting.log_read(command, list(read_data[1]),
-                                               csv_row, gui)
-                # end if
-                
-                # print a blank line
-                print ''
-                
-                # intermessage delay
-                aardvark_py.aa_sleep_ms(Delay)
-                
-                # check to see if logging needs to stop
-                if gui.terminator.kill_event.isSet():
-                    # End if a stop has been issued
-                    break            
-                # end if
-                
-                command_count += 1
-            # end while
-            
-            # get the earliest timestamp from the row
-            first_timestamp = csv_row[0]
-            
-            # check to see if it is actually a timestamp
-            if type(first_timestamp) == float:
-                # it is a timestamp so convert it to a byte array of 
-                # the  elapsed time in hundredths of a second
-                timestamp_list = [ord(x) for x in '[1:' + 
-                                  str(int(first_timestamp*100)) + ']']
-                
-                # convert the byte list to an ascii time
-                timestamp_string = pySCPI_formatting.get_ascii_time(timestamp_list)
-                
-                # insert this timestamp at the beginning of the row
-                csv_row.insert(0,timestamp_string)
-                
-            else:
-                # the first entry is not a timestamp so leave it blank
-                csv_row.insert(0,'-')
-            # end if
+            for (worker_plan, context) in workers:
+                context.cache_hits.clear()
+            # end for
+            
+            # run the cycle on every Aardvark at once
+            pySCPI_threading.run_workers(workers, run_pass, 
+                                         scheduler.delay_ms(Delay), cells, 
+                                         table, scheduler.slot)
+            
+            # cached replies carry the time they were first read
+            cached = set()
+            for (worker_plan, context) in workers:
+                cached.update(context.cache_hits)
+            # end for
+            
+            # put the cells together in the order of the header
+            csv_row = assemble_row(plan.ops, cells, cached)
+            
+            # end the cycle and find whether it overran its slot
+            scheduler.advance()
             
-            # write the row to the log file
-            output_writer.writerow(csv_row)      
+            # line the scheduling cells up under their header columns
+            csv_row.extend([''] * (len(plan.header) - len(csv_row)))
+            
+            # record how late this cycle started and how far it overran
+            csv_row.append('%.1f' % scheduler.jitter_ms)
+            csv_row.append('%.1f' % scheduler.overrun_ms)
+            
+            if len(cells) > 0:
+                # write the row to the log file
+                output_writer.writerow(csv_row)      
+            # end if
             
             # unhighlight the last row
             gui.highlight_line()                 
             
             # pace the loop to the correct logging period
-            while (time.time() - start_time) < logging_p:
-                # sleep to prevent resource hogging
-                time.sleep(0.1)
-                
-                # check to see if logging should end
-                if gui.terminator.kill_event.isSet():
-                    # it should so exit
-                    break
-                # end if
-            # end while
-            
-            start_time = time.time()        
+            if not scheduler.wait(gui.terminator.kill_event):
+                # logging should end
+                break
+            # end if
             
             # check to see if we can clear the gui for the next period
             if not gui.terminator.root_destroyed:        
@@ -569,6 +562,21 @@ def log_aardvark(directives, filename, gui):
             gui.progress.config(value = 0)
         # end while
         gui.progress.stop()
+        
+        # report how closely the period was kept
+        print scheduler.summary()
+        
+        # report any modules that stopped responding
+        for (worker_plan, context) in workers:
+            for health_line in context.health.report():
+                print health_line
+            # end for
+            
+            # and how many replies were reused
+            for cache_line in context.cache.report():
+                print cache_line
+            # end for
+        # end for
     
         # close the csv file
         csv_output.close()   
@@ -576,8 +584,10 @@ def log_aardvark(directives, filename, gui):
         # unhighlight the last row
         gui.highlight_line()        
         
-        # close the aardvark
-        aardvark_py.aa_close(Aardvark_in_use)
+        # finish the run
+        close_workers(workers)
+        
+        # the Aardvark is left open and configured for the next run
         print 'Aardvark logging finished'
     
     else: 
@@ -587,285 +597,1407 @@ def log_aardvark(directives, filename, gui):
 # end def
 
 
-#
-# ----------------
-# Private Functions
-
-
-def query_delay_command(command):
+def sample_aardvark(directives, gui, sections = None):
     """
-    Function to investigate a delay command, and if it is deemed valid
-    then return the delay
+    Write to the slave device using the Aardvark once and collect the 
+    telemetry read as a row like those of a log file, for runs whose 
+    results are gathered into a table.
     
-    @param[in] command:          The command to be tested and executed
-                                 (string).
-    @return    (int)             The delay to be executed in miliseconds
-                                 0 if the command is invalid
-    """  
+    @param[in]  directives:  Instructions to direct the sending of 
+                             data (pySCPI_config.write_directives)
+    @param[in]  gui:         Instance of the gui that this function is 
+                             called by (pySCPI_gui.main_gui).
+    @param[in]  sections:    OPTIONAL, the first line of each section of 
+                             the command list to give its own row, None
+                             for a single row (list of ints).
+    @return     int(0):      Failed to use Aardvark.
+                (list)       Otherwise the csv header and row of each 
+                             section (tuples of lists).
+    """
+    # local copy of the write directives
+    Delay = directives.delay_time
     
+    # compile the commands into an execution plan
+    plan = pySCPI_plan.compile_plan(directives, gui)
     
-    # strip out the number
-    delay_list = command.split(' ')
-    delay_number = delay_list[1][0:-1]
+    # each row only has room for one reply of every read
+    warn_looped_reads(plan)
     
-    # verify that it is a number and that the beginning of 
-    # the command was correct
-    if delay_number.isdigit() and (delay_list[0] == '<DELAY'):
-        # it is correct so retunr the delay period
-        print '<DELAY>:\t\t ' + delay_number + 'ms'
-        delay = int(delay_number)
-    else:
-        # the delay is not valid
-        print '*** The requested DELAY command is not valid. '\
-              'Use <DELAY x>***'
-        delay = 0
+    if sections == None:
+        sections = [0]
     # end if
     
-    return delay
-# end def
-
-def configure_aardvark():
-    """ 
-    Function to configure the aardvark for pySCPI operation if there is one
-    available.
+    # configure the progress bar
+    gui.progress.config(maximum = plan.steps())
     
-    @return  (aardvark_py.aardvark)   The handle of the aardvark to be used
-                                      'None' if there is not one available
-    """
-    # define the handle to return
-    Aardvark_in_use = None
+    # configure every Aardvark used if available
+    workers = start_workers(plan, directives, gui)
     
-    # find all connected aardvarks
-    AA_Devices = aardvark_py.aa_find_devices(1)
+    # Check to see if the Aardvarks were actually found
+    if len(workers) == 0:
+        return 0
+    # end if
     
-    # define a port mask
-    Aardvark_port = 8<<7
+    # the cells logged by each operation performed
+    cells = {}
     
-    # assume that an aardvark can be found until proved otherwise
-    Aardvark_free = True
+    # run the plan on every Aardvark at once
+    pySCPI_threading.run_workers(workers, run_pass, Delay, cells, None, 0, 
+                                 True)
     
-    # Check if there is an Aardvark present
-    if (AA_Devices[0] < 1):
-        # there is no aardvark to be found
-        print '*** No Aardvark is present ***'
-        Aardvark_free = False
-        
-    else:
-        # there is an aardvark connected to select the first one if there
-        # are many
-        Aardvark_port = AA_Devices[1][0]
-    # end if
+    # cached replies carry the time they were first read
+    cached = set()
+    for (worker_plan, context) in workers:
+        cached.update(context.cache_hits)
+    # end for
     
+    results = []
     
-    # If there is an Aardvark there is it free?
-    if Aardvark_port >= 8<<7 and Aardvark_free:
-        # the aardvark is not free
-        print '*** Aardvark is being used, '\
-              'disconnect other application or Aardvark device ***'
-        # close the aardvark
-        aardvark_py.aa_close(Aardvark_port)
-        Aardvark_free = False
-        
-    elif Aardvark_free:
-        # Aardvark is available so configure it
-        
-        # open the connection with the aardvark
-        Aardvark_in_use = aardvark_py.aa_open(Aardvark_port)
-        
-        # set it up in teh mode we need for pumpkin modules
-        aardvark_py.aa_configure(Aardvark_in_use, 
-                                 aardvark_py.AA_CONFIG_SPI_I2C)
-        
-        # default to both pullups on
-        aardvark_py.aa_i2c_pullup(Aardvark_in_use, 
-                                  aardvark_py.AA_I2C_PULLUP_BOTH)
-        
-        # set the bit rate to be the default
-        aardvark_py.aa_i2c_bitrate(Aardvark_in_use, Bitrate)
-        
-        # free the bus
-        aardvark_py.aa_i2c_free_bus(Aardvark_in_use)
-        
-        # delay to allow the config to be registered
-        aardvark_py.aa_sleep_ms(200)    
+    for (index, first_line) in enumerate(sections):
+        if index + 1 < len(sections):
+            last_line = sections[index + 1]
+        else:
+            last_line = len(directives.command_list)
+        # end if
         
-        print "Starting Aardvark communications\n"
-    # end if    
+        section = plan.section(first_line, last_line)
+        results.append((section.header, 
+                        assemble_row(section.ops, cells, cached)))
+    # end for
+    
+    # unhighlight the last row
+    gui.highlight_line()
     
-    return Aardvark_in_use
+    # finish the run
+    close_workers(workers)
+    
+    return results
 # end def
 
 
-def send_raw_command(command, Aardvark_in_use):
+#
+# ----------------
+# Private Functions
+
+def assemble_row(ops, cells, cached):
     """
-    Function to send a <RAW> command to a slave device.
-    
-    @param[in]    command:         The command to send (string).
-    @param[in]    Aardvark_in_use: The Aaardvark to use to send the command
-                                   (aardvark_py.aardvark)
+    Put the cells logged by a run together in the order of the header, 
+    led by the time of the first timestamp read.
+    
+    @param[in]  ops:     The operations of the row in the order of the 
+                         header (list of pySCPI_plan.plan_op).
+    @param[in]  cells:   The cells logged by each operation performed keyed
+                         by operation (dict).
+    @param[in]  cached:  The operations whose replies were reused (set).
+    @return     (list)   The csv row.
     """
+    # define variables for the row
+    csv_row = []
+    first_timestamp = None
     
-    # determine if it is a valid raw command
-    if pySCPI_config.is_valid_raw(command):
-        # it is so extract the data to write
-        write_data = command[:-1].split(' ')
+    for op in ops:
+        
+        if op not in cells:
+            # commands not sampled this cycle leave empty cells
+            csv_row.extend([''] * op.columns)
+            continue
+        # end if
         
-        # extract the address to write to
-        raw_addr = int(write_data[1][:-1],16)
+        # the first time stamp read in the cycle dates the row
+        if (first_timestamp == None) and op.preamble and \
+           (op not in cached) and (len(cells[op]) > 0) and \
+           (type(cells[op][0]) == float):
+            first_timestamp = cells[op][0]
+        # end if
         
-        # convert all of the data specified in the string to integers
-        int_write_data = [int(item,16) for \
-                          item in write_data[2:]]
+        csv_row.extend(cells[op])
+    # end for
+    
+    # check to see if a timestamp was read
+    if first_timestamp != None:
+        # it is a timestamp so convert it to a byte array of 
+        # the  elapsed time in hundredths of a second
+        timestamp_list = [ord(x) for x in '[1:' + 
+                          str(int(first_timestamp*100)) + ']']
         
-        # add the terminator
-        int_write_data.append(0x0a)
+        # convert the byte list to an ascii time
+        timestamp_string = pySCPI_formatting.get_ascii_time(timestamp_list)
         
-        # convert the data to an array to be compatible with the aardvark
-        data = array('B', int_write_data)  
+        # insert this timestamp at the beginning of the row
+        csv_row.insert(0,timestamp_string)
         
-        # Write the data to the slave device
-        aardvark_py.aa_i2c_write(Aardvark_in_use, raw_addr,
-                                 aardvark_py.AA_I2C_NO_FLAGS, 
-                                 data)
-        # write output
-        print 'Raw Write:\t\t[' + \
-              ' '.join([str(item) for item in write_data[2:]]) + \
-              '] to address ' + write_data[1][:-1]
-        # end if   
+    else:
+        # the first entry is not a timestamp so leave it blank
+        csv_row.insert(0,'-')
     # end if
+    
+    return csv_row
 # end def
 
 
-def read_raw_command(command, Aardvark_in_use, logging = False):
+def warn_looped_reads(plan):
     """
-    Function to read a <RAW> command from a slave device.
+    Warn about reads inside loops, which are read every iteration but 
+    only have one set of columns in a row.
     
-    @param[in]    command:         The command with the read information
-                                   (string).
-    @param[in]    Aardvark_in_use: The Aaardvark to use to read the data
-                                   (aardvark_py.aardvark).
-    @param[in]    logging:         Is the data read going to be logged. 
-                                   If so, return the data (bool).
-    @return       (string)         The data to be logged if logging 
-                                   parameter is True.
-    """    
+    @param[in]  plan:  The compiled command list (pySCPI_plan.plan).
+    """
+    for op in plan.ops:
+        if (op.repeats > 1) and (op.columns > 0):
+            print '*** Warning, ' + op.command + ' on line ' + \
+                  str(op.line + 1) + ' is read ' + str(op.repeats) + \
+                  ' times in a loop but only the last reply is logged ***'
+        # end if
+    # end for
+# end def
+
+
+
+def configure_aardvark(plan, unique_id = None):
+    """ 
+    Function to configure the aardvark for pySCPI operation if there is one
+    available. An Aardvark left open by an earlier run is reused and only
+    the settings that differ from the defaults are applied again.
+    
+    @param[in]  plan:       The plan that will be run, its leading bitrate 
+                            and pullup commands replace the defaults 
+                            (pySCPI_plan.execution_plan).
+    @param[in]  unique_id:  OPTIONAL, the unique ID of the Aardvark to use,
+                            None for the first one found (int).
+    @return  (pySCPI_session.aardvark_session) The session of the aardvark 
+                                               to be used, 'None' if there
+                                               is not one available
+    """
+    # use the aardvark from an earlier run if it is still connected
+    session = pySCPI_session.reuse_session(unique_id)
     
-    # check if the command is valid
-    if pySCPI_config.is_valid_raw(command):
-        # it is valid so break the command into parts
-        data_list = command.split(' ')
-        
-        # extract the length to read
-        data_len = int(data_list[2][:-1])
+    if session == None:
         
-        # extract the address to read from
-        raw_addr = int(data_list[1][:-1],16)
+        # find all connected aardvarks
+        AA_Devices = pySCPI_session.find_adapters()
         
-        # define the destination array
-        data = array('B', [1]*data_len)
-        
-        # read the data
-        read_data = aardvark_py.aa_i2c_read(Aardvark_in_use, raw_addr, 
-                                            aardvark_py.AA_I2C_NO_FLAGS,
-                                            data)
+        if unique_id == None:
+            # Check if there is an Aardvark present
+            if len(AA_Devices) == 0:
+                # there is no aardvark to be found
+                print '*** No Aardvark is present ***'
+                return None
+            # end if
+            
+            # there is an aardvark connected to select the first one if 
+            # there are many
+            (Aardvark_port, adapter_id, free) = AA_Devices[0]
+            
+        else:
+            # find the aardvark with the requested serial number
+            matches = [device for device in AA_Devices 
+                       if device[1] == unique_id]
+            
+            if len(matches) == 0:
+                print '*** No Aardvark with serial number ' + \
+                      pySCPI_session.serial_string(unique_id) + \
+                      ' is present ***'
+                return None
+            # end if
+            
+            (Aardvark_port, adapter_id, free) = matches[0]
+        # end if
         
-        # convert date to a string
-        data_string = ' '.join(['%02X' % x for x in list(read_data[1])])
+        # If there is an Aardvark there is it free?
+        if not free:
+            # the aardvark is not free
+            print '*** Aardvark is being used, '\
+                  'disconnect other application or Aardvark device ***'
+            return None
+        # end if
         
-        # print the result
-        print 'Raw Read:\t\t[' + data_string + '] from address ' + \
-              data_list[1][:-1]
+        # Aardvark is available so open the connection with it
+        session = pySCPI_session.open_session(Aardvark_port)
         
-        # if the data is to be logged retun the data in a string format
-        if logging:
-            return data_string
+        if session == None:
+            print '*** The Aardvark could not be opened ***'
+            return None
         # end if
-    # end if     
-# end def
-
-
-def send_scpi_command(command, Aardvark_in_use, dec_addr):
-    """
-    Function to send a SCPI command to the slave device
+        
+        # set it up in teh mode we need for pumpkin modules and fail 
+        # transactions with a module that holds the bus
+        session.bus.configure(Bus_timeout)
+    # end if
     
-    @param[in]    command:         the command to send (string)
-    @param[in]    Aardvark_in_use: The Aaardvark to use to read the data
-                                   (aardvark_py.aardvark)
-    @param[in]    dec_addr:        the decimal address to write to (int)
-    """  
+    # default to both pullups on and the default bit rate unless the plan
+    # starts by changing them, skipping whatever is already set
+    pullups = plan.initial_setting(pySCPI_plan.OP_PULLUPS)
+    bitrate = plan.initial_setting(pySCPI_plan.OP_BITRATE)
+    
+    if pullups == None:
+        pullups = Pullups
+    # end if
     
-    # convert the data into a list of bytes and append the terminator
-    write_data = list(command)
-    write_data = [ord(item) for item in write_data]
-    write_data.append(0x0a)
+    if bitrate == None:
+        bitrate = Bitrate
+    # end if
     
-    # convert to an array to be compiant with the aardvark
-    data = array('B', write_data)  
+    pullups_changed = session.set_pullups(pullups)
+    bitrate_changed = session.set_bitrate(bitrate)
     
+    # free the bus
+    session.bus.free_bus()
     
-    # Write the data to the slave device
-    aardvark_py.aa_i2c_write(Aardvark_in_use, dec_addr, 
-                             aardvark_py.AA_I2C_NO_FLAGS, data)
+    if pullups_changed or bitrate_changed:
+        # delay to allow the config to be registered
+        session.bus.sleep_ms(200)
+    # end if
     
-    # print what was done
-    if 'TEL?' in command:
-        # there is data to follow
-        print 'Read:\t\t' + command
-    else:
-        # there is not
-        print 'Write:\t\t' + command
-    # end if   
+    print "Starting Aardvark communications\n"
+    
+    return session
 # end def
 
 
-def create_csv_header(commands, gui):
+def start_workers(plan, directives, gui, skip_failing = False):
     """
-    Create a header line for the logging csv file by assiging a title to 
-    every command.
-    
-    @param[in]  commands:          the command to look at (list of strings)
-    @return     (list of strings)  The strings to form the csv header with.
-    """   
-    
-    # start the header
-    csv_line = ['Timestamp']
+    Function to configure every Aardvark that a plan uses and split the plan
+    between them.
+    
+    @param[in]  plan:          The plan that will be run 
+                               (pySCPI_plan.execution_plan).
+    @param[in]  directives:    Instructions to direct the sending of 
+                               data (pySCPI_config.write_directives)
+    @param[in]  gui:           Instance of the gui that started the run
+                               (pySCPI_gui.main_gui).
+    @param[in]  skip_failing:  OPTIONAL, True to skip the commands of 
+                               modules that stop responding (bool).
+    @return     (list)         The part of the plan run by each Aardvark 
+                               with its state (execution_plan, run_context)
+                               tuples, empty if any Aardvark is not 
+                               available.
+    """
+    # a plan with nothing to send still opens the first aardvark
+    adapters = plan.adapters() or [None]
     
-    # iterate through command list
-    for command in commands:
+    if len(adapters) == 1:
+        # the whole plan runs on a single aardvark
+        groups = [(adapters[0], adapters)]
+        
+    else:
+        # commands before the first ADAPTER command use the first aardvark
+        found = [adapter_id for (port, adapter_id, free) in 
+                 pySCPI_session.find_adapters()]
+        
+        if len(found) == 0:
+            print '*** No Aardvark is present ***'
+            return []
+        # end if
         
-        # only log telemetry requests and raw data reads
-        if 'TEL?' in command:
-            # is a telemetry request
+        groups = []
+        for adapter in adapters:
             
-            # does the command have time information
-            if pySCPI_config.has_preamble(command):
-                # can extract time data
-                csv_line.append(command + ': Time (s)')
+            if adapter == None:
+                unique_id = found[0]
+            else:
+                unique_id = adapter
             # end if
             
-            # find the print format for that command
-            print_format = gui.scpi_commands.SCPI_Data[command][1]
+            # gather the adapters that resolve to the same aardvark
+            members = [group for group in groups if group[0] == unique_id]
             
-            # check the print format
-            if ',' not in print_format:
-                # is only a single data item so append title
-                csv_line.append(command + ': Data')
-                
+            if len(members) > 0:
+                members[0][1].append(adapter)
             else:
-                # is a list so create a column for every item in the list
-                for i in range(len(print_format.split(','))):
-                    csv_line.append(command + ': Data[' + str(i) + ']')
-                # end for
-            # end if
-            
-        elif pySCPI_config.is_raw_read(command):
-            # the command is a raw_read command
-            if pySCPI_config.is_valid_raw(command):
-                # and it is a valid raw command
-                csv_line.append(command)
+                groups.append((unique_id, [adapter]))
             # end if
+        # end for
+    # end if
+    
+    workers = []
+    parent = None
+    
+    for (unique_id, members) in groups:
+        session = configure_aardvark(plan.subplan(members), unique_id)
+        
+        if session == None:
+            # a run with a missing aardvark would leave gaps in the log
+            close_workers(workers)
+            return []
         # end if
-    # end for  
+        
+        if len(groups) > 1:
+            print 'Using Aardvark ' + \
+                  pySCPI_session.serial_string(session.unique_id) + '\n'
+        # end if
+        
+        context = run_context(session, directives, gui, skip_failing, 
+                              parent)
+        
+        if parent == None:
+            # the first context owns the shared latency profile
+            parent = context
+        # end if
+        
+        workers.append((plan.subplan(members), context))
+    # end for
+    
+    return workers
+# end def
+
+
+def close_workers(workers):
+    """
+    Function to finish the run on every Aardvark.
     
-    return csv_line
-# end def
\ No newline at end of file
+    @param[in]  workers:  The part of the plan run by each Aardvark with 
+                          its state (list of (execution_plan, 
+                          run_context) tuples).
+    """
+    for (worker_plan, context) in workers:
+        context.close()
+    # end for
+# end def
+
+
+def run_pass(plan, context, delay_ms, cells = None, table = None, slot = 0, 
+             progress = False):
+    """
+    Function to perform every operation of a plan once on a single 
+    Aardvark.
+    
+    @param[in]     plan:      The plan to perform 
+                              (pySCPI_plan.execution_plan).
+    @param[in]     context:   The state of the run (run_context).
+    @param[in]     delay_ms:  The delay after each operation in ms (float).
+    @param[in/out] cells:     OPTIONAL, the cells logged by each operation
+                              performed keyed by operation, None if not 
+                              logging (dict).
+    @param[in]     table:     OPTIONAL, the cycles each operation is due in,
+                              None to perform every operation 
+                              (pySCPI_scheduler.timetable).
+    @param[in]     slot:      OPTIONAL, the logging cycle being run (int).
+    @param[in]     progress:  OPTIONAL, True to step the progress bar after
+                              each operation (bool).
+    """
+    gui = context.gui
+    
+    if context.interleave:
+        # overlap the delays of requests to different addresses
+        run_interleaved(plan, context, delay_ms, cells, table, slot)
+        return
+    # end if
+    
+    # loops are repeated as they are reached
+    for op in plan.walk():
+        
+        if (table != None) and not table.due(op, slot):
+            # slower commands are only sampled in some cycles
+            continue
+        # end if
+        
+        # highlight the line being performed
+        gui.highlight_line(op.line)
+        
+        op_cells = []
+        
+        # skipped commands are still logged as offline
+        performed = execute_op(op, context, op_cells)
+        
+        if cells != None:
+            cells[op] = op_cells
+        # end if
+        
+        if performed:
+            print ''
+            
+            # show this aardvark's results together
+            pySCPI_threading.flush_worker_output()
+            
+            # delay
+            gui.terminator.sleep_ms(delay_ms)
+        # end if
+        
+        if gui.terminator.kill_event.isSet():
+            # exit if the thread has been told to
+            break
+        # end if
+        
+        if progress:
+            # step the progress bar
+            gui.progress.step()
+        # end if
+    # end for
+# end def
+
+
+def run_interleaved(plan, context, delay_ms, cells = None, table = None, 
+                    slot = 0):
+    """
+    Function to perform every operation of a telemetry only plan once, 
+    sending requests to other addresses while earlier requests are waiting
+    for their replies. Each address has at most one request outstanding 
+    and its requests are made in the order of the plan.
+    
+    @param[in]     plan:      The plan to perform, interleavable 
+                              (pySCPI_plan.execution_plan).
+    @param[in]     context:   The state of the run (run_context).
+    @param[in]     delay_ms:  The delay after each reply before the next 
+                              request to the same address in ms (float).
+    @param[in/out] cells:     OPTIONAL, the cells logged by each operation
+                              performed keyed by operation, None if not 
+                              logging (dict).
+    @param[in]     table:     OPTIONAL, the cycles each operation is due in,
+                              None to perform every operation 
+                              (pySCPI_scheduler.timetable).
+    @param[in]     slot:      OPTIONAL, the logging cycle being run (int).
+    """
+    gui = context.gui
+    kill_event = gui.terminator.kill_event
+    
+    # requests waiting to be sent to each address in the order of the plan
+    queues = {}
+    
+    # position of each operation in the plan
+    order = dict((op, index) for (index, op) in enumerate(plan.ops))
+    
+    for op in plan.ops:
+        
+        if (table != None) and not table.due(op, slot):
+            # slower commands are only sampled in some cycles
+            continue
+            
+        elif op.kind == pySCPI_plan.OP_TELEMETRY:
+            queues.setdefault(op.addr, []).append(op)
+            
+        else:
+            # address changes and invalid commands only print a message
+            execute_op(op, context)
+            print ''
+        # end if
+    # end for
+    
+    # outstanding requests and the time each address is free again
+    pending = {}
+    free_time = {}
+    
+    while ((len(queues) > 0) or (len(pending) > 0)) and \
+          not kill_event.isSet():
+        now = pySCPI_scheduler.monotonic()
+        
+        # read the reply that has been due the longest
+        due = [request for request in pending.values() 
+               if request.read_time <= now]
+        
+        if len(due) > 0:
+            request = min(due, key = lambda r: r.read_time)
+            
+            if read_pending(request, context, cells):
+                # the address can be sent to after the intermessage delay
+                del pending[request.op.addr]
+                free_time[request.op.addr] = pySCPI_scheduler.monotonic() +\
+                                             delay_ms/1000.0
+            # end if
+            continue
+        # end if
+        
+        # send the request that is earliest in the plan to a free address
+        ready = [addr for addr in queues if (addr not in pending) and 
+                 (free_time.get(addr, 0) <= now)]
+        
+        if len(ready) > 0:
+            addr = min(ready, key = lambda a: order[queues[a][0]])
+            op = queues[addr].pop(0)
+            
+            if len(queues[addr]) == 0:
+                del queues[addr]
+            # end if
+            
+            gui.highlight_line(op.line)
+            
+            op_cells = []
+            
+            if not (skip_offline(op, context, op_cells) or 
+                    serve_cached(op, context, op_cells)):
+                raw_data = None
+                
+                if context.use_combined(op):
+                    # the reply is read in the same transaction so nothing
+                    # is left outstanding
+                    raw_data = read_combined(op, context)
+                # end if
+                
+                if raw_data == None:
+                    # send the request without waiting for the reply
+                    (status, num_written) = \
+                        context.aardvark.write(op.addr, op.write_data)
+                    
+                    if status == pySCPI_transport.STATUS_OK:
+                        pending[addr] = pending_read(op, context)
+                        continue
+                    # end if
+                    
+                    # nothing will answer so the reply is blank
+                    print op.message
+                    print_i2c_failure(status, op.addr)
+                    raw_data = list(op.fresh_buffer())
+                # end if
+                
+                finish_read(op, context, raw_data, op_cells)
+                free_time[addr] = pySCPI_scheduler.monotonic() + \
+                                  delay_ms/1000.0
+            # end if
+            
+            print ''
+            
+            if cells != None:
+                cells[op] = op_cells
+            # end if
+            
+            pySCPI_threading.flush_worker_output()
+            continue
+        # end if
+        
+        # wait for the next reply or free address
+        next_time = min([request.read_time for request in pending.values()]
+                        + [free_time[addr] for addr in queues 
+                           if addr not in pending])
+        pySCPI_scheduler.sleep_until(next_time, kill_event)
+    # end while
+# end def
+
+
+def read_pending(request, context, cells):
+    """
+    Function to read the reply to an outstanding telemetry request, 
+    re-reading later if it is being polled and is not ready yet.
+    
+    @param[in]     request:  The outstanding request (pending_read).
+    @param[in]     context:  The state of the run (run_context).
+    @param[in/out] cells:    The cells logged by each operation performed
+                             keyed by operation, None if not logging 
+                             (dict).
+    @return        (bool)    True if the request is finished.
+    """
+    op = request.op
+    
+    # read from the slave device
+    read_start = pySCPI_scheduler.monotonic()
+    (status, read_data, num_read) = \
+        context.aardvark.read(op.addr, op.fresh_buffer())
+    raw_data = list(read_data)
+    now = pySCPI_scheduler.monotonic()
+    
+    if request.polling:
+        # time left before giving up
+        remaining_ms = (request.deadline - now)*1000
+        
+        if reply_ready(op, status, raw_data, num_read):
+            if request.probing:
+                # the reply is ready so learn how long it took
+                record_latency(op, context, request.sent_time, 
+                               request.read_time, read_start)
+            # end if
+            
+        elif remaining_ms > 0:
+            # back off before the next read
+            request.wait_ms = next_poll_ms(request.wait_ms, remaining_ms,
+                                           request.probing)
+            request.read_time = now + request.wait_ms/1000.0
+            return False
+        # end if
+    # end if
+    
+    print op.message
+    
+    op_cells = []
+    finish_read(op, context, raw_data, op_cells)
+    print ''
+    
+    if cells != None:
+        cells[op] = op_cells
+    # end if
+    
+    pySCPI_threading.flush_worker_output()
+    
+    return True
+# end def
+
+
+def finish_read(op, context, raw_data, csv_row, from_bus = True):
+    """
+    Function to record, print and log the reply to a telemetry request.
+    
+    @param[in]     op:       The telemetry request (pySCPI_plan.plan_op).
+    @param[in]     context:  The state of the run (run_context).
+    @param[in]     raw_data: The data read (list of ints).
+    @param[in/out] csv_row:  The row to log read data to, None if not 
+                             logging (list).
+    @param[in]     from_bus: OPTIONAL, False if the reply came from the 
+                             cache (bool).
+    """
+    if from_bus:
+        if context.health != None:
+            # a blank reply means the module did not respond
+            context.health.record(op.addr, 
+                                  not (all(b == 1 for b in raw_data) or
+                                       all(b == 0 for b in raw_data)))
+        # end if
+        
+        # remember replies that can be reused
+        context.cache.store(op, raw_data)
+    # end if
+    
+    # print the recieved data
+    pySCPI_formatting.print_read(op.command, raw_data, context.gui)
+    
+    if csv_row != None:
+        # log data
+        pySCPI_formatting.log_read(op.command, raw_data, csv_row, 
+                                   context.gui)
+    # end if
+# end def
+
+
+def serve_cached(op, context, csv_row = None):
+    """
+    Function to print and log a telemetry reply from the cache instead of
+    reading it from the module.
+    
+    @param[in]     op:       The operation to perform 
+                             (pySCPI_plan.plan_op).
+    @param[in]     context:  The state of the run (run_context).
+    @param[in/out] csv_row:  OPTIONAL, the row to log the reply to, None 
+                             if not logging (list).
+    @return        (bool)    True if the reply was served from the cache.
+    """
+    if op.kind != pySCPI_plan.OP_TELEMETRY:
+        return False
+    # end if
+    
+    raw_data = context.cache.lookup(op)
+    
+    if raw_data == None:
+        return False
+    # end if
+    
+    print 'Cached:\t\t' + op.command
+    finish_read(op, context, raw_data, csv_row, False)
+    context.cache_hits.add(op)
+    
+    return True
+# end def
+
+
+def skip_offline(op, context, csv_row = None):
+    """
+    Function to skip an operation if its module has stopped responding.
+    
+    @param[in]     op:       The operation to perform 
+                             (pySCPI_plan.plan_op).
+    @param[in]     context:  The state of the run (run_context).
+    @param[in/out] csv_row:  OPTIONAL, the row to log placeholder cells to,
+                             None if not logging (list).
+    @return        (bool)    True if the operation should be skipped.
+    """
+    health = context.health
+    
+    if (health != None) and (op.kind in [pySCPI_plan.OP_TELEMETRY, 
+                                          pySCPI_plan.OP_WRITE]) and \
+       not health.allow(op.addr):
+        # the module is not responding so leave placeholder cells
+        print 'Skipped:\t\t' + op.command + ' (0x%02X offline)' % op.addr
+        
+        if csv_row != None:
+            csv_row.extend(['Offline'] * op.columns)
+        # end if
+        
+        return True
+    # end if
+    
+    return False
+# end def
+
+
+def execute_op(op, context, csv_row = None):
+    """
+    Function to perform a single compiled operation.
+    
+    @param[in]     op:              The operation to perform 
+                                    (pySCPI_plan.plan_op).
+    @param[in]     context:         The state of the run (run_context).
+    @param[in/out] csv_row:         OPTIONAL, the row to log read data to,
+                                    None if not logging (list).
+    @return        (bool)           False if nothing was sent because the
+                                    module is not responding or the reply
+                                    is already known.
+    """
+    # local copies of the run state
+    Aardvark_in_use = context.aardvark
+    gui = context.gui
+    health = context.health
+    
+    if skip_offline(op, context, csv_row):
+        # the module is not responding
+        return False
+        
+    elif serve_cached(op, context, csv_row):
+        # the reply is already known
+        print ''
+        return False
+    # end if
+    
+    # determine the appropriate action to take
+    if op.kind == pySCPI_plan.OP_TELEMETRY:
+        raw_data = read_telemetry(op, context)
+        
+        # record, print and log the reply
+        finish_read(op, context, raw_data, csv_row)
+        
+    elif op.kind == pySCPI_plan.OP_WAIT:
+        # poll until the condition holds
+        wait_until(op, context)
+        
+    elif op.kind == pySCPI_plan.OP_BULK:
+        # stream the image in verified chunks
+        bulk_write(op, context)
+        
+    elif op.kind == pySCPI_plan.OP_WRITE:
+        # it is a normal command
+        status = send_scpi_command(op, Aardvark_in_use)
+        
+        if health != None:
+            health.record(op.addr, status == pySCPI_transport.STATUS_OK)
+        # end if
+        
+    elif op.kind == pySCPI_plan.OP_RAW_WRITE:
+        # it is a raw write command to send that
+        send_raw_command(op, Aardvark_in_use)
+        
+    elif op.kind == pySCPI_plan.OP_RAW_READ:
+        # it is a rew read command so read the data
+        data_string = read_raw_command(op, Aardvark_in_use)
+        
+        if csv_row != None:
+            # add it to the csv row
+            csv_row.append(data_string)
+        # end if
+        
+    else:
+        # configure the system based on the config command
+        update_aardvark(op, context.session, gui.terminator)
+    # end if
+    
+    return True
+# end def
+
+
+def read_telemetry(op, context):
+    """
+    Function to send a telemetry request and read the reply.
+    
+    @param[in]  op:       The telemetry request (pySCPI_plan.plan_op).
+    @param[in]  context:  The state of the run (run_context).
+    @return     (list)    The data read (ints), left blank if the request
+                          was not acknowledged.
+    """
+    raw_data = None
+    
+    if context.use_combined(op):
+        # attempt to write and read in a single transaction
+        raw_data = read_combined(op, context)
+    # end if
+    
+    if raw_data == None:
+        # send the request
+        status = send_scpi_command(op, context.aardvark)
+        
+        if status != pySCPI_transport.STATUS_OK:
+            # nothing will answer so skip the delay and the read
+            raw_data = list(op.fresh_buffer())
+            
+        elif context.use_polling(op):
+            # read as soon as the write flag is set
+            raw_data = read_polled(op, context)
+            
+        else:
+            # delay before reading the data, a stop request reads
+            # straight away
+            context.gui.terminator.sleep_ms(op.read_delay)
+            
+            # read from the slave device
+            read_data = context.aardvark.read(op.addr, op.fresh_buffer())
+            raw_data = list(read_data[1])
+        # end if
+    # end if
+    
+    return raw_data
+# end def
+
+
+def wait_until(op, context):
+    """
+    Function to poll a telemetry request until one of its data items 
+    passes a test or the wait times out. The wait between polls starts 
+    short and doubles each time the test fails, so that short waits end
+    promptly and long waits do not load the bus.
+    
+    @param[in]  op:       The compiled wait (pySCPI_plan.plan_op).
+    @param[in]  context:  The state of the run (run_context).
+    @return     (bool)    True if the test passed.
+    """
+    gui = context.gui
+    
+    print 'Wait until:\t' + op.command + ' item ' + str(op.item) + ' ' + \
+          op.test + ' ' + str(op.target)
+    
+    start = pySCPI_scheduler.monotonic()
+    deadline = start + op.value
+    interval_ms = wait_first_ms
+    polls = 0
+    value = None
+    passed = False
+    
+    while not gui.terminator.kill_event.isSet():
+        raw_data = read_telemetry(op, context)
+        polls += 1
+        
+        # decode the reply the same way as it is logged
+        decoded = []
+        pySCPI_formatting.log_read(op.command, raw_data, decoded, gui)
+        
+        # drop the timestamp
+        data = decoded[int(op.preamble):]
+        
+        if (len(data) > op.item) and \
+           (type(data[op.item]) in [int, long, float]):
+            value = data[op.item]
+            
+            if pySCPI_plan.wait_tests[op.test](value, op.target):
+                passed = True
+                break
+            # end if
+        # end if
+        
+        remaining_ms = (deadline - pySCPI_scheduler.monotonic())*1000.0
+        
+        if remaining_ms <= 0:
+            break
+        # end if
+        
+        # poll less often the longer the wait goes on
+        gui.terminator.sleep_ms(min(interval_ms, remaining_ms))
+        interval_ms = min(interval_ms*2, wait_max_ms)
+    # end while
+    
+    elapsed = pySCPI_scheduler.monotonic() - start
+    
+    if passed:
+        print 'Condition met after ' + '%.2f' % elapsed + 's (' + \
+              str(polls) + ' polls), value ' + str(value)
+        
+    elif not gui.terminator.kill_event.isSet():
+        print '*** WAIT_UNTIL timed out after ' + '%.2f' % elapsed + \
+              's, last value ' + str(value) + ' ***'
+    # end if
+    
+    return passed
+# end def
+
+
+def bulk_write(op, context):
+    """
+    Function to write an image to a memory device in chunks. Each chunk is 
+    sent after its offset, the device is polled until it acknowledges 
+    again rather than waiting a fixed delay, and the chunk is read back to
+    verify it, being written again if it does not match.
+    
+    @param[in]  op:       The compiled bulk write (pySCPI_plan.plan_op).
+    @param[in]  context:  The state of the run (run_context).
+    @return     (bool)    True if the whole image was written and verified.
+    """
+    gui = context.gui
+    image = op.write_data
+    chunk_size = op.value
+    
+    print op.message
+    
+    start = pySCPI_scheduler.monotonic()
+    next_report = 1
+    retries = 0
+    
+    for offset in range(0, len(image), chunk_size):
+        
+        if gui.terminator.kill_event.isSet():
+            print '*** Bulk write stopped at byte ' + str(offset) + ' ***'
+            return False
+        # end if
+        
+        # the chunk is led by its offset in the image, high byte first
+        header = array('B', [(offset >> (8*i)) & 0xFF for i in 
+                             reversed(range(pySCPI_plan.bulk_offset_size))])
+        chunk = image[offset:offset + chunk_size]
+        
+        for attempt in range(bulk_retries):
+            if write_chunk(op, context, header, chunk):
+                break
+            # end if
+            
+            retries += 1
+        else:
+            print '*** Bulk write failed to verify bytes ' + str(offset) + \
+                  ' to ' + str(offset + len(chunk) - 1) + ' ***'
+            return False
+        # end for
+        
+        # report progress a few times rather than for every chunk
+        written = offset + len(chunk)
+        
+        if written*bulk_reports >= next_report*len(image):
+            print str(written) + ' of ' + str(len(image)) + ' bytes written'
+            next_report = written*bulk_reports//len(image) + 1
+        # end if
+    # end for
+    
+    elapsed = max(pySCPI_scheduler.monotonic() - start, 0.001)
+    
+    print 'Bulk write of ' + str(len(image)) + ' bytes verified in ' + \
+          '%.2f' % elapsed + 's (' + str(int(len(image)/elapsed)) + \
+          ' bytes/s, ' + str(retries) + ' chunks rewritten)'
+    
+    return True
+# end def
+
+
+def write_chunk(op, context, header, chunk):
+    """
+    Function to write one chunk of a bulk write and read it back.
+    
+    @param[in]  op:       The compiled bulk write (pySCPI_plan.plan_op).
+    @param[in]  context:  The state of the run (run_context).
+    @param[in]  header:   The offset of the chunk (array).
+    @param[in]  chunk:    The bytes to write (array).
+    @return     (bool)    True if the chunk was acknowledged and read back
+                          unchanged.
+    """
+    # write the offset and the data in one transaction
+    (status, num_written) = \
+        context.aardvark.write(op.addr, header + chunk)
+    
+    if status != pySCPI_transport.STATUS_OK:
+        print_i2c_failure(status, op.addr)
+        return False
+        
+    elif num_written != len(header) + len(chunk):
+        # the device stopped acknowledging part way through
+        return False
+    # end if
+    
+    # the device does not acknowledge until it has stored the chunk
+    if not wait_for_ack(op, context, header):
+        print '*** 0x%02X did not accept the chunk within ' % op.addr + \
+              str(bulk_ready_ms) + 'ms ***'
+        return False
+    # end if
+    
+    # read the chunk back from its offset with a repeated start
+    (status, num_written, read_data, num_read) = \
+        context.aardvark.write_read(op.addr, header, 
+                                    array('B', [0]*len(chunk)))
+    
+    return (status == pySCPI_transport.STATUS_OK) and \
+           (num_read == len(chunk)) and (list(read_data) == list(chunk))
+# end def
+
+
+def wait_for_ack(op, context, header):
+    """
+    Function to poll a device with the offset of a chunk until it 
+    acknowledges its address, which it does once it is ready again.
+    
+    @param[in]  op:       The compiled bulk write (pySCPI_plan.plan_op).
+    @param[in]  context:  The state of the run (run_context).
+    @param[in]  header:   The offset of the chunk just written (array).
+    @return     (bool)    True if the device acknowledged in time.
+    """
+    deadline = pySCPI_scheduler.monotonic() + bulk_ready_ms/1000.0
+    
+    while True:
+        (status, num_written) = \
+            context.aardvark.write(op.addr, header)
+        
+        if status == pySCPI_transport.STATUS_OK:
+            return True
+            
+        elif (pySCPI_scheduler.monotonic() >= deadline) or \
+             context.gui.terminator.kill_event.isSet():
+            return False
+        # end if
+    # end while
+# end def
+
+
+def calibrate_period(workers, gui, Delay):
+    """
+    Function to time a few passes of a plan and find the shortest logging
+    period that it can safely be run at.
+    
+    @param[in]  workers:  The part of the plan run by each Aardvark with 
+                          its state (list of (execution_plan, 
+                          run_context) tuples).
+    @param[in]  gui:      Instance of the gui that is logging 
+                          (pySCPI_gui.main_gui).
+    @param[in]  Delay:    The delay between commands in ms (int).
+    @return     (float)   The logging period to use in seconds.
+    """
+    durations = []
+    
+    print 'Calibrating the logging period...\n'
+    
+    for run in range(calibration_cycles):
+        start_time = pySCPI_scheduler.monotonic()
+        
+        # perform every operation exactly as logging would
+        pySCPI_threading.run_workers(workers, run_pass, Delay)
+        
+        durations.append(pySCPI_scheduler.monotonic() - start_time)
+        
+        if gui.terminator.kill_event.isSet():
+            # stop calibrating but still return a usable period
+            break
+        # end if
+        
+        if not gui.terminator.root_destroyed:        
+            gui.output_clear()
+        # end if
+    # end for
+    
+    gui.highlight_line()
+    
+    # leave a margin over the slowest pass and round up to 10ms
+    logging_p = math.ceil(max(durations)*calibration_margin*100)/100
+    
+    print 'Calibrated logging period: ' + str(logging_p) + 's (pass mean ' +\
+          '%.1f' % (1000*sum(durations)/len(durations)) + 'ms, max ' + \
+          '%.1f' % (1000*max(durations)) + 'ms over ' + \
+          str(len(durations)) + ' passes)\n'
+    
+    # show the period so that it can be reused
+    gui.show_logging_period(logging_p)
+    
+    return logging_p
+# end def
+
+
+def read_combined(op, context):
+    """
+    Function to send a telemetry request and read its reply in a single
+    Aardvark write+read transaction.
+    
+    @param[in]  op:                The telemetry request 
+                                   (pySCPI_plan.plan_op).
+    @param[in]  context:           The state of the run (run_context).
+    @return     (list of ints)     The data read, a blank reply if the 
+                                   request failed, or None if the module 
+                                   did not tolerate the combined read.
+    """
+    # write the request and read the reply with a repeated start
+    (status, num_written, read_data, num_read) = \
+        context.aardvark.write_read(op.addr, op.write_data, op.fresh_buffer())
+    raw_data = list(read_data)
+    
+    # the low byte holds the status of the write
+    write_status = status & 0xFF
+    
+    # the reply must be complete and have its write flag set
+    if (status == pySCPI_transport.STATUS_OK) and \
+       (num_read == op.read_length) and (raw_data[0] & 1):
+        # the combined read worked
+        print op.message
+        return raw_data
+    # end if
+    
+    # a failed combined read is not tried again on this address until the
+    # Aardvark is reopened
+    context.split_addrs.add(op.addr)
+    
+    if (status < 0) or (write_status != pySCPI_transport.STATUS_OK):
+        # the request itself failed so there is nothing to read
+        print op.message
+        print_i2c_failure(status, op.addr)
+        return list(op.fresh_buffer())
+    
+    else:
+        # read the reply with split transactions instead
+        print 'Combined read not tolerated by 0x%02X, ' % op.addr + \
+              'using split reads.'
+        return None
+    # end if
+# end def
+
+
+def first_poll_ms(op, context, probing):
+    """
+    Function to find how long to wait before the first read of a polled
+    telemetry reply.
+    
+    @param[in]  op:       The telemetry request (pySCPI_plan.plan_op).
+    @param[in]  context:  The state of the run (run_context).
+    @param[in]  probing:  True if the read measures the latency, which
+                          starts early even when a delay has been learned
+                          (bool).
+    @return     (int)     The wait in ms.
+    """
+    wait_ms = poll_first_ms
+    
+    if (context.directives.read_mode == 'learned') and not probing:
+        # start at the time this command has been seen to need
+        learned_ms = context.latency.learned_delay(op.addr, op.command)
+        
+        if learned_ms != None:
+            wait_ms = learned_ms
+        # end if
+    # end if
+    
+    return min(wait_ms, op.read_delay)
+# end def
+
+
+def next_poll_ms(wait_ms, remaining_ms, probing):
+    """
+    Function to find how long to wait before re-reading a polled telemetry 
+    reply that was not ready.
+    
+    @param[in]  wait_ms:       The wait before the last read in ms (float).
+    @param[in]  remaining_ms:  The time left before giving up in ms (float).
+    @param[in]  probing:       True if the read measures the latency, which
+                               re-reads finely rather than backing off 
+                               (bool).
+    @return     (float)        The wait in ms.
+    """
+    if probing:
+        return min(probe_poll_ms, remaining_ms)
+    # end if
+    
+    return min(wait_ms*poll_backoff, remaining_ms)
+# end def
+
+
+def reply_ready(op, status, raw_data, num_read):
+    """
+    Function to determine if a polled read returned a complete reply with 
+    its write flag set. A failed read leaves the blank template in the 
+    buffer, so its write flag cannot be trusted.
+    
+    @param[in]  op:        The telemetry request (pySCPI_plan.plan_op).
+    @param[in]  status:    The status of the read, one of 
+                           pySCPI_transport.STATUS_* (int).
+    @param[in]  raw_data:  The data read (list of ints).
+    @param[in]  num_read:  The number of bytes read (int).
+    @return     (bool)     True if the reply is ready.
+    """
+    return (status == pySCPI_transport.STATUS_OK) and \
+           (num_read == op.read_length) and bool(raw_data[0] & 1)
+# end def
+
+
+def record_latency(op, context, sent_time, read_time, read_start):
+    """
+    Function to learn how long a module took to set its write flag from a
+    probe read that found it set. A read that started later than it was 
+    due, because other requests or the host were busy, only shows that the
+    flag was set some time before and is not recorded.
+    
+    @param[in]  op:          The telemetry request (pySCPI_plan.plan_op).
+    @param[in]  context:     The state of the run (run_context).
+    @param[in]  sent_time:   Monotonic time the request was sent (float).
+    @param[in]  read_time:   Monotonic time the read was due (float).
+    @param[in]  read_start:  Monotonic time the read started (float).
+    """
+    if (read_start - read_time)*1000 <= probe_poll_ms:
+        context.latency.record(op.addr, op.command, 
+                               (read_start - sent_time)*1000)
+    # end if
+# end def
+
+
+def read_polled(op, context):
+    """
+    Function to read a telemetry reply as soon as it is ready by reading 
+    early and re-reading with a growing backoff, or every probe_poll_ms when
+    measuring the latency, until the write flag is set or the request's 
+    delay has passed.
+    
+    @param[in]  op:                The telemetry request that was sent
+                                   (pySCPI_plan.plan_op).
+    @param[in]  context:           The state of the run (run_context).
+    @return     (list of ints)     The last data read.
+    """
+    # the configured delay is the latest the reply will be read
+    sent_time = pySCPI_scheduler.monotonic()
+    deadline = sent_time + op.read_delay/1000.0
+    probing = context.latency.probe(op.addr, op.command)
+    wait_ms = first_poll_ms(op, context, probing)
+    
+    while True:
+        # wait before reading
+        read_time = pySCPI_scheduler.monotonic() + wait_ms/1000.0
+        stopped = not context.gui.terminator.sleep_ms(wait_ms)
+        
+        # read from the slave device
+        read_start = pySCPI_scheduler.monotonic()
+        (status, read_data, num_read) = \
+            context.aardvark.read(op.addr, op.fresh_buffer())
+        raw_data = list(read_data)
+        
+        # time left before giving up
+        remaining_ms = int((deadline - pySCPI_scheduler.monotonic())*1000)
+        
+        if reply_ready(op, status, raw_data, num_read):
+            if probing:
+                # the reply is ready so learn how long it took
+                record_latency(op, context, sent_time, read_time, 
+                               read_start)
+            # end if
+            return raw_data
+        
+        elif (remaining_ms <= 0) or stopped:
+            # it is too late or a stop was requested, print_read 
+            # reports the write flag that is still clear or the read that
+            # failed
+            return raw_data
+        # end if
+        
+        # back off before the next read
+        wait_ms = next_poll_ms(wait_ms, remaining_ms, probing)
+    # end while
+# end def
+
+
+def update_aardvark(op, session, terminator):
+    """
+    Perform the configureation requested by a config command
+    
+    @param[in]  op:              The compiled configuration command 
+                                 (pySCPI_plan.plan_op).
+    @param[in]  session:         The session of the aardvark in use 
+                                 (pySCPI_session.aardvark_session).
+    @param[in]  terminator:      The object that ends delays early on a 
+                                 stop request 
+                                 (pySCPI_threading.terminator_event).
+    """    
+    # determine the appropriate action to take
+    if op.kind == pySCPI_plan.OP_DELAY:
+        print op.message
+        terminator.sleep_ms(op.value) 
+        
+    elif op.kind == pySCPI_plan.OP_ADDRESS:
+        # the address was resolved when the plan was compiled
+        print op.message
+    
+    elif op.kind == pySCPI_plan.OP_BITRATE:
+        # only wait for the change to settle if one was made
+        if session.set_bitrate(op.value):
+            terminator.sleep_ms(200)             
+        # end if
+        print 'Changed I2C bitrate to ' + str(session.bitrate) + 'kHz.'
+        
+    elif op.kind == pySCPI_plan.OP_PULLUPS:
+        # turn pullups on or off
+        if session.set_pullups(op.value):
+            terminator.sleep_ms(200)   
+        # end if
+        print op.message
+    # end if  
+    
+    # invalid commands were reported when the plan was compiled
+# end def
+
+
+def send_raw_command(op, Aardvark_in_use):
+    """
+    Function to send a <RAW> command to a slave device.
+    
+    @param[in]    op:              The compiled command to send 
+                                   (pySCPI_plan.plan_op).
+    @param[in]    Aardvark_in_use: The Aaardvark to use to send the command
+                                   (pySCPI_transport.bus_transport)
+    """
+    # Write the data to the slave device
+    (status, num_written) = \
+        Aardvark_in_use.write(op.addr, op.write_data)
+    # write output
+    print op.message
+    
+    if status != pySCPI_transport.STATUS_OK:
+        print_i2c_failure(status, op.addr)
+    # end if
+# end def
+
+
+def read_raw_command(op, Aardvark_in_use):
+    """
+    Function to read a <RAW> command from a slave device.
+    
+    @param[in]    op:              The compiled command with the read 
+                                   information (pySCPI_plan.plan_op).
+    @param[in]    Aardvark_in_use: The Aaardvark to use to read the data
+                                   (pySCPI_transport.bus_transport).
+    @return       (string)         The data read, to be logged.
+    """    
+    # read the data
+    (status, read_data, num_read) = \
+        Aardvark_in_use.read(op.addr, op.fresh_buffer())
+    
+    # convert date to a string
+    data_string = ' '.join(['%02X' % x for x in list(read_data)])
+    
+    # print the result
+    print 'Raw Read:\t\t[' + data_string + ']' + op.message
+    
+    if status != pySCPI_transport.STATUS_OK:
+        print_i2c_failure(status, op.addr)
+    # end if
+    
+    return data_string
+# end def
+
+
+def send_scpi_command(op, Aardvark_in_use):
+    """
+    Function to send a SCPI command to the slave device
+    
+    @param[in]    op:              The compiled command to send 
+                                   (pySCPI_plan.plan_op).
+    @param[in]    Aardvark_in_use: The Aaardvark to use to read the data
+                                   (pySCPI_transport.bus_transport)
+    @return       (int)            The I2C status of the write, 
+                                   STATUS_OK if it was acknowledged.
+    """  
+    # Write the pre-encoded data to the slave device
+    (status, num_written) = \
+        Aardvark_in_use.write(op.addr, op.write_data)
+    
+    # print what was done
+    print op.message
+    
+    if status != pySCPI_transport.STATUS_OK:
+        print_i2c_failure(status, op.addr)
+    # end if
+    
+    return status
+# end def
+
+
+def print_i2c_failure(status, addr):
+    """
+    Function to report an I2C transaction that failed.
+    
+    @param[in]    status:  The status returned by the Aardvark (int).
+    @param[in]    addr:    The address of the slave device (int).
+    """
+    # describe the failure
+    if status in i2c_failures:
+        reason = i2c_failures[status]
+    else:
+        reason = 'Aardvark error ' + str(status)
+    # end if
+    
+    print '*** I2C transaction with 0x%02X failed: ' % addr + reason + \
+          ' ***'
+# end def
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_cache.py
+Module to reuse the replies of telemetry requests that do not change, such
+as module names and telemetry lengths, instead of reading them from the
+module every logging cycle.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_scheduler
+
+
+# ---------
+# Constants
+
+# identical replies before a reply is learned to be unchanging
+learn_reads = 10
+
+# time a learned reply is first reused for in seconds
+learn_first_s = 10.0
+
+# longest time a learned reply is reused for in seconds
+learn_max_s = 600.0
+
+
+# ---------
+# Classes
+
+class cached_reply:
+    """
+    Class containing what is known about the reply to a single request.
+
+    @attribute raw_data (list)  The reply being reused, None if the reply
+                                is not being reused.
+    @attribute payload  (list)  The last reply without its preamble.
+    @attribute repeats  (int)   The number of times in a row the payload
+                                has been read unchanged.
+    @attribute expires  (float) Monotonic time the reply must be read
+                                again by.
+    @attribute ttl_s    (float) Time the reply is reused for in seconds.
+    @attribute learned  (bool)  True if the reply was learned to be
+                                unchanging rather than declared.
+    """
+    def __init__(self):
+        """
+        Initialise a reply that is not being reused.
+        """
+        self.raw_data = None
+        self.payload = None
+        self.repeats = 0
+        self.expires = 0.0
+        self.ttl_s = learn_first_s
+        self.learned = False
+    # end def
+# end class
+
+
+class response_cache:
+    """
+    Class to serve the replies of unchanging telemetry requests without
+    using the bus. Replies declared static or given a time to live in
+    SCPI_Commands.xml are reused once read, and in learned mode replies
+    that have not changed for several reads are reused for a time that
+    doubles each time they are read again unchanged.
+
+    @attribute mode          (string) One of 'off', 'static' or 'learned'.
+    @attribute preamble_size (int)    Bytes of write flag and timestamp
+                                      before the payload.
+    @attribute entries       (dict)   cached_reply keyed by (address,
+                                      command).
+    @attribute hits          (int)    Requests served from the cache.
+    @attribute reads         (int)    Requests read from the bus.
+    """
+    def __init__(self, mode, scpi_commands):
+        """
+        Initialise an empty cache.
+
+        @param[in]  mode:           One of 'off', 'static' or 'learned'
+                                    (string).
+        @param[in]  scpi_commands:  The library of supported commands
+                                    (pySCPI_config.command_library).
+        """
+        self.mode = mode
+        self.preamble_size = scpi_commands.wflag_size + \
+                             scpi_commands.time_size
+        self.entries = {}
+        self.hits = 0
+        self.reads = 0
+    # end def
+
+
+    def lookup(self, op):
+        """
+        Get the reply to reuse for a telemetry request.
+
+        @param[in]  op:      The telemetry request (pySCPI_plan.plan_op).
+        @return     (list)   The reply to reuse, None if the request must
+                             be read from the bus.
+        """
+        if self.mode == 'off':
+            return None
+        # end if
+
+        entry = self.entries.get((op.addr, op.command))
+
+        if (entry == None) or (entry.raw_data == None) or \
+           (pySCPI_scheduler.monotonic() >= entry.expires):
+            return None
+        # end if
+
+        self.hits += 1
+
+        return entry.raw_data
+    # end def
+
+
+    def store(self, op, raw_data):
+        """
+        Record a reply read from the bus.
+
+        @param[in]  op:        The telemetry request (pySCPI_plan.plan_op).
+        @param[in]  raw_data:  The reply read (list of ints).
+        """
+        self.reads += 1
+
+        if (self.mode == 'off') or not op.preamble:
+            return
+        # end if
+
+        if (not raw_data[0] & 1) or all(b == 1 for b in raw_data) or \
+           all(b == 0 for b in raw_data):
+            # only replies that were ready can be reused
+            return
+        # end if
+
+        key = (op.addr, op.command)
+
+        if key not in self.entries:
+            self.entries[key] = cached_reply()
+        # end if
+
+        entry = self.entries[key]
+        now = pySCPI_scheduler.monotonic()
+
+        if op.cache_ttl != None:
+            # declared in the command library
+            entry.raw_data = raw_data
+            entry.expires = now + op.cache_ttl
+            return
+
+        elif self.mode != 'learned':
+            return
+        # end if
+
+        payload = raw_data[self.preamble_size:]
+
+        if payload != entry.payload:
+            # the reply changed so it has to be read every time
+            entry.payload = payload
+            entry.repeats = 1
+            entry.raw_data = None
+            entry.ttl_s = learn_first_s
+            return
+        # end if
+
+        entry.repeats += 1
+
+        if entry.raw_data != None:
+            # still the same after being reused so reuse it for longer
+            entry.ttl_s = min(entry.ttl_s*2, learn_max_s)
+
+        elif entry.repeats < learn_reads:
+            return
+        # end if
+
+        entry.raw_data = raw_data
+        entry.expires = now + entry.ttl_s
+        entry.learned = True
+    # end def
+
+
+    def report(self):
+        """
+        Describe how much the cache was used during the run.
+
+        @return     (list of strings) Lines describing the cache, empty if
+                                      nothing was served from it.
+        """
+        if self.hits == 0:
+            return []
+        # end if
+
+        lines = [str(self.hits) + ' of ' + str(self.hits + self.reads) +
+                 ' telemetry requests served from the response cache']
+
+        for (addr, command) in sorted(self.entries.keys()):
+            if self.entries[(addr, command)].learned:
+                lines.append('0x%02X ' % addr + command +
+                             ' learned to be unchanging')
+            # end if
+        # end for
+
+        return lines
+    # end def
+# end class
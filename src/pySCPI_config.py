@@ -24,6 +24,14 @@ __version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
 # Imports
 
 import os
+import pySCPI_transport
+
+
+# ---------
+# Constants
+
+# time to live of a reply that never changes
+static_ttl = float('inf')
 
 
 # ---------
@@ -41,6 +49,8 @@ class command_library:
     @attribute ascii_size  (int)  The length of an ascii request in bytes
     @attribute no_commands (bool) True if no commands have been loaded on boot
     @attribute SCPI_Data   (dict) Dictionary of all the known SCPI commands
+    @attribute cache_ttl   (dict) Seconds the reply to each command may be
+                                  reused for, static_ttl if it never changes
     @attribute error_log   (list) List of errors (strings) thrown during boot 
     """
     
@@ -72,6 +82,7 @@ class command_library:
         
         # Default command list
         self.SCPI_Data = {}
+        self.cache_ttl = {}
         self.add_command('SUP:TEL? 0', '48', 'ascii')
         self.add_command('SUP:TEL? 1', '8',  'long long')
         self.add_command('SUP:TEL? 2', '8',  'long long')
@@ -142,13 +153,17 @@ class command_library:
     # end def        
         
               
-    def add_command(self, command, length, format_string):
+    def add_command(self, command, length, format_string, cache = None):
         """ 
         Add an item to the SCPI command dictionary
         
         @param[in]  command:       The new command string (string).
         @param[in]  length:        The length of the data field (string).
         @param[in]  format_string: The format of the data returned
+        @param[in]  cache:         OPTIONAL, 'static' if the data never 
+                                   changes or the seconds it may be reused
+                                   for, None if it must always be read 
+                                   (string).
         """ 
         
         # see if no new commands have been added
@@ -156,6 +171,7 @@ class command_library:
             
             # empty the dictionary
             self.SCPI_Data = {}        
+            self.cache_ttl = {}
             
             # set the updated flag
             self.no_commands = False
@@ -187,6 +203,25 @@ class command_library:
                 # define list of formats
                 formats = ['ascii', format_string, 'uint', 'ascii']
                 
+                # names and lengths are fixed by the firmware, ascii 
+                # replies have no write flag to show they are valid so 
+                # they are never cached
+                self.cache_ttl[keys[0]] = static_ttl
+                self.cache_ttl[keys[2]] = static_ttl
+                
+                if cache == 'static':
+                    self.cache_ttl[keys[1]] = static_ttl
+                    
+                elif cache != None:
+                    try:
+                        self.cache_ttl[keys[1]] = float(cache)
+                        
+                    except ValueError:
+                        self.error_log.append('*** ' + command + 
+                                              ' cache is invalid ***')
+                    # end try
+                # end if
+                
                 # construct the four scpi commands for each command
                 for i in range(0,4):
                     
@@ -267,10 +302,23 @@ class write_directives:
     @attribute addr         (int)  The address to send commands to.
     @attribute delay_time   (int)  The time to delay between commands.
     @attribute ascii_time   (int)  The time to delay after an ascii command.
-    @attribute logging_p    (int)  The period to use for logging.
+    @attribute logging_p    (float) The period to use for logging in s,
+                                    0 to calibrate it.
+    @attribute transaction  (str)  How telemetry is read, 'split' or
+                                   'combined'.
+    @attribute read_mode    (str)  When telemetry is read, 'fixed', 
+                                   'poll' or 'learned'.
+    @attribute overrun      (str)  What logging does after a cycle 
+                                   overruns, 'skip', 'late' or 'compress'.
+    @attribute interleave   (bool) True to overlap the telemetry delays of
+                                   different addresses when logging.
+    @attribute cache        (str)  Which telemetry replies are reused, 
+                                   'off', 'static' or 'learned'.
 
     """  
-    def __init__(self, commands, address, delay, ascii, logging_p = 0):
+    def __init__(self, commands, address, delay, ascii, logging_p = 0,
+                 transaction = 'split', read_mode = 'fixed',
+                 overrun = 'skip', interleave = False, cache = 'off'):
         """
         Combine the passed vlaues into an object.
         
@@ -279,14 +327,351 @@ class write_directives:
         @param[in]     address:     The address to send to (int).
         @param[in]     delay:       The intermessage delay to use (int).
         @param[in]     ascii:       The ascii delay to use (int).
-        @param[in]     logging_p:   OPTIONAL, the logging period to use (int).
+        @param[in]     logging_p:   OPTIONAL, the logging period to use in
+                                    seconds (float).
+        @param[in]     transaction: OPTIONAL, how telemetry is read, 
+                                    'split' or 'combined' (string).
+        @param[in]     read_mode:   OPTIONAL, when telemetry is read, 
+                                    'fixed', 'poll' or 'learned' (string).
+        @param[in]     overrun:     OPTIONAL, what logging does after a 
+                                    cycle overruns, 'skip', 'late' or 
+                                    'compress' (string).
+        @param[in]     interleave:  OPTIONAL, True to overlap the telemetry
+                                    delays of different addresses when 
+                                    logging (bool).
+        @param[in]     cache:       OPTIONAL, which telemetry replies are
+                                    reused, 'off', 'static' or 'learned'
+                                    (string).
         """        
         self.command_list = commands
         self.addr = address
         self.delay_time = delay
         self.ascii_time = ascii
         self.logging_p = logging_p
+        self.transaction = transaction
+        self.read_mode = read_mode
+        self.overrun = overrun
+        self.interleave = interleave
+        self.cache = cache
+    # end def
+# end class
+
+
+class gui_defaults:
+    """
+    Class containing all of the defalut values used to build the pySCPI GUI
+    
+    @attribute default_filename (string) The default filename to save/load
+    @attribute default_delay    (int)    The default intermessage delay in ms
+    @attribute default_length   (int)    The default command length in bytes
+    @attribute default_dp       (int)    The default number of dp for floats
+    @attribute address_of       (dict)   The default module addresses
+    @attribute default_commands (list)   The default set of commands (strings)
+    @attribute transaction_mode (string) How telemetry is read, either
+                                         'split' or 'combined'
+    @attribute read_mode        (string) When telemetry is read, one of
+                                         'fixed', 'poll' or 'learned'
+    @attribute overrun_policy   (string) What logging does after a cycle
+                                         overruns, one of 'skip', 'late' 
+                                         or 'compress'
+    @attribute interleave       (string) Whether logging overlaps the 
+                                         telemetry delays of different
+                                         addresses, 'on' or 'off'
+    @attribute response_cache   (string) Which telemetry replies are reused,
+                                         one of 'off', 'static' or 'learned'
+    @attribute transport        (string) The name of the bus transport that
+                                         adapters are opened with
+    @attribute error_log        (list)   List of errors (strings) thrown on boot
+    @attribute no_commands      (bool)   True if no commands were loaded on boot
+    @attribute no_addresses     (bool)   True if no addresses were loaded
+    """
+    
+    def __init__(self):
+        """
+        Initialise the GUI_delault attributes to default values
+        """
+        # The default filename to save to and load from
+        self.default_filename = 'aardvark_script.xml'
+        
+        # The default intermessage delay to use
+        self.default_delay = 200
+        
+        # The default data length to read if a command is not recognised
+        self.default_length = 16
+        
+        # The default number of decimal places to display for a float
+        self.default_dp = 4
+        
+        # The default addresses of supported modules
+        self.address_of = {'PIM':        '0x53',
+                           'BM2':        '0x5C',
+                           'GPSRM':      '0x51',
+                           'SIM':        '0x50',
+                           'BIM':        '0x52',
+                           'BSM':        '0x58',
+                           # Non-SCPI Devices
+                           'CS EPS':     '0x2B',
+                           'ADCS CTRL':  '0x1F',
+                           'CS BAT':     '0x2A',
+                           'EXT_LIGHT':  '0x60',
+                           }
+        
+        # The default commands to display in the command window
+        self.default_commands = ['SUP:TEL? 0,name',
+                                 'SUP:TEL? 0,length',
+                                 'SUP:TEL? 0,data',
+                                 'SUP:TEL? 0,ascii',
+                                 ]
+        
+        # How telemetry requests are written and read back
+        self.transaction_mode = 'split'
+        
+        # When telemetry replies are read after a request
+        self.read_mode = 'fixed'
+        
+        # What logging does after a cycle overruns its period
+        self.overrun_policy = 'skip'
+        
+        # Whether logging overlaps telemetry delays across addresses
+        self.interleave = 'off'
+        
+        # Which telemetry replies are reused instead of read again
+        self.response_cache = 'off'
+        
+        # The bus transport that I2C transactions are sent through
+        self.transport = 'aardvark'
+        
+        # list of errors thrown during the importing of the XML file
+        self.error_log = []
+        
+        # flags to track adding commands and addresses
+        self.no_commands = True
+        self.no_addresses = True
+    # end def
+    
+    
+    def update_filename(self, new_filename):
+        """ 
+        Update the default filename to a new filename
+        
+        @param[in]  new_filename:  The new default setting (string).
+        """
+        if new_filename.endswith('.xml'):
+            self.default_filename = new_filename
+        else:
+            self.error_log.append('*** Invalid default '
+                                  'filename in xml file ***')
+        # end if  
+    # end def
+    
+    
+    def update_delay(self, new_delay):
+        """ 
+        Update the default delay to a new value
+        
+        @param[in]  new_delay:  The new default setting (string).
+        """ 
+        if new_delay.isdigit():
+            if int(new_delay) > 0:
+                self.default_delay = int(new_delay)
+            else:
+                self.error_log.append('*** Invalid default '
+                                      'delay in xml file ***')     
+            # end if
+        else:
+            self.error_log.append('*** Invalid default '
+                                  'delay in xml file ***')
+        # end if  
+    # end def   
+    
+    
+    def update_length(self, new_length):
+        """ 
+        Update the default length to a new value
+        
+        @param[in]  new_length:  The new default setting (string).
+        """ 
+        if new_length.isdigit():
+            if int(new_length) > 0:
+                self.default_length = int(new_length)
+            else:
+                self.error_log.append('*** Invalid default '
+                                      'length in xml file ***')  
+            # end if
+        else:
+            self.error_log.append('*** Invalid default '
+                                  'length in xml file ***')
+        # end if  
+    # end def      
+    
+    
+    def update_dp(self, new_dp):
+        """ 
+        Update the default number of decimal places to a new value
+        
+        @param[in]  new_dp:  The new default setting (string).
+        """ 
+        if new_dp.isdigit():
+            if int(new_dp) > 0:
+                self.default_dp = int(new_dp)
+            else:
+                self.error_log.append('*** Invalid default number of '
+                                      'decimal places in xml file ***')                
+        else:
+            self.error_log.append('*** Invalid default number of '
+                                  'decimal places in xml file ***')
+        # end if  
+    # end def 
+    
+    
+    def update_transaction_mode(self, new_mode):
+        """ 
+        Update the way telemetry is read to a new mode
+        
+        @param[in]  new_mode:  The new default setting, either 'split' 
+                               or 'combined' (string).
+        """ 
+        if new_mode in ['split', 'combined']:
+            self.transaction_mode = new_mode
+        else:
+            self.error_log.append('*** Invalid default transaction '
+                                  'mode in xml file ***')
+        # end if  
+    # end def 
+    
+    
+    def update_read_mode(self, new_mode):
+        """ 
+        Update when telemetry is read to a new mode
+        
+        @param[in]  new_mode:  The new default setting, one of 'fixed', 
+                               'poll' or 'learned' (string).
+        """ 
+        if new_mode in ['fixed', 'poll', 'learned']:
+            self.read_mode = new_mode
+        else:
+            self.error_log.append('*** Invalid default read '
+                                  'mode in xml file ***')
+        # end if  
+    # end def 
+    
+    
+    def update_overrun_policy(self, new_policy):
+        """ 
+        Update what logging does after a cycle overruns to a new policy
+        
+        @param[in]  new_policy:  The new default setting, one of 'skip', 
+                                 'late' or 'compress' (string).
+        """ 
+        if new_policy in ['skip', 'late', 'compress']:
+            self.overrun_policy = new_policy
+        else:
+            self.error_log.append('*** Invalid default overrun '
+                                  'policy in xml file ***')
+        # end if  
+    # end def 
+    
+    
+    def update_interleave(self, new_setting):
+        """ 
+        Update whether logging overlaps telemetry delays across addresses
+        
+        @param[in]  new_setting:  The new default setting, either 'on' or
+                                  'off' (string).
+        """ 
+        if new_setting in ['on', 'off']:
+            self.interleave = new_setting
+        else:
+            self.error_log.append('*** Invalid default interleave '
+                                  'setting in xml file ***')
+        # end if  
+    # end def 
+    
+    
+    def update_response_cache(self, new_mode):
+        """ 
+        Update which telemetry replies are reused to a new mode
+        
+        @param[in]  new_mode:  The new default setting, one of 'off', 
+                               'static' or 'learned' (string).
+        """ 
+        if new_mode in ['off', 'static', 'learned']:
+            self.response_cache = new_mode
+        else:
+            self.error_log.append('*** Invalid default response '
+                                  'cache mode in xml file ***')
+        # end if  
+    # end def 
+    
+    
+    def update_transport(self, new_transport):
+        """ 
+        Update the bus transport that adapters are opened with
+        
+        @param[in]  new_transport:  The name of the new transport, one of 
+                                    pySCPI_transport.transports (string).
+        """ 
+        if new_transport in pySCPI_transport.transports:
+            self.transport = new_transport
+        else:
+            self.error_log.append('*** Invalid default transport '
+                                  'in xml file ***')
+        # end if  
+    # end def 
+    
+    
+    def add_address(self, new_module, new_address):
+        """ 
+        Add the new module to the dictionary of addresses
+        
+        @param[in]  new_module:   The name of the module added(string).
+        @param[in]  new_address:  The address of the added module(string).
+        """ 
+        # check the valdity of the address
+        if (len(new_address) == 4) and new_address.startswith('0x') \
+           and is_hex(new_address[2:]):
+            # add the new address
+            if self.no_addresses:
+                self.address_of = {# Non-SCPI Devices
+                                   'CS EPS':     '0x2B',
+                                   'ADCS CTRL':  '0x1F',
+                                   'CS BAT':     '0x2A',
+                                   'EXT_LIGHT':  '0x60',
+                                   }         
+                self.no_addresses = False
+            # end if
+            
+            self.address_of[new_module] = new_address
+        else:
+            self.error_log.append('*** Invalid default address for ' +
+                                  new_module  + ' in xml file ***')    
+        # end if        
+    # end def     
+    
+
+    def add_command(self, new_command):
+        """ 
+        Append the new command to the existing list of commands
+        
+        @param[in]  new_command:  The new command to add (string).
+        """ 
+        if self.no_commands:
+            self.default_commands = [new_command]
+            self.no_commands = False
+        else:
+            self.default_commands.append(new_command) 
+    # end def    
+    
+    
+    def log_error(self, error):
+        """ 
+        Append an error to the class's error log
+        
+        @param[in]  error:  The error to log (string).
+        """         
+        self.error_log.append(error)
     # end def
+
 # end class
     
                
@@ -46,195 +46,6 @@ root_height = 600
 
 # ---------
 # Classes
-class gui_defaults:
-    """
-    Class containing all of the defalut values used to build the pySCPI GUI
-    
-    @attribute default_filename (string) The default filename to save/load
-    @attribute default_delay    (int)    The default intermessage delay in ms
-    @attribute default_length   (int)    The default command length in bytes
-    @attribute default_dp       (int)    The default number of dp for floats
-    @attribute address_of       (dict)   The default module addresses
-    @attribute default_commands (list)   The default set of commands (strings)
-    @attribute error_log        (list)   List of errors (strings) thrown on boot
-    @attribute no_commands      (bool)   True if no commands were loaded on boot
-    @attribute no_addresses     (bool)   True if no addresses were loaded
-    """
-    
-    def __init__(self):
-        """
-        Initialise the GUI_delault attributes to default values
-        """
-        # The default filename to save to and load from
-        self.default_filename = 'aardvark_script.xml'
-        
-        # The default intermessage delay to use
-        self.default_delay = 200
-        
-        # The default data length to read if a command is not recognised
-        self.default_length = 16
-        
-        # The default number of decimal places to display for a float
-        self.default_dp = 4
-        
-        # The default addresses of supported modules
-        self.address_of = {'PIM':        '0x53',
-                           'BM2':        '0x5C',
-                           'GPSRM':      '0x51',
-                           'SIM':        '0x50',
-                           'BIM':        '0x52',
-                           'BSM':        '0x58',
-                           # Non-SCPI Devices
-                           'CS EPS':     '0x2B',
-                           'ADCS CTRL':  '0x1F',
-                           'CS BAT':     '0x2A',
-                           'EXT_LIGHT':  '0x60',
-                           }
-        
-        # The default commands to display in the command window
-        self.default_commands = ['SUP:TEL? 0,name',
-                                 'SUP:TEL? 0,length',
-                                 'SUP:TEL? 0,data',
-                                 'SUP:TEL? 0,ascii',
-                                 ]
-        
-        # list of errors thrown during the importing of the XML file
-        self.error_log = []
-        
-        # flags to track adding commands and addresses
-        self.no_commands = True
-        self.no_addresses = True
-    # end def
-    
-    
-    def update_filename(self, new_filename):
-        """ 
-        Update the default filename to a new filename
-        
-        @param[in]  new_filename:  The new default setting (string).
-        """
-        if new_filename.endswith('.xml'):
-            self.default_filename = new_filename
-        else:
-            self.error_log.append('*** Invalid default '
-                                  'filename in xml file ***')
-        # end if  
-    # end def
-    
-    
-    def update_delay(self, new_delay):
-        """ 
-        Update the default delay to a new value
-        
-        @param[in]  new_delay:  The new default setting (string).
-        """ 
-        if new_delay.isdigit():
-            if int(new_delay) > 0:
-                self.default_delay = int(new_delay)
-            else:
-                self.error_log.append('*** Invalid default '
-                                      'delay in xml file ***')     
-            # end if
-        else:
-            self.error_log.append('*** Invalid default '
-                                  'delay in xml file ***')
-        # end if  
-    # end def   
-    
-    
-    def update_length(self, new_length):
-        """ 
-        Update the default length to a new value
-        
-        @param[in]  new_length:  The new default setting (string).
-        """ 
-        if new_length.isdigit():
-            if int(new_length) > 0:
-                self.default_length = int(new_length)
-            else:
-                self.error_log.append('*** Invalid default '
-                                      'length in xml file ***')  
-            # end if
-        else:
-            self.error_log.append('*** Invalid default '
-                                  'length in xml file ***')
-        # end if  
-    # end def      
-    
-    
-    def update_dp(self, new_dp):
-        """ 
-        Update the default number of decimal places to a new value
-        
-        @param[in]  new_dp:  The new default setting (string).
-        """ 
-        if new_dp.isdigit():
-            if int(new_dp) > 0:
-                self.default_dp = int(new_dp)
-            else:
-                self.error_log.append('*** Invalid default number of '
-                                      'decimal places in xml file ***')                
-        else:
-            self.error_log.append('*** Invalid default number of '
-                                  'decimal places in xml file ***')
-        # end if  
-    # end def 
-    
-    
-    def add_address(self, new_module, new_address):
-        """ 
-        Add the new module to the dictionary of addresses
-        
-        @param[in]  new_module:   The name of the module added(string).
-        @param[in]  new_address:  The address of the added module(string).
-        """ 
-        # check the valdity of the address
-        if (len(new_address) == 4) and new_address.startswith('0x') \
-           and pySCPI_config.is_hex(new_address[2:]):
-            # add the new address
-            if self.no_addresses:
-                self.address_of = {# Non-SCPI Devices
-                                   'CS EPS':     '0x2B',
-                                   'ADCS CTRL':  '0x1F',
-                                   'CS BAT':     '0x2A',
-                                   'EXT_LIGHT':  '0x60',
-                                   }         
-                self.no_addresses = False
-            # end if
-            
-            self.address_of[new_module] = new_address
-        else:
-            self.error_log.append('*** Invalid default address for ' +
-                                  new_module  + ' in xml file ***')    
-        # end if        
-    # end def     
-    
-
-    def add_command(self, new_command):
-        """ 
-        Append the new command to the existing list of commands
-        
-        @param[in]  new_command:  The new command to add (string).
-        """ 
-        if self.no_commands:
-            self.default_commands = [new_command]
-            self.no_commands = False
-        else:
-            self.default_commands.append(new_command) 
-    # end def    
-    
-    
-    def log_error(self, error):
-        """ 
-        Append an error to the class's error log
-        
-        @param[in]  error:  The error to log (string).
-        """         
-        self.error_log.append(error)
-    # end def
-
-# end class
-
 class main_gui:
     """
     Class that manages the main loop of the gui and all the actions that occur 
@@ -275,7 +86,7 @@ class main_gui:
         Construct the GUI
         
         @param[in]  default_values: The default values to load into the GUI
-                                    (pySCPI_gui.gui_defaults)
+                                    (pySCPI_config.gui_defaults)
         @param[in]  version_number: The version number for pySCPI (string)
         @param[in]  terminator:     The object to control pySCPI termination 
                                     (pySCPI_threading.terminator_event)
@@ -720,7 +531,7 @@ class main_gui:
         Begin the GUI execution after printing any start up errors
         
         @param[in]  gui_defs:     The default values to load into the GUI
-                                  (pySCPI_gui.gui_defaults)
+                                  (pySCPI_config.gui_defaults)
         @param[in]  command_defs: Library of all of the known SCPI commands 
                                   (Dictionary)
         """   
@@ -1184,48 +995,82 @@ class main_gui:
         
         @param[in] delay_time:       The intermessage delay in use (int).
         @param[in] ascii_delay:      The ascii delay in use (int).
-        @return    (int)             The logging period to be used.
+        @return    (float)           The logging period to be used in 
+                                     seconds, 0 if it should be calibrated
+                                     when logging starts.
         """      
         
         # find the amount of time taken for the all the commands to be 
-        # executed in a single iteration of the loop
-        loop_time = 0
+        # executed in a single iteration of the loop, the time of the body
+        # of each <LOOP x> is kept separately until it is ended
+        loop_times = [0]
+        loop_counts = []
         
         # add up all of the commands
         for command in [c for c in command_list if not c.startswith('#')]:
             # add up the time of all the commands in the list
             if 'ascii' in command:
                 # is ascii do add both delays
-                loop_time += (ascii_time + delay_time)
+                loop_times[-1] += (ascii_time + delay_time)
                 
             elif 'TEL?' in command:
                 # is telemetry so there are two delay periods
-                loop_time += (2*delay_time)
+                loop_times[-1] += (2*delay_time)
+                
+            elif command.startswith('<PERIOD') or \
+                 command.startswith('<ADAPTER'):
+                # sampling periods and adapters take no time to execute
+                continue
+                
+            elif command.startswith('<LOOP'):
+                # start timing the body of the loop
+                loop_count = command.split(' ')[-1][:-1]
+                loop_counts.append(int(loop_count) if loop_count.isdigit()
+                                   else 1)
+                loop_times.append(0)
+                
+            elif command == '<END LOOP>':
+                if len(loop_counts) > 0:
+                    # the body is repeated for every iteration
+                    body_time = loop_times.pop()*loop_counts.pop()
+                    loop_times[-1] += body_time
+                # end if
                 
             elif command.startswith('<DELAY'):
                 # is is a delay command so add that delay
-                delay_command = int(command.split(' ')[2][:-1])
-                loop_time += delay_command 
+                delay_command = int(command.split(' ')[1][:-1])
+                loop_times[-1] += delay_command 
                 
             else:
                 # is just a command so only add a single delay
-                loop_time += delay_time
+                loop_times[-1] += delay_time
             # end if
         # end for
         
-        # convert the loop time into seconds and round up.
-        loop_time = (loop_time/1000)+1
+        # loops that are not ended are only performed once
+        loop_time = sum(loop_times)
+        
+        # convert the loop time into seconds
+        loop_time = loop_time/1000.0
         
         
         # extract the requested logging period from the gui
         logging_text = self.logging.get()
         
-        # determine the validity of the delay
-        if logging_text.isdigit():
-            # delay is a number so it is acceptible
-            logging_time = int(logging_text)
-            
-        else:
+        if logging_text.strip().lower() == 'auto':
+            # the period will be measured once logging starts
+            return 0
+        # end if
+        
+        # determine the validity of the delay, periods shorter than a 
+        # second are allowed
+        try:
+            logging_time = float(logging_text)
+        except ValueError:
+            logging_time = 0
+        # end try
+        
+        if logging_time <= 0:
             # the logging delay is unacceptible
             print '*** Requested logging period is not valid, '\
                   'reverting to default ***'
@@ -1238,8 +1083,10 @@ class main_gui:
             
         # end if
         
-        # see if the delay is long enough
-        if logging_time <= loop_time*1.2:
+        # see if the delay is long enough, lists with sampling periods 
+        # are checked once their timetable is built
+        if (logging_time <= loop_time*1.2) and \
+           not any(c.startswith('<PERIOD') for c in command_list):
             # this is deemed to short for consistant operaton so 
             # warn the user
             print '*** Warning, logging period may be shorter than '\
@@ -1250,6 +1097,19 @@ class main_gui:
         return logging_time
     # end def
     
+    
+    def show_logging_period(self, logging_time):
+        """
+        Function to display a logging period found by calibration.
+        
+        @param[in] logging_time:     The logging period in seconds (float).
+        """
+        if not self.terminator.root_destroyed:
+            self.logging.delete(0,'end')
+            self.logging.insert(0, str(logging_time))
+        # end if
+    # end def
+    
     def comment_line(self, event):
         """
         Function to comment the current line of execution, called by 
@@ -1426,7 +1286,7 @@ def test():
     Test code for this module.
     """
     # test the gui defaults code
-    sample_gui_defaults = gui_defaults()
+    sample_gui_defaults = pySCPI_config.gui_defaults()
     
     sample_gui_defaults.update_filename('this is a test.xml')
     sample_gui_defaults.update_delay('1000')
@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_headless.py
+Module to send commands and log telemetry without the GUI, so that pySCPI
+can run unattended on machines without a display.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_config
+import pySCPI_XML
+import pySCPI_aardvark
+import pySCPI_replay
+import pySCPI_simulator
+import pySCPI_sweep
+import pySCPI_threading
+import pySCPI_transport
+import threading
+
+
+# ---------
+# Constants
+
+# time between checks for Ctrl-C while a run is in progress in seconds
+interrupt_check_s = 0.2
+
+
+# ---------
+# Classes
+
+class null_widget:
+    """
+    Class standing in for a GUI widget whose updates are not shown.
+    """
+    def config(self, **options):
+        """
+        Ignore a change to the widget.
+        """
+        pass
+    # end def
+
+
+    def step(self, amount = 1):
+        """
+        Ignore a step of a progress bar.
+        """
+        pass
+    # end def
+
+
+    def start(self, interval = 50):
+        """
+        Ignore the start of a progress bar.
+        """
+        pass
+    # end def
+
+
+    def stop(self):
+        """
+        Ignore the end of a progress bar.
+        """
+        pass
+    # end def
+# end class
+
+
+class fixed_setting:
+    """
+    Class standing in for a GUI variable that does not change.
+
+    @attribute value  The value of the setting.
+    """
+    def __init__(self, value):
+        """
+        Initialise the setting.
+
+        @param[in]  value:  The value of the setting.
+        """
+        self.value = value
+    # end def
+
+
+    def get(self):
+        """
+        Get the value of the setting.
+
+        @return     The value of the setting.
+        """
+        return self.value
+    # end def
+# end class
+
+
+class console_host:
+    """
+    Class providing what the aardvark functions need from the GUI when
+    they are run from the command line. An observer with the same display
+    methods, such as the GUI, can optionally be given to follow the run.
+
+    @attribute defaults      (gui_defaults)     The default settings.
+    @attribute scpi_commands (command_library)  The supported commands.
+    @attribute terminator    (terminator_event) Stops the run.
+    @attribute progress      (widget)           The progress bar, the
+                                                observer's if there is one.
+    @attribute float_var     (fixed_setting)    Decimal places to show.
+    @attribute observer      (main_gui)         The observer of the run,
+                                                None if there is not one.
+    """
+    def __init__(self, defaults, scpi_commands, dp = None, observer = None):
+        """
+        Initialise the host.
+
+        @param[in]  defaults:       The default settings
+                                    (pySCPI_config.gui_defaults).
+        @param[in]  scpi_commands:  The supported commands
+                                    (pySCPI_config.command_library).
+        @param[in]  dp:             OPTIONAL, decimal places to show for
+                                    floats, None for the default (int).
+        @param[in]  observer:       OPTIONAL, an object with the display
+                                    methods of the GUI to follow the run
+                                    (pySCPI_gui.main_gui).
+        """
+        self.defaults = defaults
+        self.scpi_commands = scpi_commands
+        self.terminator = pySCPI_threading.terminator_event()
+        self.observer = observer
+
+        if dp == None:
+            dp = defaults.default_dp
+        # end if
+
+        self.float_var = fixed_setting(dp)
+
+        if observer != None:
+            self.progress = observer.progress
+        else:
+            self.progress = null_widget()
+        # end if
+    # end def
+
+
+    def highlight_line(self, line = None):
+        """
+        Show the line of the command list being run.
+
+        @param[in]  line:  OPTIONAL, the line being run, None when the
+                           run has finished (int).
+        """
+        if self.observer != None:
+            self.observer.highlight_line(line)
+        # end if
+    # end def
+
+
+    def output_clear(self):
+        """
+        Clear the output at the end of a logging cycle.
+        """
+        if self.observer != None:
+            self.observer.output_clear()
+        # end if
+    # end def
+
+
+    def show_logging_period(self, logging_time):
+        """
+        Show a calibrated logging period.
+
+        @param[in]  logging_time:  The logging period in seconds (float).
+        """
+        if self.observer != None:
+            self.observer.show_logging_period(logging_time)
+        # end if
+    # end def
+# end class
+
+
+#
+# ----------------
+# Public Functions
+
+def load_host(dp = None, observer = None):
+    """
+    Load the settings and command library and build a host to run with.
+
+    @param[in]  dp:        OPTIONAL, decimal places to show for floats,
+                           None for the default (int).
+    @param[in]  observer:  OPTIONAL, an object with the display methods of
+                           the GUI to follow the run (pySCPI_gui.main_gui).
+    @return     (console_host) The host, its settings errors are printed.
+    """
+    scpi_commands = pySCPI_config.command_library()
+    pySCPI_XML.update_commands(scpi_commands)
+
+    defaults = pySCPI_config.gui_defaults()
+    pySCPI_XML.update_gui_defaults(defaults)
+    
+    # send I2C transactions through the chosen transport
+    pySCPI_transport.select(defaults.transport)
+    
+    if defaults.transport == pySCPI_simulator.simulated_transport.name:
+        pySCPI_simulator.build_rack(scpi_commands, defaults)
+    # end if
+
+    # report anything wrong with the configuration files
+    for error in scpi_commands.error_log + defaults.error_log:
+        print error
+    # end for
+
+    return console_host(defaults, scpi_commands, dp, observer)
+# end def
+
+
+def simulate(host, latency = None, nack_rate = 0.0, faults = 'none', 
+             seed = 0):
+    """
+    Run with simulated modules at the addresses in pySCPI_config.xml 
+    instead of an Aardvark.
+    
+    @param[in]  host:       The host to run with (console_host).
+    @param[in]  latency:    OPTIONAL, the time the modules take to prepare
+                            a reply in ms, None for the default (float).
+    @param[in]  nack_rate:  OPTIONAL, the fraction of transactions that 
+                            are not acknowledged (float).
+    @param[in]  faults:     OPTIONAL, the name of the fault profile of the
+                            modules (string).
+    @param[in]  seed:       OPTIONAL, the seed of the latencies and faults,
+                            the same seed gives the same faults (int).
+    """
+    host.defaults.transport = pySCPI_simulator.simulated_transport.name
+    pySCPI_transport.select(host.defaults.transport)
+    
+    pySCPI_simulator.build_rack(host.scpi_commands, host.defaults, 
+                                seed = seed, latency = latency, 
+                                nack_rate = nack_rate, faults = faults)
+# end def
+
+
+def replay(host, filename, real_time = False):
+    """
+    Run with the adapters and modules recorded in a trace file instead of
+    an Aardvark.
+    
+    @param[in]  host:       The host to run with (console_host).
+    @param[in]  filename:   The trace file recorded with --record (string).
+    @param[in]  real_time:  OPTIONAL, True to take as long as each
+                            transaction did when recorded, False to answer
+                            at once (bool).
+    @return     (bool)      True if the trace was loaded.
+    """
+    if not pySCPI_replay.load_trace(filename, real_time):
+        return False
+    # end if
+    
+    host.defaults.transport = pySCPI_replay.replay_transport.name
+    pySCPI_transport.select(host.defaults.transport)
+    
+    return True
+# end def
+
+
+def read_commands(filename):
+    """
+    Read a command list from a file, either an xml script saved by pySCPI
+    or a text file with one command per line.
+
+    @param[in]  filename:  The file to read (string).
+    @return     (tuple)    The commands read, with the address and delays
+                           of an xml script or None
+                           (pySCPI_config.write_directives) and the device
+                           detected in the commands (string).
+    """
+    if filename.lower().endswith('.xml'):
+        return pySCPI_XML.read_XML(filename)
+    # end if
+
+    command_file = open(filename, 'r')
+    commands = [line.strip() for line in command_file if line.strip() != '']
+    command_file.close()
+
+    return (pySCPI_config.write_directives(commands, None, None, None),
+            detect_device(commands))
+# end def
+
+
+def detect_device(commands):
+    """
+    Find the module a command list is written for.
+
+    @param[in]  commands:  The command list (list of strings).
+    @return     (string)   The module of the first SCPI command that is not
+                           for every SupMCU, '' if there is none.
+    """
+    for command in commands:
+        if not (command.startswith('SUP') or command.startswith('<') or
+                command.startswith('#')):
+            device = command.split(':')[0]
+
+            # the GPSRM is addressed by its longer name
+            if device == 'GPS':
+                return 'GPSRM'
+            # end if
+
+            return device
+        # end if
+    # end for
+
+    return ''
+# end def
+
+
+def run(host, directives, filename = None, duration = None):
+    """
+    Send a command list once or log it until it is stopped, stopping on
+    Ctrl-C or after a duration.
+
+    @param[in]  host:        The host to run with (console_host).
+    @param[in]  directives:  Instructions to direct the sending of
+                             data (pySCPI_config.write_directives)
+    @param[in]  filename:    OPTIONAL, the csv file to log to, None to send
+                             the commands once (string).
+    @param[in]  duration:    OPTIONAL, seconds to log for, None to log until
+                             Ctrl-C (float).
+    @return     (bool)       True if an Aardvark was available.
+    """
+    if filename == None:
+        return run_stoppable(host, pySCPI_aardvark.write_aardvark, 
+                             (directives, host))
+    else:
+        return run_stoppable(host, pySCPI_aardvark.log_aardvark, 
+                             (directives, filename, host), duration)
+    # end if
+# end def
+
+
+def sweep(host, directives, parameters, filename, adapters = None):
+    """
+    Run a command list over every combination of a set of parameters, 
+    stopping on Ctrl-C.
+
+    @param[in]  host:        The host to run with (console_host).
+    @param[in]  directives:  Instructions to direct the sending of
+                             data, with the template command list
+                             (pySCPI_config.write_directives)
+    @param[in]  parameters:  The name and values of each parameter (list of
+                             tuples).
+    @param[in]  filename:    The csv file to write the results to (string).
+    @param[in]  adapters:    OPTIONAL, the serial numbers of the Aardvarks
+                             to share the runs between (list of strings).
+    @return     (bool)       True if an Aardvark was available.
+    """
+    return run_stoppable(host, pySCPI_sweep.run_sweep, 
+                         (directives, parameters, filename, host, adapters))
+# end def
+
+
+#
+# ----------------
+# Private Functions
+
+def run_stoppable(host, function, args, duration = None):
+    """
+    Run an aardvark function in a thread so that Ctrl-C can stop it 
+    cleanly, stopping it after a duration if one is given.
+
+    @param[in]  host:        The host to run with (console_host).
+    @param[in]  function:    The function to run, which returns 0 if no
+                             Aardvark was available (function).
+    @param[in]  args:        The arguments of the function (tuple).
+    @param[in]  duration:    OPTIONAL, seconds to run for, None to run until
+                             it finishes or Ctrl-C (float).
+    @return     (bool)       True if an Aardvark was available.
+    """
+    result = []
+    target = lambda: result.append(function(*args))
+
+    # run in a thread so that Ctrl-C can stop it cleanly
+    run_thread = threading.Thread(target = target)
+    run_thread.daemon = True
+    run_thread.start()
+
+    timer = None
+    if duration != None:
+        timer = threading.Timer(duration, host.terminator.kill_log)
+        timer.daemon = True
+        timer.start()
+    # end if
+
+    try:
+        while run_thread.is_alive():
+            run_thread.join(interrupt_check_s)
+        # end while
+
+    except KeyboardInterrupt:
+        # finish the command or cycle in progress and close the log
+        print '*** Stopping ***'
+        host.terminator.kill_log()
+        run_thread.join()
+    # end try
+
+    if timer != None:
+        timer.cancel()
+    # end if
+
+    # reset the termination flag so that the host can run again
+    host.terminator.kill_event.clear()
+
+    return (len(result) > 0) and (result[0] != 0)
+# end def
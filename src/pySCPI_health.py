@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_health.py
+Module to track the health of each module on the I2C bus while logging so
+that a module that stops responding does not slow down the others.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_scheduler
+
+
+# ---------
+# Constants
+
+# consecutive failures before a module's commands are skipped
+trip_failures = 3
+
+# time before the first probe of a skipped module in seconds
+probe_first_s = 1.0
+
+# longest time between probes of a skipped module in seconds
+probe_max_s = 60.0
+
+
+# ---------
+# Classes
+
+class address_health:
+    """
+    Class containing the health of a single I2C address.
+
+    @attribute failures   (int)   Consecutive failed transactions.
+    @attribute tripped    (bool)  True if the address's commands are being
+                                  skipped.
+    @attribute probe_time (float) Monotonic time the next probe is due.
+    @attribute backoff_s  (float) Time between probes in seconds.
+    @attribute trips      (int)   The number of times the address tripped.
+    """
+    def __init__(self):
+        """
+        Initialise a healthy address.
+        """
+        self.failures = 0
+        self.tripped = False
+        self.probe_time = 0.0
+        self.backoff_s = probe_first_s
+        self.trips = 0
+    # end def
+# end class
+
+
+class health_monitor:
+    """
+    Class to decide which addresses are sent commands, skipping those that
+    have stopped responding and probing them with a growing backoff until
+    they respond again.
+
+    @attribute entries (dict) address_health keyed by address.
+    """
+    def __init__(self):
+        """
+        Initialise the monitor with every address healthy.
+        """
+        self.entries = {}
+    # end def
+
+
+    def allow(self, addr):
+        """
+        Determine if a command should be sent to an address.
+
+        @param[in]  addr:    The address of the module (int).
+        @return     (bool)   True if the command should be sent, either
+                             because the address is healthy or because a
+                             probe is due.
+        """
+        entry = self.entries.get(addr)
+
+        if (entry == None) or (not entry.tripped):
+            return True
+        # end if
+
+        return pySCPI_scheduler.monotonic() >= entry.probe_time
+    # end def
+
+
+    def record(self, addr, healthy):
+        """
+        Record the outcome of a transaction with an address.
+
+        @param[in]  addr:     The address of the module (int).
+        @param[in]  healthy:  True if the module responded (bool).
+        """
+        if addr not in self.entries:
+            self.entries[addr] = address_health()
+        # end if
+
+        entry = self.entries[addr]
+
+        if healthy:
+            if entry.tripped:
+                print '*** 0x%02X is responding again, ' % addr + \
+                      'resuming its commands ***'
+            # end if
+
+            # start afresh
+            entry.failures = 0
+            entry.tripped = False
+            entry.backoff_s = probe_first_s
+            return
+        # end if
+
+        entry.failures += 1
+
+        if entry.tripped:
+            # a probe failed so wait longer before the next one
+            entry.backoff_s = min(entry.backoff_s*2, probe_max_s)
+            entry.probe_time = pySCPI_scheduler.monotonic() + entry.backoff_s
+
+        elif entry.failures >= trip_failures:
+            # stop sending to the address until a probe succeeds
+            entry.tripped = True
+            entry.trips += 1
+            entry.probe_time = pySCPI_scheduler.monotonic() + entry.backoff_s
+            print '*** 0x%02X failed ' % addr + str(entry.failures) + \
+                  ' times in a row, skipping its commands ***'
+        # end if
+    # end def
+
+
+    def report(self):
+        """
+        Describe the addresses that tripped during the run.
+
+        @return     (list of strings) One line per address that tripped.
+        """
+        lines = []
+
+        for addr in sorted(self.entries.keys()):
+            entry = self.entries[addr]
+
+            if entry.trips > 0:
+                if entry.tripped:
+                    state = 'still skipped'
+                else:
+                    state = 'recovered'
+                # end if
+
+                lines.append('0x%02X skipped ' % addr + str(entry.trips) +
+                             ' times, ' + state)
+            # end if
+        # end for
+
+        return lines
+    # end def
+# end class
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_latency.py
+Module to learn how long each module takes to answer each telemetry
+request and to save that profile between runs of pySCPI.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import os
+import xml.etree.ElementTree as ET
+
+
+# ---------
+# Constants
+
+# file the profile is saved to, in the src directory
+profile_name = 'pySCPI_latency.xml'
+
+# upper edges of the latency histogram buckets in ms
+bucket_ms = [1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30, 40, 50, 60, 80,
+             100, 120, 150, 200, 250, 300, 400, 500, 600, 800, 1000, 1500,
+             2000, 3000, 5000, 10000]
+
+# weight kept by older samples each time a new one is recorded
+decay = 0.99
+
+# samples required before a learned delay is used
+min_samples = 10
+
+# quantile of the latency used to schedule reads
+quantile = 0.99
+
+# one read in this many of each command measures its latency from the
+# first poll, so that a learned delay can come down again as well as up
+probe_every = 10
+
+
+# ---------
+# Classes
+
+class command_latency:
+    """
+    Class containing the learned response latency of a single command.
+
+    @attribute weights (list)  Decayed count of samples in each bucket.
+    @attribute samples (int)   Total number of samples recorded.
+    @attribute mean_ms (float) Decayed mean latency in ms.
+    """
+    def __init__(self):
+        """
+        Initialise an empty latency record.
+        """
+        self.weights = [0.0]*len(bucket_ms)
+        self.samples = 0
+        self.mean_ms = 0.0
+    # end def
+
+
+    def add(self, latency_ms):
+        """
+        Add an observed latency to the record.
+
+        @param[in]  latency_ms:  The observed latency in ms (float).
+        """
+        # age the existing samples
+        self.weights = [weight*decay for weight in self.weights]
+
+        # find the bucket the latency falls into, the last bucket
+        # catches anything longer
+        index = len(bucket_ms) - 1
+        for i in range(len(bucket_ms)):
+            if latency_ms <= bucket_ms[i]:
+                index = i
+                break
+            # end if
+        # end for
+        self.weights[index] += 1.0
+
+        # update the mean
+        if self.samples == 0:
+            self.mean_ms = float(latency_ms)
+        else:
+            self.mean_ms += (1 - decay)*(latency_ms - self.mean_ms)
+        # end if
+
+        self.samples += 1
+    # end def
+
+
+    def percentile(self, fraction = quantile):
+        """
+        Get a percentile of the recorded latency.
+
+        @param[in]  fraction:  OPTIONAL, the fraction of samples that
+                               should be no longer than the result (float).
+        @return     (int)      The latency in ms.
+        """
+        # the target cumulative weight
+        target = sum(self.weights)*fraction
+        total = 0.0
+
+        for i in range(len(bucket_ms)):
+            total += self.weights[i]
+            if total >= target:
+                return bucket_ms[i]
+            # end if
+        # end for
+
+        return bucket_ms[-1]
+    # end def
+# end class
+
+
+class latency_profile:
+    """
+    Class containing the learned latency of every (address, command) pair.
+
+    @attribute entries  (dict)   command_latency keyed by (address, command).
+    @attribute filename (string) The file the profile is saved to.
+    @attribute reads    (dict)   Reads polled this run keyed by (address,
+                                 command).
+    """
+    def __init__(self, filename):
+        """
+        Initialise an empty profile.
+
+        @param[in]  filename:  The file the profile is saved to (string).
+        """
+        self.entries = {}
+        self.filename = filename
+        self.reads = {}
+    # end def
+
+
+    def probe(self, addr, command):
+        """
+        Decide whether a read should measure a command's latency by
+        polling finely from the first read. Reads that start at the learned
+        delay only see latencies longer than it, so they are not recorded.
+
+        @param[in]  addr:      The address of the module (int).
+        @param[in]  command:   The telemetry request (string).
+        @return     (bool)     True if the read should measure the latency.
+        """
+        key = (addr, command)
+        self.reads[key] = self.reads.get(key, 0) + 1
+
+        entry = self.entries.get(key)
+
+        # measure every read until enough samples have been recorded
+        return (entry == None) or (entry.samples < min_samples) or \
+               (self.reads[key] % probe_every == 0)
+    # end def
+
+
+    def record(self, addr, command, latency_ms):
+        """
+        Record an observed time to a valid write flag.
+
+        @param[in]  addr:        The address of the module (int).
+        @param[in]  command:     The telemetry request (string).
+        @param[in]  latency_ms:  The observed latency in ms (float).
+        """
+        key = (addr, command)
+
+        if key not in self.entries:
+            self.entries[key] = command_latency()
+        # end if
+
+        self.entries[key].add(latency_ms)
+    # end def
+
+
+    def learned_delay(self, addr, command):
+        """
+        Get the learned delay to read a command's reply after.
+
+        @param[in]  addr:      The address of the module (int).
+        @param[in]  command:   The telemetry request (string).
+        @return     (int)      The learned latency in ms, None if not
+                               enough samples have been recorded.
+        """
+        entry = self.entries.get((addr, command))
+
+        if (entry == None) or (entry.samples < min_samples):
+            return None
+        # end if
+
+        return entry.percentile()
+    # end def
+
+
+    def report(self):
+        """
+        Describe the profile in a readable form.
+
+        @return     (list of strings) One line per command.
+        """
+        lines = []
+
+        for (addr, command) in sorted(self.entries.keys()):
+            entry = self.entries[(addr, command)]
+            lines.append('0x%02X ' % addr + command + ':\tp99 ' +
+                         str(entry.percentile()) + 'ms, mean ' +
+                         '%.1f' % entry.mean_ms + 'ms, ' +
+                         str(entry.samples) + ' samples')
+        # end for
+
+        return lines
+    # end def
+# end class
+
+
+#
+# ----------------
+# Public Functions
+
+def load_profile(filename = None):
+    """
+    Load the latency profile saved by previous runs.
+
+    @param[in]  filename:  OPTIONAL, the file to load from (string).
+    @return     (latency_profile) The saved profile, or an empty one if
+                                  none has been saved.
+    """
+    if filename == None:
+        filename = os.path.join(os.getcwd(), 'src', profile_name)
+    # end if
+
+    profile = latency_profile(filename)
+
+    # nothing has been learned yet
+    if not os.path.isfile(filename):
+        return profile
+    # end if
+
+    try:
+        root = ET.parse(filename).getroot()
+
+        for element in root.findall('command'):
+            entry = command_latency()
+            entry.samples = int(element.get('samples'))
+            entry.mean_ms = float(element.get('mean_ms'))
+            entry.weights = [float(w) for w in element.text.split()]
+
+            # discard entries saved with different buckets
+            if len(entry.weights) == len(bucket_ms):
+                profile.entries[(int(element.get('addr'), 16),
+                                 element.get('name'))] = entry
+            # end if
+        # end for
+
+    except (IOError, ET.ParseError, TypeError, ValueError, AttributeError):
+        # start again if the profile cannot be read
+        print '*** ' + profile_name + ' is corrupt, starting a new ' \
+              'latency profile ***'
+        profile.entries = {}
+    # end try
+
+    return profile
+# end def
+
+
+def save_profile(profile):
+    """
+    Save a latency profile so that it can be used by later runs.
+
+    @param[in]  profile:  The profile to save (latency_profile).
+    """
+    root = ET.Element('latency_profile')
+    root.text = '\n\t'
+
+    for (addr, command) in sorted(profile.entries.keys()):
+        entry = profile.entries[(addr, command)]
+
+        # summary attributes so the file can be inspected by eye
+        element = ET.SubElement(root, 'command',
+                                {'addr':    '0x%02X' % addr,
+                                 'name':    command,
+                                 'samples': str(entry.samples),
+                                 'mean_ms': '%.2f' % entry.mean_ms,
+                                 'p99_ms':  str(entry.percentile())})
+        element.text = ' '.join(['%.4f' % w for w in entry.weights])
+        element.tail = '\n\t'
+    # end for
+
+    if len(root) > 0:
+        # no indent before the closing tag
+        root[-1].tail = '\n'
+    # end if
+
+    try:
+        profile_file = open(profile.filename, 'w')
+        profile_file.write(ET.tostring(root, encoding = 'UTF-8'))
+        profile_file.write('\n')
+        profile_file.close()
+
+    except IOError:
+        print '*** Could not save the latency profile to ' + \
+              profile_name + ' ***'
+    # end try
+# end def
+
+
+if __name__ == '__main__':
+    # if this code is not running as an imported module print the profile
+    for report_line in load_profile().report():
+        print report_line
+    # end for
+# end if
@@ -0,0 +1,870 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_plan.py
+Module to compile a list of commands into an execution plan that can be
+run repeatedly by the aardvark functions without re-parsing any strings.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_config
+import pySCPI_formatting
+from array import array
+
+
+# ---------
+# Constants
+
+# kinds of operation that can appear in a plan
+OP_DELAY = 'delay'
+OP_ADDRESS = 'address'
+OP_BITRATE = 'bitrate'
+OP_PULLUPS = 'pullups'
+OP_PERIOD = 'period'
+OP_ADAPTER = 'adapter'
+OP_LOOP = 'loop'
+OP_END_LOOP = 'end_loop'
+OP_WAIT = 'wait'
+OP_BULK = 'bulk'
+OP_INVALID = 'invalid'
+OP_RAW_WRITE = 'raw_write'
+OP_RAW_READ = 'raw_read'
+OP_WRITE = 'write'
+OP_TELEMETRY = 'telemetry'
+
+# SCPI message terminator
+terminator = 0x0a
+
+# bytes of the memory offset sent before each chunk of a bulk write
+bulk_offset_size = 2
+
+# comparisons that can be waited for
+wait_tests = {'==': lambda a, b: a == b,
+              '!=': lambda a, b: a != b,
+              '<':  lambda a, b: a < b,
+              '<=': lambda a, b: a <= b,
+              '>':  lambda a, b: a > b,
+              '>=': lambda a, b: a >= b}
+
+
+# ---------
+# Classes
+
+class plan_op:
+    """
+    Class containing a single pre-compiled step of a command list.
+
+    @attribute kind          (string) The kind of operation, one of OP_*.
+    @attribute line          (int)    The line of the command list (0
+                                      indexed) the operation came from.
+    @attribute command       (string) The command the operation came from.
+    @attribute addr          (int)    The resolved I2C address to use.
+    @attribute value         (int)    The argument of a config command
+                                      (delay in ms, bitrate, pullup mask,
+                                      period in s, adapter unique ID, loop
+                                      count, wait timeout in s or bulk 
+                                      write chunk size).
+    @attribute write_data    (array)  The encoded bytes to write, including
+                                      the terminator, or the image of a 
+                                      bulk write.
+    @attribute read_length   (int)    The number of bytes to read.
+    @attribute read_template (array)  Pre-sized blank read buffer.
+    @attribute read_delay    (int)    The delay before reading in ms.
+    @attribute print_format  (string) The decode format from the library,
+                                      None if the command is unknown.
+    @attribute preamble      (bool)   True if the reply has a preamble.
+    @attribute columns       (int)    The number of csv columns produced.
+    @attribute message       (string) Text to print when executed.
+    @attribute period        (float)  The requested sampling period when
+                                      logging in seconds, 0 to sample
+                                      every logging cycle.
+    @attribute every         (int)    Sample once every this many cycles.
+    @attribute phase         (int)    The cycle, modulo every, to sample on.
+    @attribute adapter       (int)    The unique ID of the Aardvark to use,
+                                      None for the first one found.
+    @attribute cache_ttl     (float)  Seconds the reply may be reused for,
+                                      None if it must always be read.
+    @attribute repeats       (int)    The number of times the operation is
+                                      performed in one pass because of the
+                                      loops around it.
+    @attribute test          (string) The comparison a wait is for, one of
+                                      the keys of wait_tests.
+    @attribute target        (float)  The value a wait compares against.
+    @attribute item          (int)    The index of the data item a wait
+                                      compares.
+    """
+    def __init__(self, kind, line, command):
+        """
+        Initialise an empty operation.
+
+        @param[in]  kind:      The kind of operation, one of OP_* (string).
+        @param[in]  line:      The line the command is on (int).
+        @param[in]  command:   The command being compiled (string).
+        """
+        self.kind = kind
+        self.line = line
+        self.command = command
+        self.addr = None
+        self.value = 0
+        self.write_data = None
+        self.read_length = 0
+        self.read_template = None
+        self.read_delay = 0
+        self.print_format = None
+        self.preamble = False
+        self.columns = 0
+        self.message = ''
+        self.period = 0.0
+        self.every = 1
+        self.phase = 0
+        self.adapter = None
+        self.cache_ttl = None
+        self.repeats = 1
+        self.test = None
+        self.target = 0.0
+        self.item = 0
+    # end def
+
+
+    def set_read(self, length):
+        """
+        Size the read performed by this operation.
+
+        @param[in]  length:    The number of bytes to read (int).
+        """
+        self.read_length = length
+
+        # unread bytes are left as 0x01 so that a missing device is visible
+        self.read_template = array('B', [1]*length)
+    # end def
+
+
+    def fresh_buffer(self):
+        """
+        Get a blank buffer to read this operation's reply into.
+
+        @return     (array)    A copy of the pre-sized read template.
+        """
+        return self.read_template[:]
+    # end def
+# end class
+
+
+class execution_plan:
+    """
+    Class containing a compiled list of commands.
+
+    @attribute ops     (list) The operations to execute (plan_op).
+    @attribute header  (list) The csv header for logging (strings).
+    """
+    def __init__(self):
+        """
+        Initialise an empty plan.
+        """
+        self.ops = []
+        self.header = ['Timestamp']
+    # end def
+
+
+    def steps(self):
+        """
+        Get the number of steps in one pass of the plan.
+
+        @return     (int)      The number of operations performed,
+                               counting every iteration of loops.
+        """
+        return sum(op.repeats for op in self.ops 
+                   if op.kind not in [OP_LOOP, OP_END_LOOP])
+    # end def
+    
+    
+    def walk(self):
+        """
+        Step through the operations in the order they are performed, 
+        repeating the body of each loop. The loop commands themselves are 
+        not returned as they do not use the bus.
+        
+        @return     (generator) The operations performed (plan_op).
+        """
+        # the index of each open <LOOP x> and the iterations it has left
+        loops = []
+        index = 0
+        
+        while index < len(self.ops):
+            op = self.ops[index]
+            
+            if op.kind == OP_LOOP:
+                loops.append([index, op.value])
+                
+            elif op.kind == OP_END_LOOP:
+                loops[-1][1] -= 1
+                
+                if loops[-1][1] > 0:
+                    # go back to the start of the loop body
+                    index = loops[-1][0] + 1
+                    continue
+                # end if
+                
+                loops.pop()
+                
+            else:
+                yield op
+            # end if
+            
+            index += 1
+        # end while
+    # end def
+    
+    
+    def initial_setting(self, kind):
+        """
+        Find the setting a configuration command makes before anything
+        is sent on the bus, so that it can be made when the Aardvark is 
+        configured instead.
+        
+        @param[in]  kind:      The kind of configuration, OP_BITRATE or
+                               OP_PULLUPS (string).
+        @return     (int)      The value set, None if it is not set before
+                               the first transaction.
+        """
+        value = None
+        
+        for op in self.ops:
+            if op.kind == kind:
+                value = op.value
+                
+            elif op.kind not in [OP_DELAY, OP_ADDRESS, OP_BITRATE, 
+                                 OP_PULLUPS, OP_INVALID]:
+                # the bus has been used or the setting may be repeated
+                break
+            # end if
+        # end for
+        
+        return value
+    # end def
+    
+    
+    def adapters(self):
+        """
+        Get the Aardvarks the plan uses.
+        
+        @return     (list)     The unique IDs of the adapters in the order 
+                               they are first used, None for the first
+                               Aardvark found.
+        """
+        adapters = []
+        
+        for op in self.ops:
+            if op.kind in [OP_LOOP, OP_END_LOOP]:
+                # loops are run on every adapter
+                continue
+                
+            elif op.adapter not in adapters:
+                adapters.append(op.adapter)
+            # end if
+        # end for
+        
+        return adapters
+    # end def
+    
+    
+    def subplan(self, adapters):
+        """
+        Get the part of the plan to be run on some of the Aardvarks.
+        
+        @param[in]  adapters:  The unique IDs of the adapters, None for the
+                               first Aardvark found (list).
+        @return     (execution_plan) A plan sharing the operations for those
+                                     adapters.
+        """
+        plan = execution_plan()
+        
+        # loops are kept whole so that each adapter repeats its part of them
+        plan.ops = [op for op in self.ops if (op.adapter in adapters) or 
+                    (op.kind in [OP_LOOP, OP_END_LOOP])]
+        
+        return plan
+    # end def
+    
+    
+    def section(self, first_line, last_line):
+        """
+        Get the part of the plan compiled from some lines of the command
+        list, with its own csv header.
+        
+        @param[in]  first_line:  The first line of the section (int).
+        @param[in]  last_line:   The line after the section (int).
+        @return     (execution_plan) A plan sharing the operations from 
+                                     those lines.
+        """
+        plan = execution_plan()
+        plan.ops = [op for op in self.ops 
+                    if first_line <= op.line < last_line]
+        
+        for op in plan.ops:
+            if op.kind == OP_RAW_READ:
+                # raw reads are logged as a single column
+                plan.header.append(op.command)
+            else:
+                plan.header.extend(telemetry_header(op))
+            # end if
+        # end for
+        
+        return plan
+    # end def
+    
+    
+    def interleavable(self):
+        """
+        Determine if the delays of the plan's telemetry requests can be 
+        overlapped, which needs a plan that only reads telemetry from more
+        than one address.
+        
+        @return     (bool)     True if the requests can be interleaved.
+        """
+        addrs = set()
+        
+        for op in self.ops:
+            if op.kind == OP_TELEMETRY:
+                addrs.add(op.addr)
+                
+            elif op.kind not in [OP_ADDRESS, OP_INVALID]:
+                # writes, explicit delays, bus settings and loops must keep
+                # the order of the command list
+                return False
+            # end if
+        # end for
+        
+        return len(addrs) > 1
+    # end def
+# end class
+
+
+#
+# ----------------
+# Public Functions
+
+def compile_plan(directives, gui):
+    """
+    Compile a list of commands into an execution plan. Comments are
+    dropped, addresses, sampling periods and adapters are resolved, loops
+    are matched and every buffer is built once.
+
+    @param[in]  directives:  Instructions to direct the sending of
+                             data (pySCPI_config.write_directives)
+    @param[in]  gui:         Instance of the gui that this function is
+                             called by (pySCPI_gui.main_gui).
+    @return     (execution_plan) The compiled plan.
+    """
+    plan = execution_plan()
+
+    # the address in use for SCPI commands
+    dec_addr = directives.addr
+    
+    # the sampling period set by the last <PERIOD x> command
+    period = 0.0
+    
+    # the Aardvark chosen by the last <ADAPTER x> command
+    adapter = None
+    
+    # the <LOOP x> commands that have not been ended yet
+    loops = []
+
+    for line, command in enumerate(directives.command_list):
+
+        # ignore comment lines that start with a #
+        if command.startswith('#'):
+            continue
+        # end if
+
+        if command.startswith('<WAIT_UNTIL'):
+            # waits poll a telemetry request at the current address
+            op = compile_wait(command, line, dec_addr, directives, gui)
+            
+        elif command.startswith('<BULK'):
+            # bulk writes load their image once
+            op = compile_bulk(command, line)
+            
+        elif pySCPI_config.is_config(command):
+            # configuration commands may change the address in use
+            op = compile_config(command, line, dec_addr)
+
+            if op.kind == OP_ADDRESS:
+                dec_addr = op.addr
+                
+            elif op.kind == OP_PERIOD:
+                # periods apply to the commands that follow and are not
+                # executed themselves
+                period = op.value
+                continue
+                
+            elif op.kind == OP_ADAPTER:
+                # as are adapters
+                adapter = op.value
+                continue
+                
+            elif op.kind == OP_LOOP:
+                loops.append(op)
+                
+            elif op.kind == OP_END_LOOP:
+                if len(loops) > 0:
+                    op.value = loops.pop().value
+                else:
+                    print '*** <END LOOP> on line ' + str(line + 1) + \
+                          ' has no matching <LOOP x> ***'
+                    op.kind = OP_INVALID
+                # end if
+            # end if
+
+        elif pySCPI_config.is_raw_write(command):
+            op = compile_raw_write(command, line)
+
+        elif pySCPI_config.is_raw_read(command):
+            op = compile_raw_read(command, line)
+
+            # raw reads are logged as a single column
+            plan.header.append(command)
+
+        else:
+            op = compile_scpi(command, line, dec_addr, directives, gui)
+
+            # add the telemetry columns to the header
+            plan.header.extend(telemetry_header(op))
+        # end if
+
+        op.period = period
+        op.adapter = adapter
+        
+        # operations inside loops are performed more than once per pass
+        for loop in loops:
+            op.repeats *= loop.value
+        # end for
+        
+        plan.ops.append(op)
+    # end for
+    
+    # loops that are never ended are performed once
+    for loop in loops:
+        print '*** <LOOP ' + str(loop.value) + '> on line ' + \
+              str(loop.line + 1) + ' has no matching <END LOOP> ***'
+        
+        for op in plan.ops[plan.ops.index(loop):]:
+            op.repeats //= loop.value
+        # end for
+        
+        loop.kind = OP_INVALID
+    # end for
+
+    return plan
+# end def
+
+
+#
+# ----------------
+# Private Functions
+
+def compile_config(command, line, address):
+    """
+    Compile a configuration command.
+
+    @param[in]  command:   The configuration command (string).
+    @param[in]  line:      The line the command is on (int).
+    @param[in]  address:   The address in use before the command (int).
+    @return     (plan_op)  The compiled operation.
+    """
+    op = plan_op(OP_INVALID, line, command)
+    op.addr = address
+
+    # split off the argument
+    command_list = command.split(' ')
+
+    if 'DELAY ' in command:
+        delay_number = command_list[1][0:-1]
+
+        # verify that it is a number and that the beginning of
+        # the command was correct
+        if delay_number.isdigit() and (command_list[0] == '<DELAY'):
+            op.kind = OP_DELAY
+            op.value = int(delay_number)
+            op.message = '<DELAY>:\t\t ' + delay_number + 'ms'
+        else:
+            print '*** The requested DELAY command is not valid. '\
+                  'Use <DELAY x>***'
+        # end if
+
+    elif 'ADDRESS ' in command:
+        address_hex = command_list[1][0:-1]
+
+        # verify that it is a number and that the beginning of the
+        # command was correct
+        if address_hex.startswith('0x') and (len(address_hex) == 4) and \
+           pySCPI_config.is_hex(address_hex[2:]) and \
+           (command_list[0] == '<ADDRESS'):
+            op.kind = OP_ADDRESS
+            op.addr = int(address_hex, 16)
+            op.message = 'Changed slave I2C address to ' + address_hex + '.'
+        else:
+            print '*** The requested ADDRESS command is not valid. '\
+                  'Use <ADDRESS 0xYY>***'
+        # end if
+
+    elif 'BITRATE ' in command:
+        speed_num = command_list[1][0:-1]
+
+        if speed_num.isdigit() and (command_list[0] == '<BITRATE'):
+            op.kind = OP_BITRATE
+            op.value = int(speed_num)
+        else:
+            print '*** The requested BITRATE command is not valid. '\
+                  'Use <BITRATE x>***'
+        # end if
+
+    elif 'PERIOD ' in command:
+        period_number = command_list[1][0:-1]
+        
+        # verify that it is a number and that the beginning of
+        # the command was correct
+        try:
+            period_value = float(period_number)
+        except ValueError:
+            period_value = -1
+        # end try
+        
+        if (period_value >= 0) and (command_list[0] == '<PERIOD'):
+            op.kind = OP_PERIOD
+            op.value = period_value
+        else:
+            print '*** The requested PERIOD command is not valid. '\
+                  'Use <PERIOD x>***'
+        # end if
+
+    elif 'ADAPTER ' in command:
+        # serial numbers are written as XXXX-XXXXXX
+        serial_number = command_list[1][0:-1].replace('-', '')
+
+        if serial_number.isdigit() and (command_list[0] == '<ADAPTER'):
+            op.kind = OP_ADAPTER
+            op.value = int(serial_number)
+        else:
+            print '*** The requested ADAPTER command is not valid. '\
+                  'Use <ADAPTER XXXX-XXXXXX>***'
+        # end if
+
+    elif command == '<END LOOP>':
+        op.kind = OP_END_LOOP
+
+    elif 'LOOP ' in command:
+        loop_count = command_list[1][0:-1]
+
+        # verify that it is a positive number and that the beginning of
+        # the command was correct
+        if loop_count.isdigit() and (int(loop_count) > 0) and \
+           (command_list[0] == '<LOOP'):
+            op.kind = OP_LOOP
+            op.value = int(loop_count)
+        else:
+            print '*** The requested LOOP command is not valid. '\
+                  'Use <LOOP x>***'
+        # end if
+
+    elif 'PULLUPS ' in command:
+        if command in ['<PULLUPS ON>', '<PULLUPS OFF>']:
+            op.kind = OP_PULLUPS
+            op.value = (command == '<PULLUPS ON>')
+            op.message = 'Turned I2C pullups ' + command[9:-1].lower() + '.'
+        else:
+            print '*** Invalid Pullup Command, use either '\
+                  '<PULLUPS ON> or <PULLUPS OFF>***'
+        # end if
+
+    else:
+        print '*** The configuration command requested in not valid, '\
+              'refer to Read Me***'
+    # end if
+
+    return op
+# end def
+
+
+def compile_raw_write(command, line):
+    """
+    Compile a <WRITE> command.
+
+    @param[in]  command:   The raw write command (string).
+    @param[in]  line:      The line the command is on (int).
+    @return     (plan_op)  The compiled operation.
+    """
+    op = plan_op(OP_INVALID, line, command)
+
+    if pySCPI_config.is_valid_raw(command):
+        op.kind = OP_RAW_WRITE
+
+        # split the command into the address and data
+        write_data = command[:-1].split(' ')
+        op.addr = int(write_data[1][:-1], 16)
+
+        # convert the data to bytes and add the terminator
+        op.write_data = array('B', [int(item, 16) for item in write_data[2:]]
+                              + [terminator])
+
+        op.message = 'Raw Write:\t\t[' + ' '.join(write_data[2:]) + \
+                     '] to address ' + write_data[1][:-1]
+    # end if
+
+    return op
+# end def
+
+
+def compile_raw_read(command, line):
+    """
+    Compile a <READ> command, which is_raw_read has already validated.
+
+    @param[in]  command:   The raw read command (string).
+    @param[in]  line:      The line the command is on (int).
+    @return     (plan_op)  The compiled operation.
+    """
+    op = plan_op(OP_RAW_READ, line, command)
+
+    # split the command into the address and length
+    data_list = command.split(' ')
+    op.addr = int(data_list[1][:-1], 16)
+    op.set_read(int(data_list[2][:-1]))
+    op.columns = 1
+
+    # suffix of the printed result
+    op.message = ' from address ' + data_list[1][:-1]
+
+    return op
+# end def
+
+
+def compile_scpi(command, line, address, directives, gui):
+    """
+    Compile a SCPI command or telemetry request.
+
+    @param[in]  command:     The SCPI command (string).
+    @param[in]  line:        The line the command is on (int).
+    @param[in]  address:     The I2C address to send to (int).
+    @param[in]  directives:  Instructions to direct the sending of
+                             data (pySCPI_config.write_directives)
+    @param[in]  gui:         Instance of the gui that this function is
+                             called by (pySCPI_gui.main_gui).
+    @return     (plan_op)    The compiled operation.
+    """
+    op = plan_op(OP_WRITE, line, command)
+    op.addr = address
+
+    # encode the command and append the terminator
+    op.write_data = array('B', [ord(item) for item in command] +
+                          [terminator])
+    op.message = 'Write:\t\t' + command
+
+    if 'TEL?' in command:
+        # a read will follow the write
+        op.kind = OP_TELEMETRY
+        op.message = 'Read:\t\t' + command
+        op.set_read(pySCPI_formatting.read_length(command, gui))
+        op.preamble = pySCPI_config.has_preamble(command)
+
+        # ascii requests take longer to prepare
+        if command.endswith('ascii'):
+            op.read_delay = directives.ascii_time
+        else:
+            op.read_delay = directives.delay_time
+        # end if
+
+        # resolve the decode information
+        if gui.scpi_commands.SCPI_Data.has_key(command):
+            op.print_format = gui.scpi_commands.SCPI_Data[command][1]
+            op.columns = len(op.print_format.split(',')) + int(op.preamble)
+        # end if
+        
+        # replies that do not change can be reused
+        op.cache_ttl = gui.scpi_commands.cache_ttl.get(command)
+    # end if
+
+    return op
+# end def
+
+
+def compile_wait(command, line, address, directives, gui):
+    """
+    Compile a <WAIT_UNTIL request test value timeout> command, which polls
+    a telemetry request until a data item passes the test, for example 
+    <WAIT_UNTIL BM2:TEL? 5,data >= 90 600>. A list item is chosen by 
+    adding its index to the request, as in BM2:TEL? 3,data[2].
+
+    @param[in]  command:     The wait command (string).
+    @param[in]  line:        The line the command is on (int).
+    @param[in]  address:     The I2C address to poll (int).
+    @param[in]  directives:  Instructions to direct the sending of
+                             data (pySCPI_config.write_directives)
+    @param[in]  gui:         Instance of the gui that this function is
+                             called by (pySCPI_gui.main_gui).
+    @return     (plan_op)    The compiled operation.
+    """
+    invalid = plan_op(OP_INVALID, line, command)
+    invalid.addr = address
+    
+    # split off the test, value and timeout from the end as the request
+    # contains spaces itself
+    command_list = command[1:-1].split(' ')
+    
+    if len(command_list) < 5:
+        print '*** The requested WAIT_UNTIL command is not valid. '\
+              'Use <WAIT_UNTIL command test value timeout>***'
+        return invalid
+    # end if
+    
+    request = ' '.join(command_list[1:-3])
+    test = command_list[-3]
+    item = 0
+    
+    # a list item may be chosen with [x]
+    if request.endswith(']') and ('[' in request):
+        item_text = request[request.rindex('[') + 1:-1]
+        request = request[:request.rindex('[')]
+        item = int(item_text) if item_text.isdigit() else -1
+    # end if
+    
+    try:
+        target = float(command_list[-2])
+        timeout = float(command_list[-1])
+    except ValueError:
+        timeout = -1
+    # end try
+    
+    if ('TEL?' not in request) or (test not in wait_tests) or \
+       (timeout <= 0) or (item < 0):
+        print '*** The requested WAIT_UNTIL command is not valid. '\
+              'Use <WAIT_UNTIL command test value timeout>***'
+        return invalid
+    # end if
+    
+    # the request is read and decoded like any other
+    op = compile_scpi(request, line, address, directives, gui)
+    
+    if (op.print_format == None) or \
+       (item >= len(op.print_format.split(','))) or \
+       (op.print_format.split(',')[item].strip() in ['ascii', 'hex']):
+        print '*** WAIT_UNTIL can only test numbers read by telemetry '\
+              'requests in SCPI_Commands.xml ***'
+        return invalid
+    # end if
+    
+    op.kind = OP_WAIT
+    op.message = 'Poll:\t\t' + request
+    op.test = test
+    op.target = target
+    op.item = item
+    op.value = timeout
+    
+    # waits are not logged
+    op.columns = 0
+    
+    return op
+# end def
+
+
+def compile_bulk(command, line):
+    """
+    Compile a <BULK 0xYY, file, chunk> command, which writes a binary image
+    to a memory device in chunks of the given number of bytes, each led by
+    its offset in the image.
+
+    @param[in]  command:   The bulk write command (string).
+    @param[in]  line:      The line the command is on (int).
+    @return     (plan_op)  The compiled operation.
+    """
+    op = plan_op(OP_INVALID, line, command)
+    
+    # split the command into the address, file and chunk size
+    command_list = [part.strip() for part in 
+                    command[1:-1].split(' ', 1)[-1].split(',')]
+    
+    if (len(command_list) != 3) or (command.split(' ')[0] != '<BULK') or \
+       not (command_list[0].startswith('0x') and 
+            (len(command_list[0]) == 4) and 
+            pySCPI_config.is_hex(command_list[0][2:])) or \
+       not command_list[2].isdigit() or (int(command_list[2]) == 0):
+        print '*** The requested BULK command is not valid. '\
+              'Use <BULK 0xYY, file, chunk>***'
+        return op
+    # end if
+    
+    try:
+        image_file = open(command_list[1], 'rb')
+        image = array('B', image_file.read())
+        image_file.close()
+    except IOError:
+        print '*** The image ' + command_list[1] + ' of the BULK command '\
+              'could not be read ***'
+        return op
+    # end try
+    
+    if len(image) > 2**(8*bulk_offset_size):
+        print '*** The image ' + command_list[1] + ' is larger than the ' + \
+              str(2**(8*bulk_offset_size)) + ' bytes a BULK command can '\
+              'address ***'
+        return op
+    # end if
+    
+    op.kind = OP_BULK
+    op.addr = int(command_list[0], 16)
+    op.write_data = image
+    op.value = int(command_list[2])
+    op.message = 'Bulk Write:\t\t' + command_list[1] + ' (' + \
+                 str(len(image)) + ' bytes) to address ' + command_list[0]
+    
+    return op
+# end def
+
+
+def telemetry_header(op):
+    """
+    Create the csv header titles for a telemetry request.
+
+    @param[in]  op:                The compiled operation (plan_op).
+    @return     (list of strings)  The titles of its columns.
+    """
+    titles = []
+
+    # unknown commands are not logged
+    if (op.kind == OP_TELEMETRY) and (op.print_format != None):
+
+        # does the command have time information
+        if op.preamble:
+            titles.append(op.command + ': Time (s)')
+        # end if
+
+        # check the print format
+        if ',' not in op.print_format:
+            # is only a single data item
+            titles.append(op.command + ': Data')
+
+        else:
+            # is a list so create a column for every item in the list
+            for i in range(len(op.print_format.split(','))):
+                titles.append(op.command + ': Data[' + str(i) + ']')
+            # end for
+        # end if
+    # end if
+
+    return titles
+# end def
@@ -0,0 +1,881 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_replay.py
+Module to record every I2C transaction of a session, with its timing, to a
+trace file and to play a trace back as a bus transport, so that a session
+can be run again without the adapter and modules it was recorded on.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_scheduler
+import pySCPI_session
+import pySCPI_transport
+import atexit
+import csv
+import threading
+import time
+
+
+# ---------
+# Constants
+
+# columns of a trace file
+trace_header = ['Time (s)', 'Adapter', 'Operation', 'Address', 'Status',
+                'Written', 'Read', 'Data Out', 'Data In', 'Duration (ms)']
+
+# operations recorded in a trace, an adapter row gives the port and unique
+# ID of an adapter that was found
+OP_ADAPTER = 'adapter'
+OP_BITRATE = 'bitrate'
+OP_WRITE = 'write'
+OP_READ = 'read'
+OP_WRITE_READ = 'write_read'
+
+# recorded transactions searched for the one requested when a replay has
+# gone out of step
+resync_window = 64
+
+
+# ---------
+# Classes
+
+class trace_event:
+    """
+    Class containing one recorded I2C transaction.
+
+    @attribute op           (string) One of OP_*.
+    @attribute addr         (int)    The I2C address, or the bitrate asked
+                                     for.
+    @attribute status       (int)    The status returned, or the bitrate
+                                     used.
+    @attribute num_written  (int)    The number of bytes written.
+    @attribute num_read     (int)    The number of bytes read.
+    @attribute data_out     (list)   The bytes written (ints).
+    @attribute data_in      (list)   The bytes read (ints).
+    @attribute duration     (float)  The time the transaction took in s.
+    """
+    def __init__(self, op, addr, status = 0, num_written = 0, num_read = 0,
+                 data_out = [], data_in = [], duration = 0.0):
+        """
+        Initialise a recorded transaction.
+
+        @param[in]  op:           One of OP_* (string).
+        @param[in]  addr:         The I2C address, or the bitrate asked for
+                                  (int).
+        @param[in]  status:       OPTIONAL, the status returned, or the
+                                  bitrate used (int).
+        @param[in]  num_written:  OPTIONAL, bytes written (int).
+        @param[in]  num_read:     OPTIONAL, bytes read (int).
+        @param[in]  data_out:     OPTIONAL, the bytes written (list).
+        @param[in]  data_in:      OPTIONAL, the bytes read (list).
+        @param[in]  duration:     OPTIONAL, the time taken in s (float).
+        """
+        self.op = op
+        self.addr = addr
+        self.status = status
+        self.num_written = num_written
+        self.num_read = num_read
+        self.data_out = list(data_out)
+        self.data_in = list(data_in)
+        self.duration = duration
+    # end def
+
+
+    def matches(self, op, addr, data_out = [], read_size = 0):
+        """
+        Check whether a requested transaction is this recorded one.
+
+        @param[in]  op:         One of OP_* (string).
+        @param[in]  addr:       The I2C address, or the bitrate (int).
+        @param[in]  data_out:   OPTIONAL, the bytes to write (list).
+        @param[in]  read_size:  OPTIONAL, the bytes to read (int).
+        @return     (bool)      True if it is the same transaction.
+        """
+        return (self.op == op) and (self.addr == addr) and \
+               (self.data_out == list(data_out)) and \
+               (len(self.data_in) == read_size)
+    # end def
+# end class
+
+
+class trace_stream:
+    """
+    Class containing the recorded transactions of one adapter and how far
+    through them a replay is.
+
+    @attribute unique_id  (int)         The unique ID of the adapter.
+    @attribute events     (list)        The transactions (trace_event).
+    @attribute position   (int)         The next transaction to replay.
+    @attribute last_read  (trace_event) The last read replayed, None if
+                                        there has not been one.
+    @attribute in_use     (bool)        True while a transport has it open.
+    @attribute replayed   (int)         Transactions replayed.
+    @attribute repeated   (int)         Reads that repeated the last one.
+    @attribute skipped    (int)         Transactions passed over to get
+                                        back in step.
+    @attribute unmatched  (int)         Transactions that were not in the
+                                        trace.
+    @attribute real_time  (bool)        True to take as long as each 
+                                        transaction did when recorded.
+    """
+    def __init__(self, unique_id, real_time = False):
+        """
+        Initialise an empty stream.
+
+        @param[in]  unique_id:  The unique ID of the adapter (int).
+        @param[in]  real_time:  OPTIONAL, True to take as long as each 
+                                transaction did when recorded (bool).
+        """
+        self.unique_id = unique_id
+        self.events = []
+        self.position = 0
+        self.last_read = None
+        self.in_use = False
+        self.replayed = 0
+        self.repeated = 0
+        self.skipped = 0
+        self.unmatched = 0
+        self.real_time = real_time
+    # end def
+
+
+    def wait(self, event):
+        """
+        Take as long as a transaction did when recorded, only when 
+        replaying in real time.
+
+        @param[in]  event:     The transaction (trace_event).
+        """
+        if self.real_time and (event.duration > 0):
+            time.sleep(event.duration)
+        # end if
+    # end def
+
+
+    def next_event(self, op, addr, data_out = [], read_size = 0):
+        """
+        Find the recorded transaction for a requested one. A read that was
+        polled more often than when it was recorded gets the last reply
+        again, and recorded transactions the replay did not ask for are
+        passed over.
+
+        @param[in]  op:         One of OP_* (string).
+        @param[in]  addr:       The I2C address, or the bitrate (int).
+        @param[in]  data_out:   OPTIONAL, the bytes to write (list).
+        @param[in]  read_size:  OPTIONAL, the bytes to read (int).
+        @return     (trace_event) The recorded transaction, None if it is
+                                  not in the trace.
+        """
+        window = self.events[self.position:self.position + resync_window]
+
+        for (offset, event) in enumerate(window):
+            if event.matches(op, addr, data_out, read_size):
+                if (offset > 0) and (op == OP_READ) and \
+                   (self.last_read != None) and \
+                   self.last_read.matches(op, addr, data_out, read_size):
+                    # read again before the recorded next transaction
+                    self.repeated += 1
+                    return self.last_read
+                # end if
+
+                self.position += offset + 1
+                self.skipped += offset
+                self.replayed += 1
+
+                if op == OP_READ:
+                    self.last_read = event
+                # end if
+
+                return event
+            # end if
+        # end for
+
+        if (op == OP_READ) and (self.last_read != None) and \
+           self.last_read.matches(op, addr, data_out, read_size):
+            self.repeated += 1
+            return self.last_read
+        # end if
+
+        self.unmatched += 1
+
+        if (self.unmatched == 1) and (self.position >= len(self.events)):
+            print '*** Replay of ' + \
+                  pySCPI_session.serial_string(self.unique_id) + \
+                  ' reached the end of the trace ***'
+
+        elif self.unmatched == 1:
+            print '*** Replay of ' + \
+                  pySCPI_session.serial_string(self.unique_id) + \
+                  ' went out of step at transaction ' + \
+                  str(self.position + 1) + ': ' + op + ' at ' + \
+                  hex(addr) + ' is not in the trace ***'
+        # end if
+
+        return None
+    # end def
+# end class
+
+
+class trace_recorder:
+    """
+    Class writing the transactions of every adapter to a trace file.
+
+    @attribute filename   (string)  The trace file.
+    @attribute trace_file (file)    The open trace file.
+    @attribute writer     (writer)  The csv writer of the file.
+    @attribute lock       (Lock)    Lets one adapter write at a time.
+    @attribute start      (float)   When recording started.
+    @attribute adapters   (set)     (port, unique ID) of the adapters
+                                    already written.
+    @attribute recorded   (class)   The transport that is recorded.
+    """
+    def __init__(self, filename, recorded):
+        """
+        Open a trace file and write its header.
+
+        @param[in]  filename:  The trace file (string).
+        @param[in]  recorded:  The transport to record (class).
+        """
+        self.filename = filename
+        self.trace_file = open(filename, 'wb')
+        self.writer = csv.writer(self.trace_file, delimiter = '\t')
+        self.writer.writerow(trace_header)
+        self.lock = threading.Lock()
+        self.start = pySCPI_scheduler.monotonic()
+        self.adapters = set()
+        self.recorded = recorded
+    # end def
+
+
+    def add_adapter(self, port, unique_id):
+        """
+        Record an adapter that was found.
+
+        @param[in]  port:       The port of the adapter (int).
+        @param[in]  unique_id:  The unique ID of the adapter (int).
+        """
+        self.lock.acquire()
+
+        try:
+            if (port, unique_id) not in self.adapters:
+                self.adapters.add((port, unique_id))
+                self.writer.writerow(['%.6f' % self.elapsed(), unique_id,
+                                      OP_ADAPTER, port, 0, 0, 0, '', '',
+                                      '0.000'])
+            # end if
+        finally:
+            self.lock.release()
+        # end try
+    # end def
+
+
+    def add(self, unique_id, start, event):
+        """
+        Record a transaction.
+
+        @param[in]  unique_id:  The unique ID of the adapter (int).
+        @param[in]  start:      When the transaction started (float).
+        @param[in]  event:      The transaction (trace_event).
+        """
+        self.lock.acquire()
+
+        try:
+            if self.trace_file.closed:
+                return
+            # end if
+
+            self.writer.writerow(['%.6f' % (start - self.start), unique_id,
+                                  event.op, event.addr, event.status,
+                                  event.num_written, event.num_read,
+                                  hex_string(event.data_out),
+                                  hex_string(event.data_in),
+                                  '%.3f' % (event.duration*1000)])
+        finally:
+            self.lock.release()
+        # end try
+    # end def
+
+
+    def elapsed(self):
+        """
+        Get the time since recording started.
+
+        @return     (float)    The time in s.
+        """
+        return pySCPI_scheduler.monotonic() - self.start
+    # end def
+
+
+    def close(self):
+        """
+        Close the trace file.
+        """
+        self.lock.acquire()
+
+        try:
+            self.trace_file.close()
+        finally:
+            self.lock.release()
+        # end try
+    # end def
+# end class
+
+
+class recording_transport(pySCPI_transport.bus_transport):
+    """
+    Class passing I2C transactions to the transport being recorded and
+    writing each one to the trace file.
+
+    @attribute recorder   (trace_recorder) The recorder in use, None when
+                                           not recording.
+    @attribute bus        (bus_transport) The adapter being recorded.
+    @attribute unique_id  (int)           The unique ID of the adapter, 0
+                                          before it is opened.
+    """
+    name = 'record'
+    recorder = None
+
+    def __init__(self):
+        """
+        Initialise an unopened adapter of the transport being recorded.
+        """
+        self.bus = self.recorder.recorded()
+        self.unique_id = 0
+    # end def
+
+
+    def find(self):
+        """
+        Find every adapter connected, recording those found.
+
+        @return     (list)     (port, unique ID, True if free) of each
+                               adapter (tuples).
+        """
+        adapters = self.bus.find()
+
+        for (port, unique_id, free) in adapters:
+            self.recorder.add_adapter(port, unique_id)
+        # end for
+
+        return adapters
+    # end def
+
+
+    def open(self, port):
+        """
+        Open the adapter on a port.
+
+        @param[in]  port:      The port of the adapter (int).
+        @return     (bool)     True if the adapter was opened.
+        """
+        if not self.bus.open(port):
+            return False
+        # end if
+
+        self.unique_id = self.bus.status()
+        self.recorder.add_adapter(port, self.unique_id)
+
+        return True
+    # end def
+
+
+    def status(self):
+        """
+        Check that the adapter is still connected.
+
+        @return     (int)      The unique ID of the adapter, 0 or less if it
+                               is no longer connected.
+        """
+        return self.bus.status()
+    # end def
+
+
+    def configure(self, bus_timeout_ms):
+        """
+        Set the adapter up as an I2C master.
+
+        @param[in]  bus_timeout_ms:  The bus timeout in ms (int).
+        """
+        self.bus.configure(bus_timeout_ms)
+    # end def
+
+
+    def set_bitrate(self, bitrate):
+        """
+        Set the I2C bitrate, recording the bitrate used.
+
+        @param[in]  bitrate:   The requested bitrate in kHz (int).
+        @return     (int)      The bitrate used in kHz.
+        """
+        start = pySCPI_scheduler.monotonic()
+        used = self.bus.set_bitrate(bitrate)
+
+        self.recorder.add(self.unique_id, start,
+                     trace_event(OP_BITRATE, bitrate, used))
+
+        return used
+    # end def
+
+
+    def set_pullups(self, pullups):
+        """
+        Turn the I2C pullups on or off.
+
+        @param[in]  pullups:   True to turn the pullups on (bool).
+        """
+        self.bus.set_pullups(pullups)
+    # end def
+
+
+    def free_bus(self):
+        """
+        Free the I2C bus if a slave is holding it.
+        """
+        self.bus.free_bus()
+    # end def
+
+
+    def write(self, addr, data_out):
+        """
+        Write to a slave, recording the write.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @return     (tuple)    The status of the write and the number of
+                               bytes written.
+        """
+        start = pySCPI_scheduler.monotonic()
+        (status, num_written) = self.bus.write(addr, data_out)
+
+        self.recorder.add(self.unique_id, start,
+                     trace_event(OP_WRITE, addr, status, num_written, 0,
+                                 data_out, [],
+                                 pySCPI_scheduler.monotonic() - start))
+
+        return (status, num_written)
+    # end def
+
+
+    def read(self, addr, data_in):
+        """
+        Read from a slave, recording the read.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The status of the read, the buffer and the
+                               number of bytes read.
+        """
+        start = pySCPI_scheduler.monotonic()
+        (status, data_in, num_read) = self.bus.read(addr, data_in)
+
+        self.recorder.add(self.unique_id, start,
+                     trace_event(OP_READ, addr, status, 0, num_read, [],
+                                 data_in,
+                                 pySCPI_scheduler.monotonic() - start))
+
+        return (status, data_in, num_read)
+    # end def
+
+
+    def write_read(self, addr, data_out, data_in):
+        """
+        Write to a slave and read its reply, recording both.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The combined status, the number of bytes
+                               written, the buffer and the number of bytes
+                               read.
+        """
+        start = pySCPI_scheduler.monotonic()
+        (status, num_written, data_in, num_read) = \
+            self.bus.write_read(addr, data_out, data_in)
+
+        self.recorder.add(self.unique_id, start,
+                     trace_event(OP_WRITE_READ, addr, status, num_written,
+                                 num_read, data_out, data_in,
+                                 pySCPI_scheduler.monotonic() - start))
+
+        return (status, num_written, data_in, num_read)
+    # end def
+
+
+    def sleep_ms(self, delay_ms):
+        """
+        Wait on the adapter's clock.
+
+        @param[in]  delay_ms:  The time to wait in ms (int).
+        """
+        self.bus.sleep_ms(delay_ms)
+    # end def
+
+
+    def close(self):
+        """
+        Close the adapter.
+        """
+        self.bus.close()
+    # end def
+# end class
+
+
+class replay_transport(pySCPI_transport.bus_transport):
+    """
+    Class answering I2C transactions with those recorded in the trace
+    that was loaded, at once or taking as long as they did when recorded.
+
+    @attribute stream  (trace_stream)  The adapter that is open, None if
+                                       it is not.
+    """
+    name = 'replay'
+
+    def __init__(self):
+        """
+        Initialise a replayed adapter that is not open.
+        """
+        self.stream = None
+    # end def
+
+
+    def find(self):
+        """
+        Find every adapter in the trace.
+
+        @return     (list)     (port, unique ID, True if free) of each
+                               adapter (tuples).
+        """
+        return [(port, unique_id, not streams[unique_id].in_use)
+                for (port, unique_id) in sorted(ports.items())]
+    # end def
+
+
+    def open(self, port):
+        """
+        Open a replayed adapter.
+
+        @param[in]  port:      The port the adapter was recorded on (int).
+        @return     (bool)     True if the adapter was opened.
+        """
+        if (port not in ports) or streams[ports[port]].in_use:
+            return False
+        # end if
+
+        self.stream = streams[ports[port]]
+        self.stream.in_use = True
+
+        return True
+    # end def
+
+
+    def status(self):
+        """
+        Check that the adapter is still in the trace.
+
+        @return     (int)      The unique ID of the adapter, 0 if another
+                               trace has been loaded.
+        """
+        if (self.stream == None) or \
+           (streams.get(self.stream.unique_id) != self.stream):
+            return 0
+        # end if
+
+        return self.stream.unique_id
+    # end def
+
+
+    def set_bitrate(self, bitrate):
+        """
+        Set the I2C bitrate.
+
+        @param[in]  bitrate:   The requested bitrate in kHz (int).
+        @return     (int)      The bitrate used when recorded in kHz.
+        """
+        event = self.stream.next_event(OP_BITRATE, bitrate)
+
+        if event == None:
+            return bitrate
+        # end if
+
+        return event.status
+    # end def
+
+
+    def write(self, addr, data_out):
+        """
+        Write to a replayed slave.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @return     (tuple)    The status of the write and the number of
+                               bytes written.
+        """
+        event = self.stream.next_event(OP_WRITE, addr, data_out)
+
+        if event == None:
+            return (pySCPI_transport.STATUS_BUS_ERROR, 0)
+        # end if
+
+        self.stream.wait(event)
+
+        return (event.status, event.num_written)
+    # end def
+
+
+    def read(self, addr, data_in):
+        """
+        Read from a replayed slave.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The status of the read, the buffer and the
+                               number of bytes read.
+        """
+        event = self.stream.next_event(OP_READ, addr, [], len(data_in))
+
+        if event == None:
+            return (pySCPI_transport.STATUS_BUS_ERROR, data_in, 0)
+        # end if
+
+        self.stream.wait(event)
+
+        for (index, byte) in enumerate(event.data_in):
+            data_in[index] = byte
+        # end for
+
+        return (event.status, data_in, event.num_read)
+    # end def
+
+
+    def write_read(self, addr, data_out, data_in):
+        """
+        Write to a replayed slave and read its reply.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The combined status, the number of bytes
+                               written, the buffer and the number of bytes
+                               read.
+        """
+        event = self.stream.next_event(OP_WRITE_READ, addr, data_out,
+                                       len(data_in))
+
+        if event == None:
+            return (pySCPI_transport.STATUS_BUS_ERROR, 0, data_in, 0)
+        # end if
+
+        self.stream.wait(event)
+
+        for (index, byte) in enumerate(event.data_in):
+            data_in[index] = byte
+        # end for
+
+        return (event.status, event.num_written, data_in, event.num_read)
+    # end def
+
+
+    def sleep_ms(self, delay_ms):
+        """
+        Wait as the adapter's clock did, only when replaying in real time.
+
+        @param[in]  delay_ms:  The time to wait in ms (int).
+        """
+        if (self.stream != None) and self.stream.real_time:
+            time.sleep(delay_ms/1000.0)
+        # end if
+    # end def
+
+
+    def close(self):
+        """
+        Close the replayed adapter.
+        """
+        if self.stream != None:
+            self.stream.in_use = False
+            self.stream = None
+        # end if
+    # end def
+# end class
+
+
+# ---------
+# Trace
+
+# the port each adapter in the loaded trace was found on, by port
+ports = {}
+
+# the recorded transactions of each adapter, by unique ID (trace_stream)
+streams = {}
+
+
+#
+# ----------------
+# Public Functions
+
+def start_recording(filename):
+    """
+    Record every transaction of the transport in use to a trace file until
+    recording is stopped. Adapters opened before recording started are not
+    recorded.
+
+    @param[in]  filename:  The trace file (string).
+    @return     (bool)     True if the trace file could be written.
+    """
+    stop_recording()
+
+    try:
+        recording_transport.recorder = \
+            trace_recorder(filename, pySCPI_transport.current)
+    except IOError:
+        print '*** Could not write the trace file ' + filename + ' ***'
+        return False
+    # end try
+
+    pySCPI_transport.current = recording_transport
+
+    return True
+# end def
+
+
+def stop_recording():
+    """
+    Stop recording and close the trace file, the transport recorded is used
+    again.
+    """
+    recorder = recording_transport.recorder
+
+    if recorder != None:
+        recorder.close()
+        pySCPI_transport.current = recorder.recorded
+        recording_transport.recorder = None
+    # end if
+# end def
+
+
+def load_trace(filename, replay_real_time = False):
+    """
+    Load a trace file to be replayed by the replay transport.
+
+    @param[in]  filename:          The trace file (string).
+    @param[in]  replay_real_time:  OPTIONAL, True to take as long as each
+                                   transaction did when recorded, False to
+                                   answer at once (bool).
+    @return     (bool)             True if the trace was loaded.
+    """
+    try:
+        trace_file = open(filename, 'rb')
+        rows = list(csv.reader(trace_file, delimiter = '\t'))
+        trace_file.close()
+    except IOError:
+        print '*** Could not read the trace file ' + filename + ' ***'
+        return False
+    # end try
+
+    if (len(rows) == 0) or (rows[0] != trace_header):
+        print '*** ' + filename + ' is not a pySCPI trace file ***'
+        return False
+    # end if
+
+    ports.clear()
+    streams.clear()
+
+    for (line, row) in enumerate(rows[1:]):
+        try:
+            unique_id = int(row[1])
+            op = row[2]
+
+            if unique_id not in streams:
+                streams[unique_id] = trace_stream(unique_id, replay_real_time)
+            # end if
+
+            if op == OP_ADAPTER:
+                ports[int(row[3])] = unique_id
+            else:
+                streams[unique_id].events.append(
+                    trace_event(op, int(row[3]), int(row[4]), int(row[5]),
+                                int(row[6]), parse_hex(row[7]),
+                                parse_hex(row[8]), float(row[9])/1000))
+            # end if
+
+        except (IndexError, ValueError):
+            print '*** Line ' + str(line + 2) + ' of ' + filename + \
+                  ' is not a recorded transaction ***'
+            return False
+        # end try
+    # end for
+
+    return True
+# end def
+
+
+def report():
+    """
+    Print how much of each adapter's trace was replayed and how closely
+    the replay followed it.
+    """
+    for unique_id in sorted(streams):
+        stream = streams[unique_id]
+
+        if stream.replayed + stream.unmatched == 0:
+            continue
+        # end if
+
+        print 'Replayed %d of %d transactions of %s, %d reads repeated, ' \
+              '%d skipped, %d not in the trace' % \
+              (stream.replayed, len(stream.events), 
+               pySCPI_session.serial_string(unique_id),
+               stream.repeated, stream.skipped, stream.unmatched)
+    # end for
+# end def
+
+
+#
+# ----------------
+# Private Functions
+
+def hex_string(data):
+    """
+    Convert bytes to hex for a trace file.
+
+    @param[in]  data:      The bytes (list of ints).
+    @return     (string)   Two hex digits for each byte.
+    """
+    return ''.join(['%02x' % byte for byte in data])
+# end def
+
+
+def parse_hex(text):
+    """
+    Convert hex from a trace file to bytes.
+
+    @param[in]  text:      Two hex digits for each byte (string).
+    @return     (list)     The bytes (ints).
+    """
+    return [int(text[index:index + 2], 16)
+            for index in range(0, len(text), 2)]
+# end def
+
+
+# close the trace file however pySCPI exits
+atexit.register(stop_recording)
+
+# make replaying a trace a transport that can be chosen in pySCPI_config.xml
+pySCPI_transport.transports[replay_transport.name] = replay_transport
@@ -0,0 +1,446 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_scaling.py
+Module to find how logging keeps up as the number of modules grows, by
+logging generated command lists from racks of simulated modules of
+increasing size and measuring the samples per second, processor time per
+sample, memory growth and cycle jitter of each. Run
+'python src/pySCPI_scaling.py -h' from the pySCPI directory for the options.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_config
+import pySCPI_headless
+import pySCPI_scheduler
+import pySCPI_session
+import pySCPI_simulator
+import pySCPI_transport
+import argparse
+import csv
+import gc
+import os
+import sys
+import tempfile
+import threading
+try:
+    import resource
+except ImportError:
+    # the peak memory is not available on Windows
+    resource = None
+# end try
+
+
+# ---------
+# Constants
+
+# columns of the results table
+result_header = ['Modules', 'Adapters', 'Requests', 'Period (s)',
+                 'Cycles', 'Samples/s', 'CPU/sample (ms)',
+                 'Objects Grown', 'Peak Memory Grown (kB)',
+                 'Jitter Mean (ms)', 'Jitter Max (ms)', 'Overruns',
+                 'Errors']
+
+
+# ---------
+# Classes
+
+class quiet_output:
+    """
+    Class standing in for stdout during a measured run so that printing
+    every read does not count against logging, keeping only the lines
+    that are needed afterwards. The measurement starts once the logging
+    period is known, after calibration if there is one, and the run is
+    stopped a set time later.
+
+    @attribute terminator (terminator_event) Stops the run.
+    @attribute duration   (float)  Seconds to measure for.
+    @attribute errors     (int)    Error lines printed.
+    @attribute period     (float)  The calibrated logging period, None if
+                                   it was not calibrated.
+    @attribute start_time (float)  When the measurement started, None
+                                   before it does.
+    @attribute start_cpu  (float)  Processor time used by then in s.
+    """
+    def __init__(self, terminator, duration):
+        """
+        Initialise the output with nothing printed.
+
+        @param[in]  terminator:  Stops the run 
+                                 (pySCPI_threading.terminator_event).
+        @param[in]  duration:    Seconds to measure for (float).
+        """
+        self.terminator = terminator
+        self.duration = duration
+        self.errors = 0
+        self.period = None
+        self.start_time = None
+        self.start_cpu = 0.0
+    # end def
+
+
+    def begin(self):
+        """
+        Start the measurement and stop the run when it is over.
+        """
+        self.start_time = pySCPI_scheduler.monotonic()
+        self.start_cpu = sum(os.times()[0:2])
+
+        timer = threading.Timer(self.duration, self.terminator.kill_log)
+        timer.daemon = True
+        timer.start()
+    # end def
+
+
+    def write(self, text):
+        """
+        Discard printed text, noting errors and the logging period.
+
+        @param[in]  text:  The text printed (string).
+        """
+        if text.startswith('***'):
+            self.errors += 1
+
+        elif text.startswith('Calibrated logging period: '):
+            self.period = float(text.split()[3].rstrip('s'))
+            self.begin()
+        # end if
+    # end def
+
+
+    def flush(self):
+        """
+        Nothing is buffered.
+        """
+        pass
+    # end def
+# end class
+
+
+#
+# ----------------
+# Public Functions
+
+def generate_commands(rack, requests):
+    """
+    Generate a command list that reads telemetry from every module of a
+    rack, changing adapter and address as it goes.
+
+    @param[in]  rack:      The simulated adapters (list of sim_bus).
+    @param[in]  requests:  The telemetry requests to make of each module
+                           (int).
+    @return     (list)     The command list (strings).
+    """
+    commands = []
+
+    for bus in rack:
+        commands.append('<ADAPTER ' +
+                        pySCPI_session.serial_string(bus.unique_id) + '>')
+
+        for addr in sorted(bus.modules.keys()):
+            module = bus.modules[addr]
+            commands.append('<ADDRESS 0x%02X>' % addr)
+            commands.extend(data_requests(module)[:requests])
+        # end for
+    # end for
+
+    return commands
+# end def
+
+
+def measure(host, module_count, adapters, requests, duration, period = 0,
+            delay = 5, latency = 2, faults = 'none'):
+    """
+    Log a generated command list from a rack of simulated modules for a
+    while and measure how well logging kept up.
+
+    @param[in]  host:          The host to run with
+                               (pySCPI_headless.console_host).
+    @param[in]  module_count:  The number of modules (int).
+    @param[in]  adapters:      The number of adapters they are shared
+                               between (int).
+    @param[in]  requests:      The telemetry requests made of each module
+                               every cycle (int).
+    @param[in]  duration:      Seconds to log for (float).
+    @param[in]  period:        OPTIONAL, the logging period in seconds, 0 to
+                               calibrate it (float).
+    @param[in]  delay:         OPTIONAL, the intermessage delay in ms (int).
+    @param[in]  latency:       OPTIONAL, the time modules take to prepare
+                               a reply in ms (float).
+    @param[in]  faults:        OPTIONAL, the fault profile of the modules
+                               (string).
+    @return     (list)         A row of the results table, None if the
+                               modules did not fit on the adapters or 
+                               logging did not start.
+    """
+    # start from a new rack with no sessions open on the old one
+    pySCPI_session.close_sessions()
+
+    rack = pySCPI_simulator.build_large_rack(host.scpi_commands,
+                                             module_count, adapters,
+                                             latency = latency,
+                                             faults = faults)
+
+    if rack == None:
+        return None
+    # end if
+
+    commands = generate_commands(rack, requests)
+    request_count = len([command for command in commands
+                         if 'TEL?' in command])
+
+    # log every request rather than reusing replies
+    defaults = host.defaults
+    directives = pySCPI_config.write_directives(commands, 
+                                                rack[0].modules.keys()[0],
+                                                delay, delay*4, period,
+                                                defaults.transaction_mode,
+                                                defaults.read_mode,
+                                                defaults.overrun_policy,
+                                                defaults.interleave == 'on',
+                                                'off')
+
+    (handle, filename) = tempfile.mkstemp('.csv')
+    os.close(handle)
+
+    # measure from a clean heap
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    memory_before = peak_memory()
+
+    output = quiet_output(host.terminator, duration)
+    sys.stdout = output
+
+    if period != 0:
+        # there is no calibration to wait for
+        output.begin()
+    # end if
+
+    try:
+        pySCPI_headless.run(host, directives, filename)
+    finally:
+        sys.stdout = sys.__stdout__
+    # end try
+
+    if output.start_time == None:
+        # logging never started
+        return None
+    # end if
+
+    elapsed = pySCPI_scheduler.monotonic() - output.start_time
+    cpu_used = sum(os.times()[0:2]) - output.start_cpu
+    gc.collect()
+    objects_grown = len(gc.get_objects()) - objects_before
+    memory_grown = peak_memory() - memory_before
+
+    # each row of the log is a cycle
+    (cycles, jitters, overruns) = read_log(filename)
+    os.remove(filename)
+
+    samples = cycles*request_count
+
+    if len(jitters) > 0:
+        jitter_mean = sum(jitters)/len(jitters)
+        jitter_max = max(jitters)
+    else:
+        (jitter_mean, jitter_max) = (0.0, 0.0)
+    # end if
+
+    if output.period != None:
+        period = output.period
+    # end if
+
+    return [module_count, adapters, request_count, period, cycles,
+            round(samples/elapsed, 1),
+            round(1000*cpu_used/max(samples, 1), 3), objects_grown,
+            memory_grown, round(jitter_mean, 1), round(jitter_max, 1),
+            overruns, output.errors]
+# end def
+
+
+#
+# ----------------
+# Private Functions
+
+def data_requests(module):
+    """
+    Find the telemetry data requests of a module whose replies change, so
+    that none can be reused from the response cache.
+
+    @param[in]  module:    The simulated module (sim_module).
+    @return     (list)     The requests (strings) in command order.
+    """
+    library = module.library
+    requests = [command for command in library.SCPI_Data.keys()
+                if command.startswith(module.device + ':') and
+                command.endswith(',data') and
+                library.SCPI_Data[command][1] != 'ascii' and
+                library.cache_ttl.get(command) != pySCPI_config.static_ttl]
+
+    # order by the number of the telemetry item
+    return sorted(requests, key = lambda command:
+                  int(command.split(' ')[1].split(',')[0]))
+# end def
+
+
+def peak_memory():
+    """
+    Find the most memory the process has used.
+
+    @return     (int)      The peak memory in kB, 0 if it is not known.
+    """
+    if resource == None:
+        return 0
+    # end if
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS counts bytes rather than kB
+    if sys.platform == 'darwin':
+        peak //= 1024
+    # end if
+
+    return peak
+# end def
+
+
+def read_log(filename):
+    """
+    Read the scheduling columns of a log file.
+
+    @param[in]  filename:  The log file (string).
+    @return     (tuple)    The number of cycles logged, the start jitter of
+                           each (list of floats) and the number that
+                           overran.
+    """
+    log_file = open(filename, 'rb')
+    rows = list(csv.reader(log_file, delimiter = '\t'))[1:]
+    log_file.close()
+
+    jitters = []
+    overruns = 0
+
+    for row in rows:
+        try:
+            jitters.append(float(row[-2]))
+            overruns += int(float(row[-1]) > 0)
+        except (ValueError, IndexError):
+            # skipped slots have no scheduling figures
+            pass
+        # end try
+    # end for
+
+    return (len(rows), jitters, overruns)
+# end def
+
+
+def parse_counts(text):
+    """
+    Read a list of module counts.
+
+    @param[in]  text:      The counts separated by commas (string).
+    @return     (list)     The counts (ints).
+    """
+    try:
+        counts = [int(count) for count in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError('use counts such as 8,32,128')
+    # end try
+
+    if min(counts) < 1:
+        raise argparse.ArgumentTypeError('module counts must be positive')
+    # end if
+
+    return counts
+# end def
+
+
+if __name__ == '__main__':
+    # if this code is not running as an imported module run the harness
+    parser = argparse.ArgumentParser(description = 'Log from growing '
+                                     'racks of simulated modules and '
+                                     'report how logging keeps up.')
+    parser.add_argument('-m', '--modules', type = parse_counts,
+                        default = [8, 32, 128, 256], metavar = 'N,N,...',
+                        help = 'module counts to measure (default '
+                        '8,32,128,256)')
+    parser.add_argument('-a', '--adapters', type = int, default = 4,
+                        help = 'adapters the modules are shared between '
+                        '(default 4)')
+    parser.add_argument('-r', '--requests', type = int, default = 2,
+                        help = 'telemetry requests made of each module '
+                        'every cycle (default 2)')
+    parser.add_argument('-d', '--duration', type = float, default = 10,
+                        help = 'seconds to log each count for (default 10)')
+    parser.add_argument('-p', '--period', type = float, default = 0,
+                        help = 'logging period in seconds (default '
+                        'calibrated for each count)')
+    parser.add_argument('--delay', type = int, default = 5,
+                        help = 'intermessage delay in ms (default 5)')
+    parser.add_argument('--latency', type = float, default = 2,
+                        help = 'time modules take to prepare a reply in ms '
+                        '(default 2)')
+    parser.add_argument('--faults', default = 'none',
+                        choices = sorted(pySCPI_simulator.fault_profiles),
+                        help = 'faults the modules inject (default none)')
+    parser.add_argument('-o', '--output', metavar = 'FILE',
+                        help = 'also write the results to this csv file')
+    args = parser.parse_args()
+
+    host = pySCPI_headless.load_host()
+    host.defaults.transport = pySCPI_simulator.simulated_transport.name
+    pySCPI_transport.select(host.defaults.transport)
+
+    results = []
+
+    for module_count in args.modules:
+        print 'Logging from ' + str(module_count) + ' modules on ' + \
+              str(args.adapters) + ' adapters for ' + \
+              str(args.duration) + 's...'
+
+        row = measure(host, module_count, args.adapters, args.requests,
+                      args.duration, args.period, args.delay, args.latency,
+                      args.faults)
+
+        if row == None:
+            break
+        # end if
+
+        results.append(row)
+        print '\t'.join([str(cell) for cell in row])
+    # end for
+
+    # print the table with aligned columns
+    print ''
+    widths = [max(len(str(cell)) for cell in column)
+              for column in zip(result_header, *results)]
+
+    for row in [result_header] + results:
+        print '  '.join([str(cell).rjust(width)
+                         for (cell, width) in zip(row, widths)])
+    # end for
+
+    if args.output != None:
+        csv_output = open(args.output, 'wb')
+        output_writer = csv.writer(csv_output, delimiter = '\t')
+        output_writer.writerow(result_header)
+        output_writer.writerows(results)
+        csv_output.close()
+    # end if
+# end if
@@ -0,0 +1,475 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_scheduler.py
+Module to pace the logging loop of pySCPI against absolute deadlines
+taken from a monotonic clock and to decide which commands are sampled in
+each cycle.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import os
+import time
+import platform
+import ctypes
+import ctypes.util
+import pySCPI_plan
+
+
+# ---------
+# Constants
+
+# longest sleep between checks for a stop request in seconds, on python 2
+# Event.wait with a timeout itself polls in sleeps of up to 50ms so it 
+# cannot be used to notice a stop quickly
+stop_check_s = 0.002
+
+# clock id of CLOCK_MONOTONIC on linux
+clock_monotonic_id = 1
+
+# time taken for a bitrate or pullup change to settle in ms
+config_settle_ms = 200
+
+# shortest fraction of the intermessage delay used when compressing
+min_delay_scale = 0.25
+
+# fraction of the intermessage delay restored after each cycle that fits
+delay_restore_step = 0.25
+
+# longest timetable searched when staggering commands in cycles
+max_hyperperiod = 3600
+
+
+# ---------
+# Classes
+
+class timespec(ctypes.Structure):
+    """
+    Structure returned by clock_gettime.
+    """
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+# end class
+
+
+class cycle_scheduler:
+    """
+    Class to start logging cycles on a fixed grid of absolute deadlines
+    so that the period does not drift with the time each cycle takes, and 
+    to count and handle the cycles that overrun their period.
+
+    @attribute period        (float) The logging period in seconds.
+    @attribute policy        (str)   What to do after an overrun: 'skip' 
+                                     waits for the next free slot, 'late' 
+                                     starts the next cycle at once and 
+                                     restarts the grid from there, 
+                                     'compress' keeps the grid and shortens
+                                     intermessage delays to catch up.
+    @attribute deadline      (float) Monotonic time the next cycle is due.
+    @attribute jitter_ms     (float) How late the last cycle started in ms.
+    @attribute max_jitter_ms (float) The latest any cycle has started in ms.
+    @attribute total_jitter  (float) Sum of the start jitter in ms.
+    @attribute cycles        (int)   The number of cycles started.
+    @attribute slot          (int)   The index of the current cycle on the
+                                     grid, including skipped cycles.
+    @attribute overrun_ms    (float) How far the last cycle ran past the
+                                     end of its slot in ms.
+    @attribute overruns      (int)   The number of cycles that overran.
+    @attribute skipped       (int)   The number of slots given up.
+    @attribute delay_scale   (float) Fraction of the intermessage delay
+                                     currently used.
+    """
+    def __init__(self, period, policy = 'skip'):
+        """
+        Initialise the scheduler with the first cycle due now.
+
+        @param[in]  period:  The logging period in seconds (float).
+        @param[in]  policy:  OPTIONAL, what to do after an overrun, 'skip',
+                             'late' or 'compress' (string).
+        """
+        self.period = float(period)
+        self.policy = policy
+        self.deadline = monotonic()
+        self.jitter_ms = 0.0
+        self.max_jitter_ms = 0.0
+        self.total_jitter = 0.0
+        self.cycles = 1
+        self.slot = 0
+        self.overrun_ms = 0.0
+        self.overruns = 0
+        self.skipped = 0
+        self.delay_scale = 1.0
+    # end def
+
+
+    def advance(self):
+        """
+        End the current cycle, noting whether it overran, and move the 
+        deadline on to the start of the next cycle.
+        """
+        now = monotonic()
+        self.slot += 1
+
+        # how far the cycle ran past the end of its slot
+        late = now - (self.deadline + self.period)
+        self.overrun_ms = max(0.0, late*1000)
+
+        if late <= 0:
+            # the cycle fitted so the next one is due on the grid
+            self.deadline += self.period
+
+            if self.policy == 'compress':
+                # gradually return to the full intermessage delay
+                self.delay_scale = min(1.0, self.delay_scale + 
+                                       delay_restore_step)
+            # end if
+
+            return
+        # end if
+
+        self.overruns += 1
+
+        if self.policy == 'late':
+            # start the next cycle now and keep the period from there
+            self.deadline = now
+
+        elif self.policy == 'compress':
+            # start the next cycle late but on the grid and shorten the
+            # delays so that later cycles catch up
+            self.deadline += self.period
+            self.delay_scale = max(min_delay_scale, self.delay_scale/2)
+
+            # whole periods cannot be caught up so those slots are given up
+            if late > self.period:
+                missed = int(late/self.period)
+                self.deadline += missed*self.period
+                self.slot += missed
+                self.skipped += missed
+            # end if
+
+        else:
+            # give up every slot up to the next one still in the future
+            missed = int(late/self.period) + 1
+            self.deadline += (missed + 1)*self.period
+            self.slot += missed
+            self.skipped += missed
+        # end if
+    # end def
+
+
+    def delay_ms(self, delay_time):
+        """
+        Get the intermessage delay to use in the current cycle.
+
+        @param[in]  delay_time:  The requested intermessage delay in ms
+                                 (int).
+        @return     (int)        The delay to use in ms.
+        """
+        return int(round(delay_time*self.delay_scale))
+    # end def
+
+
+    def wait(self, kill_event):
+        """
+        Wait until the next cycle is due.
+
+        @param[in]  kill_event:  Event that ends the wait early when a
+                                 stop is requested (threading.Event).
+        @return     (bool)       True if the next cycle should start,
+                                 False if a stop was requested.
+        """
+        if not sleep_until(self.deadline, kill_event):
+            return False
+        # end if
+
+        # record how late this cycle is starting
+        self.jitter_ms = (monotonic() - self.deadline)*1000
+        self.max_jitter_ms = max(self.max_jitter_ms, self.jitter_ms)
+        self.total_jitter += self.jitter_ms
+        self.cycles += 1
+
+        return not kill_event.isSet()
+    # end def
+
+
+    def summary(self):
+        """
+        Describe the start jitter and overruns of the cycles run so far.
+
+        @return     (string)  A line summarising the timing.
+        """
+        return 'Cycle start jitter: mean ' + \
+               '%.1f' % (self.total_jitter/self.cycles) + 'ms, max ' + \
+               '%.1f' % self.max_jitter_ms + 'ms over ' + \
+               str(self.cycles) + ' cycles\n' + \
+               'Overruns: ' + str(self.overruns) + ' cycles overran their '\
+               'period, ' + str(self.skipped) + ' slots skipped'
+    # end def
+# end class
+
+
+class timetable:
+    """
+    Class to decide which operations of a plan are sampled in each logging
+    cycle when blocks of commands are given their own sampling period.
+    Slower blocks are staggered across cycles so that the busiest cycle
+    uses as little bus time as possible.
+
+    @attribute peak_ms    (float) The estimated bus time of the busiest
+                                  cycle in ms.
+    @attribute multi_rate (bool)  True if any block is not sampled every
+                                  cycle.
+    """
+    def __init__(self, plan, base_period, delay_time):
+        """
+        Build the timetable and set the every and phase of each operation.
+
+        @param[in]  plan:         The plan to be logged
+                                  (pySCPI_plan.execution_plan).
+        @param[in]  base_period:  The logging period in seconds (float).
+        @param[in]  delay_time:   The intermessage delay in ms (int).
+        """
+        # group consecutive operations that share a period into blocks
+        blocks = []
+        for op in plan.ops:
+            if (len(blocks) == 0) or (blocks[-1][0].period != op.period):
+                blocks.append([op])
+            else:
+                blocks[-1].append(op)
+            # end if
+        # end for
+
+        # find how many cycles apart each block is sampled
+        for block in blocks:
+            period = block[0].period
+            every = max(1, int(round(period/base_period)))
+
+            if (period > 0) and (period < base_period):
+                print '*** Sampling period of ' + str(period) + 's is '\
+                      'shorter than the logging period, sampling every '\
+                      'cycle ***'
+            # end if
+
+            for op in block:
+                op.every = every
+                op.phase = 0
+            # end for
+        # end for
+
+        self.multi_rate = any(block[0].every > 1 for block in blocks)
+
+        # the timetable repeats after the lowest common multiple of the
+        # block periods, limited to keep the search short
+        hyperperiod = 1
+        for block in blocks:
+            hyperperiod = lcm(hyperperiod, block[0].every)
+        # end for
+        hyperperiod = min(hyperperiod, max_hyperperiod)
+
+        # place the most expensive blocks first, each in the phase that
+        # keeps its busiest cycle lightest
+        load = [0.0]*hyperperiod
+        costs = [sum(estimate_ms(op, delay_time)*op.repeats 
+                     for op in block) for block in blocks]
+
+        for index in sorted(range(len(blocks)), key = lambda i: -costs[i]):
+            block = blocks[index]
+            every = block[0].every
+
+            phase = min(range(min(every, hyperperiod)),
+                        key = lambda p: max(load[p::every]))
+
+            for cycle in range(phase, hyperperiod, every):
+                load[cycle] += costs[index]
+            # end for
+
+            for op in block:
+                op.phase = phase
+            # end for
+        # end for
+
+        self.peak_ms = max(load)
+    # end def
+
+
+    def due(self, op, slot):
+        """
+        Determine if an operation is sampled in a given cycle.
+
+        @param[in]  op:      The operation (pySCPI_plan.plan_op).
+        @param[in]  slot:    The index of the cycle on the grid (int).
+        @return     (bool)   True if the operation should be performed.
+        """
+        return (slot % op.every) == op.phase
+    # end def
+# end class
+
+
+#
+# ----------------
+# Public Functions
+
+def monotonic():
+    """
+    Get the time from a clock that never goes backwards or jumps with
+    changes to the wall clock.
+
+    @return     (float)   Time in seconds from an arbitrary start.
+    """
+    return clock_source()
+# end def
+
+
+def sleep_until(deadline, kill_event):
+    """
+    Sleep until a monotonic time, waking early if a stop is requested. The
+    sleep is taken in short steps so a stop is noticed within a few ms.
+
+    @param[in]  deadline:    The monotonic time to wake at (float).
+    @param[in]  kill_event:  Event that ends the sleep early when a stop
+                             is requested (threading.Event).
+    @return     (bool)       True if the sleep completed, False if a stop
+                             was requested.
+    """
+    remaining = deadline - monotonic()
+
+    while remaining > 0:
+        if kill_event.isSet():
+            return False
+        # end if
+
+        time.sleep(min(remaining, stop_check_s))
+        remaining = deadline - monotonic()
+    # end while
+
+    return not kill_event.isSet()
+# end def
+
+
+def estimate_ms(op, delay_time):
+    """
+    Estimate the time an operation occupies the logging loop for.
+
+    @param[in]  op:          The operation (pySCPI_plan.plan_op).
+    @param[in]  delay_time:  The intermessage delay in ms (int).
+    @return     (float)      The estimated time in ms.
+    """
+    if op.kind in [pySCPI_plan.OP_LOOP, pySCPI_plan.OP_END_LOOP]:
+        # loops do not use the bus
+        return 0.0
+    # end if
+
+    # every operation is followed by the intermessage delay
+    time_ms = delay_time
+
+    if op.kind in [pySCPI_plan.OP_TELEMETRY, pySCPI_plan.OP_WAIT]:
+        # waits take at least one poll
+        time_ms += op.read_delay
+
+    elif op.kind == pySCPI_plan.OP_DELAY:
+        time_ms += op.value
+
+    elif op.kind in [pySCPI_plan.OP_BITRATE, pySCPI_plan.OP_PULLUPS]:
+        time_ms += config_settle_ms
+    # end if
+
+    return float(time_ms)
+# end def
+
+
+#
+# ----------------
+# Private Functions
+
+def lcm(a, b):
+    """
+    Find the lowest common multiple of two positive integers.
+
+    @param[in]  a:       The first integer (int).
+    @param[in]  b:       The second integer (int).
+    @return     (int)    The lowest common multiple.
+    """
+    x, y = a, b
+    while y:
+        x, y = y, x % y
+    # end while
+
+    return a*b // x
+# end def
+
+
+def find_clock():
+    """
+    Find the best monotonic clock available on this system.
+
+    @return     (function) Function returning the time in seconds.
+    """
+    if hasattr(time, 'monotonic'):
+        # python 3 provides one
+        return time.monotonic
+
+    elif platform.system() == 'Windows':
+        # time.clock is the high resolution performance counter on windows
+        return time.clock
+
+    elif platform.system() != 'Linux':
+        # the id of CLOCK_MONOTONIC differs on other systems so fall back 
+        # to the wall clock
+        return time.time
+    # end if
+
+    try:
+        # use clock_gettime directly on linux
+        libc = ctypes.CDLL(ctypes.util.find_library('rt') or
+                           ctypes.util.find_library('c'), use_errno = True)
+        clock_gettime = libc.clock_gettime
+        clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(timespec)]
+
+        def linux_monotonic():
+            """
+            Read CLOCK_MONOTONIC.
+
+            @return     (float)   Time in seconds from an arbitrary start.
+            """
+            now = timespec()
+
+            if clock_gettime(clock_monotonic_id, ctypes.byref(now)) != 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, 'clock_gettime failed: ' + 
+                              os.strerror(errno))
+            # end if
+
+            return now.tv_sec + now.tv_nsec*1e-9
+        # end def
+
+        # check that the clock can be read before relying on it
+        linux_monotonic()
+
+        return linux_monotonic
+
+    except (OSError, AttributeError, TypeError), error:
+        # no monotonic clock could be found so fall back to the wall clock
+        print '*** No monotonic clock, using the wall clock: ' + \
+              str(error) + ' ***'
+        return time.time
+    # end try
+# end def
+
+
+# the clock used by monotonic()
+clock_source = find_clock()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_session.py
+Module to keep Aardvark adapters open and configured between runs of
+pySCPI so that each run does not pay the cost of opening and setting up
+the adapter again.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_transport
+import atexit
+
+
+# ---------
+# Constants
+
+# open sessions keyed by the port of their adapter
+pool = {}
+
+
+# ---------
+# Classes
+
+class aardvark_session:
+    """
+    Class containing an open Aardvark and the I2C settings it is known to
+    be using, so that settings already in place are not applied again.
+
+    @attribute port              (int)  The port the Aardvark is on.
+    @attribute bus               (bus_transport) The open adapter.
+    @attribute unique_id         (int)  The serial number of the Aardvark.
+    @attribute bitrate           (int)  The bitrate in use in kHz, None if
+                                        unknown.
+    @attribute requested_bitrate (int)  The bitrate last asked for in kHz.
+    @attribute pullups           (bool) True if the pullups are on, None if
+                                        unknown.
+    @attribute split_addrs       (set)  Addresses that have failed a combined
+                                        write+read and are read with split
+                                        transactions.
+    """
+    def __init__(self, port, bus):
+        """
+        Initialise a session for a newly opened Aardvark.
+
+        @param[in]  port:    The port the Aardvark is on (int).
+        @param[in]  bus:     The open adapter 
+                             (pySCPI_transport.bus_transport).
+        """
+        self.port = port
+        self.bus = bus
+        self.unique_id = bus.status()
+        self.bitrate = None
+        self.requested_bitrate = None
+        self.pullups = None
+        self.split_addrs = set()
+    # end def
+
+
+    def is_alive(self):
+        """
+        Check that the Aardvark is still connected and is the same one.
+
+        @return     (bool)     True if the session can still be used.
+        """
+        return (self.unique_id > 0) and \
+               (self.bus.status() == self.unique_id)
+    # end def
+
+
+    def set_bitrate(self, bitrate):
+        """
+        Set the I2C bitrate unless it is already in use.
+
+        @param[in]  bitrate:  The requested bitrate in kHz (int).
+        @return     (bool)    True if the bitrate was changed.
+        """
+        if bitrate in [self.requested_bitrate, self.bitrate]:
+            return False
+        # end if
+
+        # the Aardvark uses the closest rate it supports
+        self.bitrate = self.bus.set_bitrate(bitrate)
+        self.requested_bitrate = bitrate
+
+        return True
+    # end def
+
+
+    def set_pullups(self, pullups):
+        """
+        Turn the I2C pullups on or off unless they already are.
+
+        @param[in]  pullups:  True to turn the pullups on (bool).
+        @return     (bool)    True if the pullups were changed.
+        """
+        if self.pullups == pullups:
+            return False
+        # end if
+
+        self.bus.set_pullups(pullups)
+        self.pullups = pullups
+
+        return True
+    # end def
+
+
+    def close(self):
+        """
+        Close the Aardvark.
+        """
+        self.bus.close()
+    # end def
+# end class
+
+
+#
+# ----------------
+# Public Functions
+
+def reuse_session(unique_id = None):
+    """
+    Find a session left open by an earlier run that can still be used,
+    closing any whose Aardvark has been disconnected.
+
+    @param[in]  unique_id:  OPTIONAL, the unique ID of the Aardvark wanted,
+                            None for any Aardvark (int).
+    @return     (aardvark_session) The session, None if there is none.
+    """
+    for port in sorted(pool.keys()):
+        session = pool[port]
+
+        if not session.is_alive():
+            # the adapter has gone so forget it
+            session.close()
+            del pool[port]
+
+        elif unique_id in [None, session.unique_id]:
+            return session
+        # end if
+    # end for
+
+    return None
+# end def
+
+
+def find_adapters():
+    """
+    Find every Aardvark connected, including those in use, through the 
+    transport in use.
+
+    @return     (list)     (port, unique ID, True if free) of each Aardvark 
+                           (tuples).
+    """
+    return pySCPI_transport.create().find()
+# end def
+
+
+def serial_string(unique_id):
+    """
+    Format a unique ID the way it is printed on the Aardvark.
+
+    @param[in]  unique_id:  The unique ID (int).
+    @return     (string)    The serial number as XXXX-XXXXXX.
+    """
+    return '%04d-%06d' % (unique_id // 1000000, unique_id % 1000000)
+# end def
+
+
+def open_session(port):
+    """
+    Open the Aardvark on a port and add it to the pool.
+
+    @param[in]  port:    The port the Aardvark is on (int).
+    @return     (aardvark_session) The new session, None if the Aardvark
+                                   could not be opened.
+    """
+    bus = pySCPI_transport.create()
+
+    if not bus.open(port):
+        return None
+    # end if
+
+    session = aardvark_session(port, bus)
+    pool[port] = session
+
+    return session
+# end def
+
+
+def close_sessions():
+    """
+    Close every open Aardvark, called when pySCPI exits.
+    """
+    for port in pool.keys():
+        pool[port].close()
+        del pool[port]
+    # end for
+# end def
+
+
+# close the adapters however pySCPI exits
+atexit.register(close_sessions)
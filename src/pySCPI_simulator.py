@@ -0,0 +1,879 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_simulator.py
+Module defining a bus transport of simulated SupMCU modules, built from
+SCPI_Commands.xml and the addresses in pySCPI_config.xml, so that command
+lists and logging can be run and timed without an Aardvark or modules.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_config
+import pySCPI_scheduler
+import pySCPI_transport
+import math
+import random
+import struct
+import threading
+
+
+# ---------
+# Constants
+
+# SCPI message terminator
+terminator = 0x0a
+
+# default time a module takes to prepare a telemetry reply in ms
+latency_ms = 20
+
+# spread of that time either side as a fraction of it
+jitter_fraction = 0.25
+
+# factor ascii replies take longer to prepare by
+ascii_factor = 4
+
+# unique ID of the first simulated adapter, printed as 9900-000001
+first_unique_id = 9900000001
+
+# addresses given to the modules of a large rack
+first_address = 0x08
+last_address = 0x77
+
+# how long a module holds the bus when it gets stuck in ms
+stuck_bus_ms = 50
+
+# factor a late reply takes longer to prepare by
+late_factor = 10
+
+# mixed into a module's seed to give the faults of its requests their own
+# sequence, it moves the address into 0x80 to 0xFF so no other module has
+# the same seed
+request_seed_mask = 0x5EED
+
+# struct codes and sizes of the telemetry data formats
+format_codes = {'int':       ('<h', 2),
+                'long':      ('<l', 4),
+                'long long': ('<q', 8),
+                'uint':      ('<H', 2),
+                'double':    ('<d', 8),
+                'float':     ('<f', 4),
+                'char':      ('<B', 1),
+                'schar':     ('<b', 1)}
+
+
+# ---------
+# Classes
+
+class fault_profile:
+    """
+    Class containing the chance of each fault a simulated module injects.
+    Faults of a request are drawn once when it is written so that a seed 
+    gives the same faults however many times the reply is polled.
+
+    @attribute nack          (float)  Chance a transaction is not 
+                                      acknowledged.
+    @attribute arb_lost      (float)  Chance a transaction loses 
+                                      arbitration.
+    @attribute bus_stuck     (float)  Chance a transaction leaves the bus 
+                                      held low for stuck_bus_ms.
+    @attribute stuck_flag    (float)  Chance a reply never sets its write
+                                      flag.
+    @attribute late          (float)  Chance a reply takes late_factor 
+                                      times longer to prepare.
+    @attribute bad_checksum  (float)  Chance a reply has a corrupt 
+                                      checksum, or last data byte if there
+                                      is no checksum.
+    @attribute reset         (float)  Chance a module resets before a
+                                      request, zeroing its timestamp.
+    """
+    def __init__(self, nack = 0.0, arb_lost = 0.0, bus_stuck = 0.0,
+                 stuck_flag = 0.0, late = 0.0, bad_checksum = 0.0,
+                 reset = 0.0):
+        """
+        Initialise the profile, every fault defaults to never.
+        """
+        self.nack = nack
+        self.arb_lost = arb_lost
+        self.bus_stuck = bus_stuck
+        self.stuck_flag = stuck_flag
+        self.late = late
+        self.bad_checksum = bad_checksum
+        self.reset = reset
+    # end def
+# end class
+
+
+class sim_module:
+    """
+    Class simulating a SupMCU module that answers telemetry requests.
+
+    @attribute addr       (int)     The I2C address of the module.
+    @attribute device     (string)  The command prefix of the module, such
+                                    as 'BM2'.
+    @attribute library    (command_library) The commands and reply sizes.
+    @attribute latency_ms (float)   Time taken to prepare a reply in ms.
+    @attribute nack_rate  (float)   Fraction of transactions that are not
+                                    acknowledged.
+    @attribute faults     (fault_profile) The faults injected.
+    @attribute rng        (Random)  Source of the latency and the faults of
+                                    transactions.
+    @attribute request_rng (Random) Source of the faults of requests.
+    @attribute boot_time  (float)   When the module started, its
+                                    timestamps count from here.
+    @attribute reply      (list)    The reply being prepared or read,
+                                    None before the first request.
+    @attribute ready_time (float)   When the reply's write flag is set.
+    @attribute requests   (int)     Telemetry requests answered.
+    @attribute sample     (int)     Requests since the module started, the
+                                    data counts up with it.
+    @attribute writes     (int)     Other commands received.
+    @attribute injected   (dict)    Count of each fault injected.
+    @attribute sent_time  (float)   When the last request was written, None
+                                    once its reply has been read.
+    @attribute response   (list)    Count, total and longest time from a
+                                    request to reading its reply in s.
+    """
+    def __init__(self, addr, device, library, seed = 0):
+        """
+        Initialise the module.
+
+        @param[in]  addr:     The I2C address of the module (int).
+        @param[in]  device:   The command prefix of the module (string).
+        @param[in]  library:  The supported commands
+                              (pySCPI_config.command_library).
+        @param[in]  seed:     OPTIONAL, the seed of its latency and NACKs
+                              (int).
+        """
+        self.addr = addr
+        self.device = device
+        self.library = library
+        self.latency_ms = latency_ms
+        self.nack_rate = 0.0
+        self.faults = fault_profile()
+        self.rng = random.Random((seed << 8) | addr)
+        self.request_rng = random.Random(((seed << 8) | addr) ^ 
+                                         request_seed_mask)
+        self.boot_time = pySCPI_scheduler.monotonic()
+        self.reply = None
+        self.ready_time = 0.0
+        self.requests = 0
+        self.sample = 0
+        self.writes = 0
+        self.injected = {}
+        self.sent_time = None
+        self.response = [0, 0.0, 0.0]
+    # end def
+
+
+    def transaction_status(self, bus):
+        """
+        Decide how a transaction with the module ends.
+
+        @param[in]  bus:       The bus the module is on (sim_bus).
+        @return     (int)      One of pySCPI_transport.STATUS_*.
+        """
+        faults = self.faults
+        (nack, arb_lost, bus_stuck) = [self.rng.random() for i in range(3)]
+
+        if nack < self.nack_rate + faults.nack:
+            self.inject('nack')
+            return pySCPI_transport.STATUS_SLA_NACK
+
+        elif arb_lost < faults.arb_lost:
+            self.inject('arb_lost')
+            return pySCPI_transport.STATUS_ARB_LOST
+
+        elif bus_stuck < faults.bus_stuck:
+            # the module holds the bus until it times out or is freed
+            self.inject('bus_stuck')
+            bus.stuck_until = pySCPI_scheduler.monotonic() + \
+                              stuck_bus_ms/1000.0
+            return pySCPI_transport.STATUS_BUS_LOCKED
+        # end if
+
+        return pySCPI_transport.STATUS_OK
+    # end def
+
+
+    def inject(self, fault):
+        """
+        Count a fault that was injected.
+
+        @param[in]  fault:  The name of the fault (string).
+        """
+        self.injected[fault] = self.injected.get(fault, 0) + 1
+    # end def
+
+
+    def receive(self, data_out):
+        """
+        Handle a command written to the module.
+
+        @param[in]  data_out:  The bytes written (list of ints).
+        """
+        if terminator in data_out:
+            data_out = data_out[:data_out.index(terminator)]
+        # end if
+
+        command = ''.join([chr(x) for x in data_out])
+
+        if 'TEL?' not in command:
+            self.writes += 1
+            return
+        # end if
+
+        if not self.supports(command):
+            # unknown requests leave the last reply with its flag clear
+            self.ready_time = float('inf')
+            return
+        # end if
+
+        faults = self.faults
+        (reset, stuck_flag, late, bad_checksum) = \
+            [self.request_rng.random() for i in range(4)]
+        now = pySCPI_scheduler.monotonic()
+
+        if reset < faults.reset:
+            # the module restarts, its timestamp and data start again
+            self.inject('reset')
+            self.boot_time = now
+            self.sample = 0
+        # end if
+
+        self.requests += 1
+        self.sample += 1
+        self.reply = self.frame(command)
+        self.sent_time = now
+
+        if bad_checksum < faults.bad_checksum:
+            self.inject('bad_checksum')
+            self.reply[-1] ^= 0xFF
+        # end if
+
+        # the write flag is set once the reply is prepared
+        jitter_ms = self.latency_ms*jitter_fraction
+        delay_ms = self.latency_ms + self.rng.uniform(-jitter_ms, jitter_ms)
+
+        if command.endswith('ascii'):
+            delay_ms *= ascii_factor
+        # end if
+
+        if late < faults.late:
+            self.inject('late')
+            delay_ms *= late_factor
+        # end if
+
+        if stuck_flag < faults.stuck_flag:
+            self.inject('stuck_flag')
+            self.ready_time = float('inf')
+        else:
+            self.ready_time = now + max(delay_ms, 0)/1000.0
+        # end if
+    # end def
+
+
+    def transmit(self, length):
+        """
+        Give the bytes read from the module.
+
+        @param[in]  length:    The number of bytes read (int).
+        @return     (list)     The bytes read (ints).
+        """
+        if self.reply == None:
+            return [0]*length
+        # end if
+
+        data = self.reply[:length] + [0]*max(length - len(self.reply), 0)
+        now = pySCPI_scheduler.monotonic()
+
+        if now < self.ready_time:
+            # the reply is not ready so its write flag is clear
+            data[0] = 0
+
+        elif self.sent_time != None:
+            # time the first read of the finished reply
+            response_s = now - self.sent_time
+            self.response[0] += 1
+            self.response[1] += response_s
+            self.response[2] = max(self.response[2], response_s)
+            self.sent_time = None
+        # end if
+
+        return data
+    # end def
+
+
+    def supports(self, command):
+        """
+        Check that a telemetry request is answered by this module.
+
+        @param[in]  command:   The telemetry request (string).
+        @return     (bool)     True if it is in the library for this
+                               module or every SupMCU.
+        """
+        prefix = command.split(':')[0]
+
+        return (command in self.library.SCPI_Data) and \
+               (prefix in [self.device, 'SUP'])
+    # end def
+
+
+    def frame(self, command):
+        """
+        Build the reply to a telemetry request with its write flag,
+        timestamp and checksum.
+
+        @param[in]  command:   The telemetry request (string).
+        @return     (list)     The reply (ints), the write flag set.
+        """
+        library = self.library
+        length = library.SCPI_Data[command][0]
+        wflag_size = library.wflag_size
+        time_size = library.time_size
+        chksum_size = library.chksum_size
+
+        if not pySCPI_config.has_preamble(command):
+            # ascii replies are just text
+            return pad(self.ascii_text(command[:-len(',ascii')]), length)
+        # end if
+
+        size = length - wflag_size - time_size - chksum_size
+
+        if command.endswith(',name'):
+            payload = pad(command[:-len(',name')], size)
+
+        elif command.endswith(',length'):
+            data_length = library.SCPI_Data[command[:-len(',length')] +
+                                            ',data'][0] - \
+                          wflag_size - time_size - chksum_size
+            payload = pad(struct.pack('<L', data_length), size)
+
+        else:
+            payload = self.data_bytes(command, size)
+        # end if
+
+        # timestamps count hundredths of a second since the module started
+        ticks = int((pySCPI_scheduler.monotonic() - self.boot_time)*100)
+        timestamp = pad(struct.pack('<Q', ticks % (1 << 64)), time_size)
+
+        reply = pad(chr(1), wflag_size) + timestamp + payload
+
+        if chksum_size > 0:
+            # the checksum is the sum of the bytes before it
+            reply += pad(struct.pack('<Q', sum(reply) % (1 << 64)),
+                         chksum_size)
+        # end if
+
+        return reply
+    # end def
+
+
+    def data_bytes(self, command, size):
+        """
+        Build the data of a telemetry reply, values that never change are
+        always the same and others change with each request.
+
+        @param[in]  command:   The data request (string).
+        @param[in]  size:      The length of the data in bytes (int).
+        @return     (list)     The data (ints).
+        """
+        data_format = self.library.SCPI_Data[command][1]
+
+        if self.library.cache_ttl.get(command) == pySCPI_config.static_ttl:
+            sample = 0
+        else:
+            sample = self.sample
+        # end if
+
+        if data_format == 'ascii':
+            return pad(self.device + ' simulated module at 0x%02X' %
+                       self.addr, size)
+
+        elif data_format == 'hex':
+            if command.startswith('SUP:TEL? 10'):
+                # the I2C address of the module
+                return pad(chr(self.addr), size)
+            # end if
+
+            return [(sample + i) & 0xFF for i in range(size)]
+        # end if
+
+        data = ''
+
+        for (index, spec) in enumerate(data_format.split(', ')):
+            (code, item_size) = format_codes[spec]
+
+            if spec in ['double', 'float']:
+                value = 10*math.sin((sample + index)/10.0)
+            else:
+                # count up within the range of the type
+                value = (sample + index) % (1 << (8*item_size - 1))
+            # end if
+
+            data += struct.pack(code, value)
+        # end for
+
+        return pad(data, size)
+    # end def
+
+
+    def ascii_text(self, command):
+        """
+        Build the text of an ascii reply.
+
+        @param[in]  command:   The request without ,ascii (string).
+        @return     (string)   The text, ending with a null.
+        """
+        return command + ' from ' + self.device + ' at 0x%02X' % \
+               self.addr + chr(0)
+    # end def
+# end class
+
+
+class sim_bus:
+    """
+    Class containing the simulated modules on the bus of one adapter.
+
+    @attribute unique_id   (int)   The unique ID of the adapter.
+    @attribute modules     (dict)  The modules keyed by address 
+                                   (sim_module).
+    @attribute lock        (Lock)  Keeps transactions on the bus whole.
+    @attribute in_use      (bool)  True while a transport has it open.
+    @attribute stuck_until (float) When a module stops holding the bus.
+    """
+    def __init__(self, unique_id):
+        """
+        Initialise an empty bus.
+
+        @param[in]  unique_id:  The unique ID of the adapter (int).
+        """
+        self.unique_id = unique_id
+        self.modules = {}
+        self.lock = threading.Lock()
+        self.in_use = False
+        self.stuck_until = 0.0
+    # end def
+
+
+    def transaction_status(self, addr):
+        """
+        Decide how a transaction on the bus ends.
+
+        @param[in]  addr:      The I2C address of the transaction (int).
+        @return     (int)      One of pySCPI_transport.STATUS_*.
+        """
+        if pySCPI_scheduler.monotonic() < self.stuck_until:
+            return pySCPI_transport.STATUS_BUS_LOCKED
+        # end if
+
+        if addr not in self.modules:
+            return pySCPI_transport.STATUS_SLA_NACK
+        # end if
+
+        return self.modules[addr].transaction_status(self)
+    # end def
+
+
+    def add_module(self, module):
+        """
+        Add a module to the bus, replacing any at the same address.
+
+        @param[in]  module:  The module (sim_module).
+        """
+        self.modules[module.addr] = module
+    # end def
+# end class
+
+
+class simulated_transport(pySCPI_transport.bus_transport):
+    """
+    Class sending I2C transactions to the simulated modules of the rack.
+
+    @attribute bus  (sim_bus)  The bus that is open, None if it is not.
+    """
+    name = 'simulator'
+
+    def __init__(self):
+        """
+        Initialise a simulated adapter that is not open.
+        """
+        self.bus = None
+    # end def
+
+
+    def find(self):
+        """
+        Find every simulated adapter.
+
+        @return     (list)     (port, unique ID, True if free) of each
+                               adapter (tuples).
+        """
+        return [(port, bus.unique_id, not bus.in_use)
+                for (port, bus) in enumerate(rack)]
+    # end def
+
+
+    def open(self, port):
+        """
+        Open a simulated adapter.
+
+        @param[in]  port:      The position of the adapter in the rack (int).
+        @return     (bool)     True if the adapter was opened.
+        """
+        if not (0 <= port < len(rack)) or rack[port].in_use:
+            return False
+        # end if
+
+        self.bus = rack[port]
+        self.bus.in_use = True
+
+        return True
+    # end def
+
+
+    def status(self):
+        """
+        Check that the adapter is still in the rack.
+
+        @return     (int)      The unique ID of the adapter, 0 if it has
+                               been removed.
+        """
+        if (self.bus == None) or (self.bus not in rack):
+            return 0
+        # end if
+
+        return self.bus.unique_id
+    # end def
+
+
+    def write(self, addr, data_out):
+        """
+        Write to a simulated module.
+
+        @param[in]  addr:      The I2C address of the module (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @return     (tuple)    The status of the write and the number of
+                               bytes written.
+        """
+        self.bus.lock.acquire()
+
+        try:
+            status = self.bus.transaction_status(addr)
+
+            if status != pySCPI_transport.STATUS_OK:
+                return (status, 0)
+            # end if
+
+            self.bus.modules[addr].receive(list(data_out))
+
+            return (pySCPI_transport.STATUS_OK, len(data_out))
+        finally:
+            self.bus.lock.release()
+        # end try
+    # end def
+
+
+    def read(self, addr, data_in):
+        """
+        Read from a simulated module.
+
+        @param[in]  addr:      The I2C address of the module (int).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The status of the read, the buffer and the
+                               number of bytes read.
+        """
+        self.bus.lock.acquire()
+
+        try:
+            status = self.bus.transaction_status(addr)
+
+            if status != pySCPI_transport.STATUS_OK:
+                return (status, data_in, 0)
+            # end if
+
+            module = self.bus.modules[addr]
+
+            for (index, byte) in enumerate(module.transmit(len(data_in))):
+                data_in[index] = byte
+            # end for
+
+            return (pySCPI_transport.STATUS_OK, data_in, len(data_in))
+        finally:
+            self.bus.lock.release()
+        # end try
+    # end def
+
+
+    def write_read(self, addr, data_out, data_in):
+        """
+        Write to a simulated module and read its reply.
+
+        @param[in]  addr:      The I2C address of the module (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The combined status, the number of bytes
+                               written, the buffer and the number of bytes
+                               read.
+        """
+        (status, num_written) = self.write(addr, data_out)
+
+        if status != pySCPI_transport.STATUS_OK:
+            return (status, num_written, data_in, 0)
+        # end if
+
+        (status, data_in, num_read) = self.read(addr, data_in)
+
+        return (status << 8, num_written, data_in, num_read)
+    # end def
+
+
+    def free_bus(self):
+        """
+        Free the bus if a simulated module is holding it.
+        """
+        if self.bus != None:
+            self.bus.stuck_until = 0.0
+        # end if
+    # end def
+
+
+    def close(self):
+        """
+        Close the simulated adapter.
+        """
+        if self.bus != None:
+            self.bus.in_use = False
+            self.bus = None
+        # end if
+    # end def
+# end class
+
+
+# ---------
+# Rack
+
+# the simulated adapters, each with a bus of modules (sim_bus)
+rack = []
+
+# when the rack was built, [] before it is
+rack_start = []
+
+# fault profiles that can be chosen by name
+fault_profiles = {'none':     fault_profile(),
+                  'nack':     fault_profile(nack = 0.05),
+                  'flag':     fault_profile(stuck_flag = 0.05),
+                  'late':     fault_profile(late = 0.1),
+                  'bus':      fault_profile(arb_lost = 0.02, 
+                                            bus_stuck = 0.01),
+                  'checksum': fault_profile(bad_checksum = 0.05),
+                  'reset':    fault_profile(reset = 0.01),
+                  # a little of everything for long runs
+                  'soak':     fault_profile(nack = 0.01, arb_lost = 0.005,
+                                            bus_stuck = 0.002, 
+                                            stuck_flag = 0.01, late = 0.02,
+                                            bad_checksum = 0.01,
+                                            reset = 0.002)}
+
+
+#
+# ----------------
+# Public Functions
+
+def build_rack(scpi_commands, defaults, adapters = 1, seed = 0,
+               latency = None, nack_rate = 0.0, faults = 'none'):
+    """
+    Replace the rack with simulated adapters that each have a module at
+    every address in pySCPI_config.xml with commands in SCPI_Commands.xml.
+
+    @param[in]  scpi_commands:  The supported commands
+                                (pySCPI_config.command_library).
+    @param[in]  defaults:       The default settings with the module
+                                addresses (pySCPI_config.gui_defaults).
+    @param[in]  adapters:       OPTIONAL, the number of adapters (int).
+    @param[in]  seed:           OPTIONAL, the seed of the module latencies
+                                and NACKs (int).
+    @param[in]  latency:        OPTIONAL, the time modules take to prepare
+                                a reply in ms, None for latency_ms (float).
+    @param[in]  nack_rate:      OPTIONAL, the fraction of transactions that
+                                are not acknowledged (float).
+    @param[in]  faults:         OPTIONAL, the name of the fault profile of
+                                the modules, one of fault_profiles 
+                                (string).
+    @return     (list)          The rack (sim_bus).
+    """
+    del rack[:]
+    rack_start[:] = [pySCPI_scheduler.monotonic()]
+
+    devices = scpi_commands.get_devices()
+
+    for index in range(adapters):
+        bus = sim_bus(first_unique_id + index)
+
+        for (device, address) in defaults.address_of.items():
+            if device in devices:
+                prefix = {'GPSRM': 'GPS'}.get(device, device)
+                module = sim_module(int(address, 16), prefix, scpi_commands,
+                                    seed + index)
+
+                if latency != None:
+                    module.latency_ms = latency
+                # end if
+
+                module.nack_rate = nack_rate
+                module.faults = fault_profiles[faults]
+                bus.add_module(module)
+            # end if
+        # end for
+
+        rack.append(bus)
+    # end for
+
+    return rack
+# end def
+
+
+def build_large_rack(scpi_commands, module_count, adapters = 1, seed = 0,
+                     latency = None, faults = 'none'):
+    """
+    Replace the rack with many simulated modules shared evenly between
+    adapters, at consecutive addresses from first_address and taking each
+    module type in SCPI_Commands.xml in turn.
+
+    @param[in]  scpi_commands:  The supported commands
+                                (pySCPI_config.command_library).
+    @param[in]  module_count:   The number of modules (int).
+    @param[in]  adapters:       OPTIONAL, the number of adapters (int).
+    @param[in]  seed:           OPTIONAL, the seed of the module latencies
+                                and faults (int).
+    @param[in]  latency:        OPTIONAL, the time modules take to prepare
+                                a reply in ms, None for latency_ms (float).
+    @param[in]  faults:         OPTIONAL, the name of the fault profile of
+                                the modules, one of fault_profiles 
+                                (string).
+    @return     (list)          The rack (sim_bus), None if there are more
+                                modules than addresses.
+    """
+    per_bus = last_address - first_address + 1
+
+    if module_count > per_bus*adapters:
+        print '*** ' + str(module_count) + ' modules do not fit on ' + \
+              str(adapters) + ' adapters, use at least ' + \
+              str(-(-module_count // per_bus)) + ' ***'
+        return None
+    # end if
+
+    del rack[:]
+    rack_start[:] = [pySCPI_scheduler.monotonic()]
+
+    devices = sorted(set([key.split(':')[0] for key in 
+                          scpi_commands.SCPI_Data.keys()]) - set(['SUP']))
+
+    for index in range(adapters):
+        rack.append(sim_bus(first_unique_id + index))
+    # end for
+
+    for index in range(module_count):
+        # deal the modules out between the adapters
+        bus = rack[index % adapters]
+        module = sim_module(first_address + index // adapters, 
+                            devices[index % len(devices)], scpi_commands,
+                            seed + index % adapters)
+
+        if latency != None:
+            module.latency_ms = latency
+        # end if
+
+        module.faults = fault_profiles[faults]
+        bus.add_module(module)
+    # end for
+
+    return rack
+# end def
+
+
+def modules():
+    """
+    Get every simulated module in the rack.
+
+    @return     (list)     The modules (sim_module).
+    """
+    return [module for bus in rack for module in bus.modules.values()]
+# end def
+
+
+def report():
+    """
+    Print the requests answered by each simulated module, how long they 
+    took to be read and the faults that were injected.
+    """
+    if len(rack_start) == 0:
+        return
+    # end if
+
+    elapsed = max(pySCPI_scheduler.monotonic() - rack_start[0], 1e-6)
+    modules_used = [module for module in modules() 
+                    if module.requests + module.writes > 0]
+
+    print 'Simulated modules over %.1fs:' % elapsed
+
+    for module in sorted(modules_used, key = lambda module: module.addr):
+        line = '0x%02X %s: %d requests (%.1f/s)' % \
+               (module.addr, module.device, module.requests, 
+                module.requests/elapsed)
+
+        (count, total, longest) = module.response
+
+        if count > 0:
+            line += ', read after %.1fms mean, %.1fms max' % \
+                    (1000*total/count, 1000*longest)
+        # end if
+
+        if len(module.injected) > 0:
+            line += ', faults: ' + \
+                    ', '.join(['%s %d' % (fault, module.injected[fault]) 
+                               for fault in sorted(module.injected)])
+        # end if
+
+        print line
+    # end for
+# end def
+
+
+#
+# ----------------
+# Private Functions
+
+def pad(data, size):
+    """
+    Convert data to bytes and pad or clip it to a size.
+
+    @param[in]  data:      The data (string or list of ints).
+    @param[in]  size:      The number of bytes (int).
+    @return     (list)     The bytes (ints).
+    """
+    if isinstance(data, str):
+        data = [ord(x) for x in data]
+    # end if
+
+    return (list(data) + [0]*size)[:size]
+# end def
+
+
+# make the simulator a transport that can be chosen in pySCPI_config.xml
+pySCPI_transport.transports[simulated_transport.name] = simulated_transport
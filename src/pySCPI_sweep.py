@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_sweep.py
+Module to run a command list as a template over every combination of a set
+of parameters, such as addresses, setpoints and bitrates, and gather the
+telemetry of every run into one table.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import pySCPI_aardvark
+import copy
+import csv
+import itertools
+import re
+
+
+# ---------
+# Constants
+
+# a parameter is written in a command as {name}
+placeholder = re.compile(r'\{(\w+)\}')
+
+
+# ---------
+# Classes
+
+class sweep_run:
+    """
+    Class containing a single run of a sweep.
+
+    @attribute index    (int)    The number of the run, from 1.
+    @attribute values   (list)   The value of each parameter (strings).
+    @attribute commands (list)   The command list with the values filled in
+                                 (strings).
+    """
+    def __init__(self, index, values, commands):
+        """
+        Initialise the run.
+
+        @param[in]  index:     The number of the run (int).
+        @param[in]  values:    The value of each parameter (list).
+        @param[in]  commands:  The filled in command list (list).
+        """
+        self.index = index
+        self.values = values
+        self.commands = commands
+    # end def
+# end class
+
+
+#
+# ----------------
+# Public Functions
+
+def parse_parameter(text):
+    """
+    Read a parameter to sweep, given as name=a,b,c for a list of values or
+    name=first:last:step for a range that includes both ends. A range
+    starting with 0x gives hexadecimal values such as addresses.
+
+    @param[in]  text:      The parameter (string).
+    @return     (tuple)    The name of the parameter and its values (list of
+                           strings), None if it is not valid.
+    """
+    error = '*** The sweep parameter ' + text + ' is not valid. Use '\
+            'name=a,b,c or name=first:last:step ***'
+
+    if '=' not in text:
+        print error
+        return None
+    # end if
+
+    (name, values_text) = [part.strip() for part in text.split('=', 1)]
+
+    if placeholder.match('{' + name + '}') == None:
+        print error
+        return None
+    # end if
+
+    if ':' not in values_text:
+        # a list of values
+        values = [value.strip() for value in values_text.split(',')
+                  if value.strip() != '']
+
+    else:
+        values = parse_range(values_text.split(':'))
+    # end if
+
+    if (values == None) or (len(values) == 0):
+        print error
+        return None
+    # end if
+
+    return (name, values)
+# end def
+
+
+def expand(commands, parameters):
+    """
+    Fill in a template command list with every combination of the
+    parameters, the last parameter changing fastest.
+
+    @param[in]  commands:    The template command list, where {name} is
+                             replaced by the value of the parameter name
+                             (list of strings).
+    @param[in]  parameters:  The name and values of each parameter (list of
+                             tuples).
+    @return     (list)       The runs of the sweep (sweep_run).
+    """
+    names = [name for (name, values) in parameters]
+
+    # warn about parameters and placeholders that do not match
+    used = set()
+    for command in commands:
+        used.update(placeholder.findall(command))
+    # end for
+
+    for name in names:
+        if name not in used:
+            print '*** Sweep parameter ' + name + ' is not used by any '\
+                  'command ***'
+        # end if
+    # end for
+
+    for name in sorted(used - set(names)):
+        print '*** {' + name + '} is not a sweep parameter and is sent '\
+              'as it is ***'
+    # end for
+
+    runs = []
+
+    for values in itertools.product(*[values for (name, values) in
+                                      parameters]):
+        run_commands = []
+
+        for command in commands:
+            for (name, value) in zip(names, values):
+                command = command.replace('{' + name + '}', value)
+            # end for
+
+            run_commands.append(command)
+        # end for
+
+        runs.append(sweep_run(len(runs) + 1, list(values), run_commands))
+    # end for
+
+    return runs
+# end def
+
+
+def run_sweep(directives, parameters, filename, gui, adapters = None):
+    """
+    Run every combination of the parameters and write the telemetry of each
+    run as a row of a table. The runs follow each other on the Aardvark,
+    which is kept open and configured between them, or are shared between
+    several Aardvarks which each do one run at a time.
+
+    @param[in]  directives:  Instructions to direct the sending of
+                             data, with the template command list
+                             (pySCPI_config.write_directives)
+    @param[in]  parameters:  The name and values of each parameter (list of
+                             tuples).
+    @param[in]  filename:    The csv file to write the table to (string).
+    @param[in]  gui:         Instance of the gui that this function is
+                             called by (pySCPI_gui.main_gui).
+    @param[in]  adapters:    OPTIONAL, the serial numbers of the Aardvarks
+                             to share the runs between, None or empty for
+                             the first one found (list of strings).
+    @return     int(0):      Failed to use Aardvark.
+                None         Otherwise.
+    """
+    names = [name for (name, values) in parameters]
+    runs = expand(directives.command_list, parameters)
+
+    if (adapters == None) or (len(adapters) == 0):
+        lanes = [None]
+    else:
+        lanes = adapters
+    # end if
+
+    csv_output = open(filename, 'wb')
+    output_writer = csv.writer(csv_output, delimiter = '\t')
+    first_header = None
+    written = 0
+
+    print 'Sweeping ' + str(len(runs)) + ' runs'
+
+    # each round does one run on every Aardvark at once
+    for start in range(0, len(runs), len(lanes)):
+
+        if gui.terminator.kill_event.isSet():
+            break
+        # end if
+
+        round_runs = runs[start:start + len(lanes)]
+
+        commands = []
+        sections = []
+
+        for (run, adapter) in zip(round_runs, lanes):
+            print 'Run ' + str(run.index) + ' of ' + str(len(runs)) + ':\t' + \
+                  ', '.join([name + '=' + value for (name, value) in
+                             zip(names, run.values)])
+
+            sections.append(len(commands))
+
+            if adapter != None:
+                commands.append('<ADAPTER ' + adapter + '>')
+            # end if
+
+            if len(lanes) > 1:
+                # each run starts at the address of the directives
+                commands.append('<ADDRESS 0x%02X>' % directives.addr)
+            # end if
+
+            commands.extend(run.commands)
+        # end for
+
+        print ''
+
+        round_directives = copy.copy(directives)
+        round_directives.command_list = commands
+
+        results = pySCPI_aardvark.sample_aardvark(round_directives, gui,
+                                                  sections)
+
+        if results == 0:
+            # no aardvark connection was established
+            csv_output.close()
+            return 0
+        # end if
+
+        for (run, adapter, (header, row)) in zip(round_runs, lanes, results):
+
+            if first_header == None:
+                # the columns of the first run head the table
+                first_header = header
+                output_writer.writerow(['Run'] + names +
+                                       ['Adapter']*(adapter != None) +
+                                       header)
+
+            elif header != first_header:
+                print '*** Run ' + str(run.index) + ' reads different '\
+                      'telemetry to the first run, its columns do not '\
+                      'match the header ***'
+            # end if
+
+            output_writer.writerow([run.index] + run.values +
+                                   [adapter]*(adapter != None) + row)
+            written += 1
+        # end for
+    # end for
+
+    csv_output.close()
+
+    print 'Sweep finished, ' + str(written) + ' of ' + str(len(runs)) + \
+          ' runs written to ' + filename
+# end def
+
+
+#
+# ----------------
+# Private Functions
+
+def parse_range(range_list):
+    """
+    Find the values of a range of the form first:last:step.
+
+    @param[in]  range_list:  The first, last and optionally step of the
+                             range (list of strings).
+    @return     (list)       The values of the range (strings), None if the
+                             range is not valid.
+    """
+    if len(range_list) == 2:
+        range_list = range_list + ['1']
+    elif len(range_list) != 3:
+        return None
+    # end if
+
+    (first, last, step) = [part.strip() for part in range_list]
+
+    try:
+        if first.lower().startswith('0x'):
+            # hexadecimal such as an address
+            (first, last) = (int(first, 16), int(last, 16))
+            step = int(step, 0)
+            value_format = '0x%02X'
+
+        elif all(part.lstrip('-').isdigit() for part in
+                 [first, last, step]):
+            (first, last, step) = (int(first), int(last), int(step))
+            value_format = '%d'
+
+        else:
+            (first, last, step) = (float(first), float(last), float(step))
+            value_format = '%g'
+        # end if
+    except ValueError:
+        return None
+    # end try
+
+    if step <= 0:
+        return None
+    # end if
+
+    if last < first:
+        # count down to the last value
+        step = -step
+    # end if
+
+    values = []
+    count = int(round(abs(last - first)/abs(step), 9)) + 1
+
+    for index in range(count):
+        values.append(value_format % (first + index*step))
+    # end for
+
+    return values
+# end def
@@ -23,7 +23,9 @@ __version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
 # Imports
 
 import pySCPI_aardvark
+import pySCPI_scheduler
 import threading
+import sys
 
 
 # ----------------
@@ -57,6 +59,20 @@ class terminator_event:
     # end def
 
 
+    def sleep_ms(self, delay_ms):
+        """
+        Sleep for a number of milliseconds, returning early if the 
+        threads are asked to terminate.
+        
+        @param[in]  delay_ms:  The time to sleep for in ms (int).
+        @return     (bool)     True if the full time was slept, False if
+                               termination was requested.
+        """      
+        return pySCPI_scheduler.sleep_until(pySCPI_scheduler.monotonic() + 
+                                            delay_ms/1000.0, self.kill_event)
+    # end def
+
+
     def kill_threads(self, gui):
         """
         Kill all threads and close the program.
@@ -73,9 +89,136 @@ class terminator_event:
 # end class
 
 
+class worker_output:
+    """
+    Class to stand in for stdout while several workers run at once, so 
+    that what each worker prints about an operation is kept together.
+    
+    @attribute stream   (file)  The stdout being replaced.
+    @attribute lock     (Lock)  Lock held while writing to the stream.
+    @attribute buffers  (dict)  Text waiting to be written (list of 
+                                strings) keyed by worker thread.
+    """
+    def __init__(self, stream):
+        """
+        Initialise the output with no workers.
+        
+        @param[in]  stream:  The stdout being replaced (file).
+        """
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.buffers = {}
+    # end def
+    
+    
+    def write(self, string):
+        """
+        Hold text written by a worker, write any other text straight away.
+        
+        @param[in]  string:  The text to write (string).
+        """
+        worker = threading.current_thread()
+        
+        if worker in self.buffers:
+            self.buffers[worker].append(string)
+        else:
+            self.lock.acquire()
+            self.stream.write(string)
+            self.lock.release()
+        # end if
+    # end def
+    
+    
+    def flush_worker(self):
+        """
+        Write everything the current worker has printed.
+        """
+        buffer = self.buffers.get(threading.current_thread(), [])
+        
+        self.lock.acquire()
+        
+        # each piece is written separately so errors are still counted
+        for string in buffer:
+            self.stream.write(string)
+        # end for
+        
+        self.lock.release()
+        
+        del buffer[:]
+    # end def
+# end class
+
+
 # ----------------
 # Public Functions
 
+def run_workers(workers, function, *args):
+    """
+    Run a function for each worker at once, each in its own thread, and 
+    wait for them all to finish. A single worker is run in this thread.
+    
+    @param[in]  workers:   The arguments of each worker (list of tuples).
+    @param[in]  function:  The function to run (function).
+    @param[in]  args:      Further arguments passed to every worker.
+    """
+    if len(workers) == 1:
+        function(*(workers[0] + args))
+        return
+    # end if
+    
+    # keep the workers' output apart
+    output = worker_output(sys.stdout)
+    sys.stdout = output
+    
+    threads = [threading.Thread(target = worker_thread, 
+                                args = (output, function) + worker + args)
+               for worker in workers]
+    
+    try:
+        for thread in threads:
+            thread.start()
+        # end for
+        
+        for thread in threads:
+            thread.join()
+        # end for
+        
+    finally:
+        sys.stdout = output.stream
+    # end try
+# end def
+
+
+def worker_thread(output, function, *args):
+    """
+    Wrapper for a worker thread that collects what it prints.
+    
+    @param[in]  output:    The shared output (worker_output).
+    @param[in]  function:  The function to run (function).
+    @param[in]  args:      The arguments of the function.
+    """
+    output.buffers[threading.current_thread()] = []
+    
+    try:
+        function(*args)
+        
+    finally:
+        output.flush_worker()
+        del output.buffers[threading.current_thread()]
+    # end try
+# end def
+
+
+def flush_worker_output():
+    """
+    Write what the current worker has printed so far, if it is one of 
+    several workers running at once.
+    """
+    if isinstance(sys.stdout, worker_output):
+        sys.stdout.flush_worker()
+    # end if
+# end def
+
 def I2C_thread(write_directives, gui):
     """
     Wrapper for the I2C writing thread to control the startup and 
@@ -89,21 +232,25 @@ def I2C_thread(write_directives, gui):
     # Change the role of the button so that it stops commands
     gui.aardvark_button_state('stop')    
     
-    # write via the Aardvark
-    pySCPI_aardvark.write_aardvark(write_directives, gui)
-    # clear the thread termination flag
-    gui.terminator.kill_event.clear()
-    
-    # re-allow access to hte command text box
-    gui.Command_text.config(state = 'normal')
-    
-    if not gui.terminator.root_destroyed:
-        # unlock all of the GUI buttons
-        gui.action_lock('Unlock')
+    try:
+        # write via the Aardvark
+        pySCPI_aardvark.write_aardvark(write_directives, gui)
         
-        # Reset the button back to it's initial state
-        gui.aardvark_button_state('start')        
-    # end if
+    finally:
+        # clear the thread termination flag
+        gui.terminator.kill_event.clear()
+        
+        # re-allow access to hte command text box
+        gui.Command_text.config(state = 'normal')
+        
+        if not gui.terminator.root_destroyed:
+            # unlock all of the GUI buttons
+            gui.action_lock('Unlock')
+            
+            # Reset the button back to it's initial state
+            gui.aardvark_button_state('start')        
+        # end if
+    # end try
 # end def
 
 
@@ -122,22 +269,25 @@ def I2C_log_thread(write_directives, filename, gui):
     # Change the role of the logging button so that it stops logging
     gui.logging_button_state('stop')
     
-    # start logging
-    pySCPI_aardvark.log_aardvark(write_directives, filename, gui)
-    
-    # clear the flag that stopped logging
-    gui.terminator.kill_event.clear()
-    
-    # re-allow access to hte command text box
-    gui.Command_text.config(state = 'normal')    
-    
-    # determine if there is still a gui to update
-    if not gui.terminator.root_destroyed:
-        # there is so unlock all GUI buttons
-        gui.action_lock('Unlock')
+    try:
+        # start logging
+        pySCPI_aardvark.log_aardvark(write_directives, filename, gui)
         
-        # Reset the logging button back to it's initial state
-        gui.logging_button_state('start')
-    # end if
+    finally:
+        # clear the flag that stopped logging
+        gui.terminator.kill_event.clear()
+        
+        # re-allow access to hte command text box
+        gui.Command_text.config(state = 'normal')    
+        
+        # determine if there is still a gui to update
+        if not gui.terminator.root_destroyed:
+            # there is so unlock all GUI buttons
+            gui.action_lock('Unlock')
+            
+            # Reset the logging button back to it's initial state
+            gui.logging_button_state('start')
+        # end if
+    # end try
 # end def
 
@@ -0,0 +1,460 @@
+#!/usr/bin/env python
+###########################################################################
+#(C) Copyright Pumpkin, Inc. All Rights Reserved.
+#
+#This file may be distributed under the terms of the License
+#Agreement provided with this software.
+#
+#THIS FILE IS PROVIDED AS IS WITH NO WARRANTY OF ANY KIND,
+#INCLUDING THE WARRANTY OF DESIGN, MERCHANTABILITY AND
+#FITNESS FOR A PARTICULAR PURPOSE.
+###########################################################################
+"""
+@package pySCPI_transport.py
+Module defining the I2C bus transports that pySCPI sends commands through,
+so that the Aardvark is one transport chosen when pySCPI starts rather than
+being called directly. The Aardvark library is only loaded when the
+Aardvark transport is first used.
+"""
+
+__author__ = 'David Wright (david@pumpkininc.com)'
+__version__ = '0.3.3' #Versioning: http://www.python.org/dev/peps/pep-0386/
+
+
+#
+# -------
+# Imports
+
+import time
+
+
+# ---------
+# Constants
+
+# I2C transaction status codes, the same as the Aardvark's
+STATUS_OK = 0
+STATUS_BUS_ERROR = 1
+STATUS_SLA_ACK = 2
+STATUS_SLA_NACK = 3
+STATUS_DATA_NACK = 4
+STATUS_ARB_LOST = 5
+STATUS_BUS_LOCKED = 6
+STATUS_LAST_DATA_ACK = 7
+
+# most adapters searched for at once
+max_adapters = 16
+
+# the Aardvark library, loaded when it is first needed
+aardvark_py = None
+
+
+# ---------
+# Classes
+
+class bus_transport:
+    """
+    Class defining the operations pySCPI needs from an I2C adapter. Each
+    transport overrides every method, an instance is created unopened so
+    that it can find adapters and is then opened on one of them.
+
+    @attribute name  (string) The name of the transport in
+                              pySCPI_config.xml.
+    """
+    name = None
+
+    def find(self):
+        """
+        Find every adapter connected, including those in use.
+
+        @return     (list)     (port, unique ID, True if free) of each
+                               adapter (tuples).
+        """
+        return []
+    # end def
+
+
+    def open(self, port):
+        """
+        Open the adapter on a port.
+
+        @param[in]  port:      The port of the adapter (int).
+        @return     (bool)     True if the adapter was opened.
+        """
+        return False
+    # end def
+
+
+    def status(self):
+        """
+        Check that the open adapter is still connected.
+
+        @return     (int)      The unique ID of the adapter, 0 or less if it
+                               is no longer connected.
+        """
+        return 0
+    # end def
+
+
+    def configure(self, bus_timeout_ms):
+        """
+        Set the adapter up as an I2C master.
+
+        @param[in]  bus_timeout_ms:  The time a slave may hold the bus for
+                                     before the transaction fails in ms
+                                     (int).
+        """
+        pass
+    # end def
+
+
+    def set_bitrate(self, bitrate):
+        """
+        Set the I2C bitrate.
+
+        @param[in]  bitrate:   The requested bitrate in kHz (int).
+        @return     (int)      The bitrate used in kHz.
+        """
+        return bitrate
+    # end def
+
+
+    def set_pullups(self, pullups):
+        """
+        Turn the I2C pullups on or off.
+
+        @param[in]  pullups:   True to turn the pullups on (bool).
+        """
+        pass
+    # end def
+
+
+    def free_bus(self):
+        """
+        Free the I2C bus if a slave is holding it.
+        """
+        pass
+    # end def
+
+
+    def write(self, addr, data_out):
+        """
+        Write to a slave.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @return     (tuple)    The status of the write, one of STATUS_*, and
+                               the number of bytes written.
+        """
+        return (STATUS_BUS_ERROR, 0)
+    # end def
+
+
+    def read(self, addr, data_in):
+        """
+        Read from a slave.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_in:   The buffer to read into, sized to the number
+                               of bytes to read (array).
+        @return     (tuple)    The status of the read, one of STATUS_*, the
+                               buffer and the number of bytes read.
+        """
+        return (STATUS_BUS_ERROR, data_in, 0)
+    # end def
+
+
+    def write_read(self, addr, data_out, data_in):
+        """
+        Write to a slave and read its reply after a repeated start.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The status, with that of the write in the low
+                               byte and that of the read in the next byte or
+                               negative if the adapter failed, the number of
+                               bytes written, the buffer and the number of
+                               bytes read.
+        """
+        return (STATUS_BUS_ERROR, 0, data_in, 0)
+    # end def
+
+
+    def sleep_ms(self, delay_ms):
+        """
+        Wait on the adapter's clock.
+
+        @param[in]  delay_ms:  The time to wait in ms (int).
+        """
+        time.sleep(delay_ms/1000.0)
+    # end def
+
+
+    def close(self):
+        """
+        Close the adapter.
+        """
+        pass
+    # end def
+# end class
+
+
+class aardvark_transport(bus_transport):
+    """
+    Class sending I2C transactions through a Total Phase Aardvark.
+
+    @attribute handle  (int)  The handle of the open Aardvark, None if it is
+                              not open.
+    """
+    name = 'aardvark'
+
+    def __init__(self):
+        """
+        Initialise an Aardvark that is not open.
+        """
+        self.handle = None
+    # end def
+
+
+    def find(self):
+        """
+        Find every Aardvark connected, including those in use.
+
+        @return     (list)     (port, unique ID, True if free) of each
+                               Aardvark (tuples), empty if the Aardvark
+                               library could not be loaded.
+        """
+        if not load_aardvark():
+            return []
+        # end if
+
+        (num, ports, unique_ids) = \
+            aardvark_py.aa_find_devices_ext(max_adapters, max_adapters)
+
+        # ports that are in use have a flag set
+        return [(port & ~aardvark_py.AA_PORT_NOT_FREE, unique_id,
+                 not (port & aardvark_py.AA_PORT_NOT_FREE))
+                for (port, unique_id) in
+                zip(ports, unique_ids)[:max(num, 0)]]
+    # end def
+
+
+    def open(self, port):
+        """
+        Open the Aardvark on a port.
+
+        @param[in]  port:      The port of the Aardvark (int).
+        @return     (bool)     True if the Aardvark was opened.
+        """
+        if not load_aardvark():
+            return False
+        # end if
+
+        handle = aardvark_py.aa_open(port)
+
+        if handle <= 0:
+            return False
+        # end if
+
+        self.handle = handle
+
+        return True
+    # end def
+
+
+    def status(self):
+        """
+        Check that the Aardvark is still connected.
+
+        @return     (int)      The unique ID of the Aardvark, 0 or less if it
+                               is no longer connected.
+        """
+        return aardvark_py.aa_unique_id(self.handle)
+    # end def
+
+
+    def configure(self, bus_timeout_ms):
+        """
+        Set the Aardvark up in the mode needed for Pumpkin modules.
+
+        @param[in]  bus_timeout_ms:  The time a slave may hold the bus for
+                                     before the transaction fails in ms
+                                     (int).
+        """
+        aardvark_py.aa_configure(self.handle, aardvark_py.AA_CONFIG_SPI_I2C)
+        aardvark_py.aa_i2c_bus_timeout(self.handle, bus_timeout_ms)
+    # end def
+
+
+    def set_bitrate(self, bitrate):
+        """
+        Set the I2C bitrate, the Aardvark uses the closest rate it supports.
+
+        @param[in]  bitrate:   The requested bitrate in kHz (int).
+        @return     (int)      The bitrate used in kHz.
+        """
+        return aardvark_py.aa_i2c_bitrate(self.handle, bitrate)
+    # end def
+
+
+    def set_pullups(self, pullups):
+        """
+        Turn the I2C pullups on or off.
+
+        @param[in]  pullups:   True to turn the pullups on (bool).
+        """
+        if pullups:
+            aardvark_py.aa_i2c_pullup(self.handle,
+                                      aardvark_py.AA_I2C_PULLUP_BOTH)
+        else:
+            aardvark_py.aa_i2c_pullup(self.handle,
+                                      aardvark_py.AA_I2C_PULLUP_NONE)
+        # end if
+    # end def
+
+
+    def free_bus(self):
+        """
+        Free the I2C bus if a slave is holding it.
+        """
+        aardvark_py.aa_i2c_free_bus(self.handle)
+    # end def
+
+
+    def write(self, addr, data_out):
+        """
+        Write to a slave.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @return     (tuple)    The status of the write and the number of
+                               bytes written.
+        """
+        return aardvark_py.aa_i2c_write_ext(self.handle, addr,
+                                            aardvark_py.AA_I2C_NO_FLAGS,
+                                            data_out)
+    # end def
+
+
+    def read(self, addr, data_in):
+        """
+        Read from a slave.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The status of the read, the buffer and the
+                               number of bytes read.
+        """
+        return aardvark_py.aa_i2c_read_ext(self.handle, addr,
+                                           aardvark_py.AA_I2C_NO_FLAGS,
+                                           data_in)
+    # end def
+
+
+    def write_read(self, addr, data_out, data_in):
+        """
+        Write to a slave and read its reply after a repeated start.
+
+        @param[in]  addr:      The I2C address of the slave (int).
+        @param[in]  data_out:  The bytes to write (array).
+        @param[in]  data_in:   The buffer to read into (array).
+        @return     (tuple)    The combined status, the number of bytes
+                               written, the buffer and the number of bytes
+                               read.
+        """
+        return aardvark_py.aa_i2c_write_read(self.handle, addr,
+                                             aardvark_py.AA_I2C_NO_FLAGS,
+                                             data_out, data_in)
+    # end def
+
+
+    def sleep_ms(self, delay_ms):
+        """
+        Wait on the Aardvark library's clock.
+
+        @param[in]  delay_ms:  The time to wait in ms (int).
+        """
+        aardvark_py.aa_sleep_ms(delay_ms)
+    # end def
+
+
+    def close(self):
+        """
+        Close the Aardvark.
+        """
+        aardvark_py.aa_close(self.handle)
+        self.handle = None
+    # end def
+# end class
+
+
+# ---------
+# Transports
+
+# the transports that can be chosen in pySCPI_config.xml by name
+transports = {aardvark_transport.name: aardvark_transport}
+
+# the transport in use
+current = aardvark_transport
+
+
+#
+# ----------------
+# Public Functions
+
+def select(name):
+    """
+    Choose the transport that adapters are opened with.
+
+    @param[in]  name:      The name of the transport (string).
+    @return     (bool)     True if the transport exists.
+    """
+    global current
+
+    if name not in transports:
+        return False
+    # end if
+
+    current = transports[name]
+
+    return True
+# end def
+
+
+def create():
+    """
+    Create an unopened adapter of the transport in use.
+
+    @return     (bus_transport) The adapter.
+    """
+    return current()
+# end def
+
+
+#
+# ----------------
+# Private Functions
+
+def load_aardvark():
+    """
+    Load the Aardvark library the first time it is needed, so that other
+    transports run where it is not installed.
+
+    @return     (bool)     True if the library is loaded.
+    """
+    global aardvark_py
+
+    if aardvark_py == None:
+        try:
+            import aardvark_py as library
+        except ImportError, error:
+            print '*** The Aardvark library could not be loaded: ' + \
+                  str(error).split('\n')[0] + ' ***'
+            return False
+        # end try
+
+        aardvark_py = library
+    # end if
+
+    return True
+# end def